@@ -0,0 +1,46 @@
+"""Compare serial and parallel --build-all wall time over a directory of generated programs.
+
+Usage: python -m benchmarks.build_all [files]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from run import build_all
+
+
+def make_program(index):
+    lines = [f"fun work{index}(n) {{", "    var total = 0;",
+             "    for i = 0, n { total = total + i * " + str(index + 1) + "; };",
+             "    return total;", "};"]
+    for i in range(200):
+        lines.append(f"print(work{index}({i}));")
+    return "\n".join(lines)
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    with tempfile.TemporaryDirectory() as work_dir:
+        for i in range(files):
+            with open(os.path.join(work_dir, f"prog{i}.fl"), "w") as f:
+                f.write(make_program(i))
+
+        timings = {}
+        for jobs in (1, os.cpu_count() or 1):
+            start = time.perf_counter()
+            results, error = build_all(work_dir, opt_level=2, use_cache=False, keep_going=True, jobs=jobs)
+            timings[jobs] = time.perf_counter() - start
+            failed = [result for result in results if result[2]]
+            if error or failed:
+                print(error or failed[0][2])
+                return
+            print(f"{files} files, {jobs} worker(s): {timings[jobs]:.2f}s")
+
+    if len(timings) > 1:
+        serial, parallel = timings[1], timings[max(timings)]
+        print(f"Speedup with {max(timings)} workers: {serial / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Tokenize CSV-like text in the interpreter: native string builtins against a to_list loop.
+
+Usage: python -m benchmarks.csv_tokenize [megabytes]
+
+The builtins split the whole text (50 MB by default) into lines and fields in
+a few calls. The to_list version walks one String per character in an
+interpreted loop, so it only gets a small sample of the same rows. Both run
+with the garbage collector paused; the builtins run again with it collecting
+to show what it costs.
+"""
+import contextlib
+import gc
+import io
+import sys
+import time
+
+from run import run
+
+# Builds `copies` copies of a block of 1000 distinct rows, ahead of either program
+TEXT = """
+var block = "";
+for i = 0, 1000 {{
+    block = block + to_string(i * 37) + ",user" + to_string(i) + "," + to_string(i % 97) + ".5,north\\n";
+}}
+var text = block * {copies};
+"""
+
+BUILTINS_PROGRAM = """
+var lines = split(text, "\\n");
+var fields = split(replace(text, "\\n", ","), ",");
+print(len(lines) - 1);
+print(len(fields) - 1);
+"""
+
+TO_LIST_PROGRAM = """
+var separators = {",": 0, "\\n": 1};
+var lines = 0;
+var fields = 0;
+for c in to_list(text) {
+    if has(separators, c) {
+        fields = fields + 1;
+        lines = lines + get(separators, c);
+    }
+}
+print(lines);
+print(fields);
+"""
+
+BLOCK_BYTES = sum(len(f"{i * 37},user{i},{i % 97}.5,north\n") for i in range(1000))
+
+
+def time_program(program, copies, collect=False):
+    output = io.StringIO()
+    # The millions of strings split() makes hold no cycles, so the collector only costs time
+    if not collect:
+        gc.disable()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            _, _, _, error = run("<benchmark>", TEXT.format(copies=copies) + program)
+    finally:
+        seconds = time.perf_counter() - start
+        gc.enable()
+    if error:
+        raise Exception(error.as_string())
+    lines, fields = output.getvalue().split()
+    return seconds, int(lines), int(fields)
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    copies = max(1, int(megabytes * 1_000_000 / BLOCK_BYTES))
+    sample_copies = 4
+
+    print(f"{'version':>13}{'MB':>10}{'lines':>12}{'fields':>12}{'time':>10}{'MB/s':>10}")
+    throughputs = []
+    for name, program, n, collect in (("builtins", BUILTINS_PROGRAM, copies, False),
+                                      ("builtins+gc", BUILTINS_PROGRAM, copies, True),
+                                      ("to_list", TO_LIST_PROGRAM, sample_copies, False)):
+        seconds, lines, fields = time_program(program, n, collect)
+        size = n * BLOCK_BYTES / 1_000_000
+        throughputs.append(size / seconds)
+        print(f"{name:>13}{size:>10.1f}{lines:>12,}{fields:>12,}{seconds:>9.2f}s{size / seconds:>10.2f}")
+    print(f"builtins: {throughputs[0] / throughputs[2]:.0f}x the to_list throughput, "
+          f"{throughputs[1] / throughputs[2]:.0f}x with the collector running")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Time compiled loops that build a list one append at a time.
+
+Usage: python -m benchmarks.list_append [max_appends]
+
+With amortized capacity growth the time per append stays flat as the list grows;
+copying the whole list on every append would make it grow linearly instead.
+"""
+import ctypes
+import sys
+import time
+
+from run import compile_to_llvm
+from src.jit import JIT
+
+PROGRAM = """
+var xs = [];
+for i = 0, {n} {{
+    xs = xs + i;
+}}
+print(xs / {last});
+"""
+
+
+def main():
+    max_appends = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [max_appends // 8, max_appends // 4, max_appends // 2, max_appends]
+    jit = JIT(opt_level=2)
+
+    print(f"{'appends':>10}{'time':>12}{'per append':>14}")
+    for n in sizes:
+        llvm_ir, _, _, error = compile_to_llvm("<benchmark>", PROGRAM.format(n=n, last=n - 1), opt_level=2)
+        if error:
+            print(error if isinstance(error, str) else error.as_string())
+            return
+        engine = jit.compile(llvm_ir)
+        main_func = ctypes.CFUNCTYPE(ctypes.c_int64)(engine.get_function_address("main"))
+
+        start = time.perf_counter()
+        main_func()
+        elapsed = time.perf_counter() - start
+        jit.libc.fflush(None)
+        print(f"{n:>10}{elapsed * 1000:>10.2f}ms{elapsed / n * 1e9:>12.2f}ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Time compiled lookups in a table of n entries: scanning parallel key/value lists against a map.
+
+Usage: python -m benchmarks.map_lookup [max_entries]
+
+Each run builds a table of n entries and looks every key up once, so the list
+scan grows quadratically with n while the map stays linear.
+"""
+import ctypes
+import sys
+import time
+
+from run import compile_to_llvm
+from src.jit import JIT
+
+LIST_PROGRAM = """
+var ids = [];
+var counts = [];
+for i = 0, {n} {{
+    ids = ids + i * 7;
+    counts = counts + i;
+}}
+var total = 0;
+for i = 0, {n} {{
+    var k = 0;
+    while ids / k != i * 7 {{ k = k + 1; }}
+    total = total + counts / k;
+}}
+print(total);
+"""
+
+MAP_PROGRAM = """
+var table = {{}};
+for i = 0, {n} {{
+    set(table, i * 7, i);
+}}
+var total = 0;
+for i = 0, {n} {{
+    total = total + get(table, i * 7);
+}}
+print(total);
+"""
+
+
+def time_program(jit, program, n):
+    llvm_ir, _, _, error = compile_to_llvm("<benchmark>", program.format(n=n), opt_level=2)
+    if error:
+        raise Exception(error if isinstance(error, str) else error.as_string())
+    engine = jit.compile(llvm_ir)
+    main_func = ctypes.CFUNCTYPE(ctypes.c_int64)(engine.get_function_address("main"))
+
+    start = time.perf_counter()
+    main_func()
+    elapsed = time.perf_counter() - start
+    jit.libc.fflush(None)
+    return elapsed
+
+
+def main():
+    max_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    sizes = [max_entries // 8, max_entries // 4, max_entries // 2, max_entries]
+    jit = JIT(opt_level=2)
+
+    print(f"{'entries':>10}{'list scan':>14}{'map':>12}")
+    for n in sizes:
+        list_time = time_program(jit, LIST_PROGRAM, n)
+        map_time = time_program(jit, MAP_PROGRAM, n)
+        print(f"{n:>10}{list_time * 1000:>12.2f}ms{map_time * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Count Number allocations and time a comparison-heavy while loop in the interpreter.
+
+Usage: python -m benchmarks.number_cache
+"""
+import contextlib
+import io
+import time
+
+from run import run
+from src.interpreter import Number
+
+PROGRAM = """
+var i = 0;
+var hits = 0;
+while i < 200000 {
+    if i < 1000 or i >= 150000 and i != 170000 { hits = hits + 1; };
+    i = i + 1;
+};
+print(hits);
+"""
+
+
+def main():
+    allocations = 0
+    number_init = Number.__init__
+
+    def counting_init(self, value):
+        nonlocal allocations
+        allocations += 1
+        number_init(self, value)
+
+    Number.__init__ = counting_init
+    try:
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            _, _, _, error = run("<benchmark>", PROGRAM)
+        seconds = time.perf_counter() - start
+    finally:
+        Number.__init__ = number_init
+
+    if error:
+        print(error.as_string())
+        return
+    print(f"Number allocations: {allocations:,}")
+    print(f"Time: {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare the runtime of compiled examples/*.fl at each LLVM optimization level.
+
+Usage: python -m benchmarks.opt_levels [runs]
+"""
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from run import build_executable
+
+LEVELS = [0, 1, 2, 3]
+
+
+def time_executable(executable, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([executable], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    examples = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "examples", "*.fl")))
+
+    print(f"{'program':<24}" + "".join(f"{'-O' + str(level):>10}" for level in LEVELS))
+    with tempfile.TemporaryDirectory() as build_dir:
+        for example in examples:
+            name = os.path.basename(example)
+            timings = []
+            for level in LEVELS:
+                # Build from a copy so executables don't land next to the examples
+                source = os.path.join(build_dir, f"O{level}_{name}")
+                shutil.copy(example, source)
+                executable, error = build_executable(source, opt_level=level)
+                if error:
+                    timings = None
+                    break
+                timings.append(time_executable(os.path.abspath(executable), runs))
+
+            if timings is None:
+                message = error if isinstance(error, str) else error.as_string()
+                print(f"{name:<24}  skipped ({message.splitlines()[0]})")
+            else:
+                print(f"{name:<24}" + "".join(f"{t * 1000:>8.2f}ms" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
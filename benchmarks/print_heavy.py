@@ -0,0 +1,55 @@
+"""Measure generated IR size and llc time for a program with many print calls.
+
+Usage: python -m benchmarks.print_heavy [prints]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from run import compile_to_llvm
+
+
+def make_program(prints):
+    lines = ["var xs = [1, 2, 3];"]
+    for i in range(prints):
+        kind = i % 4
+        if kind == 0:
+            lines.append(f"print({i});")
+        elif kind == 1:
+            lines.append(f"print({i}.5);")
+        elif kind == 2:
+            lines.append('print("hello");')
+        else:
+            lines.append("print(xs);")
+    return "\n".join(lines)
+
+
+def main():
+    prints = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    llvm_ir, _, _, error = compile_to_llvm("<benchmark>", make_program(prints))
+    if error:
+        print(error if isinstance(error, str) else error.as_string())
+        return
+
+    globals_count = sum(1 for line in llvm_ir.splitlines() if line.startswith("@"))
+    with tempfile.TemporaryDirectory() as build_dir:
+        ir_path = os.path.join(build_dir, "print_heavy.ll")
+        with open(ir_path, "w") as f:
+            f.write(llvm_ir)
+        start = time.perf_counter()
+        subprocess.run(["llc", "-filetype=obj", ir_path, "-o", os.path.join(build_dir, "print_heavy.o")],
+                       check=True)
+        llc_time = time.perf_counter() - start
+        object_size = os.path.getsize(os.path.join(build_dir, "print_heavy.o"))
+
+    print(f"prints:      {prints}")
+    print(f"IR size:     {len(llvm_ir) / 1024:.1f} KiB")
+    print(f"globals:     {globals_count}")
+    print(f"llc time:    {llc_time:.2f}s")
+    print(f"object size: {object_size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Time a compiled program that prints 10M integers, one print() each.
+
+Usage: python -m benchmarks.print_ints [count]
+
+The executable is built at -O2 and its output sent to /dev/null, so the time is
+spent formatting and buffering rather than in the terminal.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from run import build_executable
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    with tempfile.TemporaryDirectory() as build_dir:
+        source = os.path.join(build_dir, "print_ints.fl")
+        with open(source, "w") as f:
+            f.write(f"for i = 0, {count} {{ print(i); }};")
+
+        executable, error = build_executable(source, opt_level=2)
+        if error:
+            print(error if isinstance(error, str) else error.as_string())
+            return
+
+        start = time.perf_counter()
+        subprocess.run([executable], stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+
+    print(f"{count} prints: {elapsed:.3f}s ({elapsed / count * 1e9:.1f} ns per print)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Time a compiled sieve of Eratosthenes that marks composites with indexed assignment.
+
+Usage: python -m benchmarks.sieve [n]
+
+Every xs[j] = 0 is a store into the list's buffer, so the sieve runs in
+O(n log log n); rebuilding the list for each update would make it quadratic.
+"""
+import ctypes
+import sys
+import time
+
+from run import compile_to_llvm
+from src.jit import JIT
+
+PROGRAM = """
+var is_prime = [];
+for i = 0, {n} {{
+    is_prime += 1;
+}}
+is_prime[0] = 0;
+is_prime[1] = 0;
+for i = 2, {n} {{
+    if is_prime[i] == 1 and i * i < {n} {{
+        var j = i * i;
+        while j < {n} {{
+            is_prime[j] = 0;
+            j = j + i;
+        }}
+    }}
+}}
+var count = 0;
+for flag in is_prime {{
+    count += flag;
+}}
+print(count);
+"""
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    llvm_ir, _, _, error = compile_to_llvm("<benchmark>", PROGRAM.format(n=n), opt_level=2)
+    if error:
+        print(error if isinstance(error, str) else error.as_string())
+        return
+    jit = JIT(opt_level=2)
+    engine = jit.compile(llvm_ir)
+    main_func = ctypes.CFUNCTYPE(ctypes.c_int64)(engine.get_function_address("main"))
+
+    start = time.perf_counter()
+    main_func()
+    jit.libc.fflush(None)
+    elapsed = time.perf_counter() - start
+    print(f"Sieve of {n:,}: {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
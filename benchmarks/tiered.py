@@ -0,0 +1,46 @@
+"""Compare plain interpretation with tiered execution on numeric kernels.
+
+Usage: python -m benchmarks.tiered
+"""
+import contextlib
+import io
+import time
+
+from run import run
+from src.tiering import TieredExecution
+
+PROGRAM = """
+fun int dot(xs, ys) {
+    var total = 0;
+    for i = 0, len(xs) { total = total + (xs / i) * (ys / i); };
+    return total;
+};
+fun fib(n) { if n < 2 { return n; }; return fib(n - 1) + fib(n - 2); };
+var a = [];
+for i = 0, 1000 { a = a + i; };
+var s = 0;
+for k = 0, 200 { s = s + dot(a, a); };
+print(s);
+print(fib(22));
+"""
+
+
+def main():
+    timings = {}
+    for label, tiering in (("interpreted", None), ("tiered", TieredExecution())):
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            _, _, _, error = run("<benchmark>", PROGRAM, tiering=tiering)
+        timings[label] = time.perf_counter() - start
+        if error:
+            print(error.as_string())
+            return
+        print(f"{label:>12}: {timings[label]:.2f}s")
+        if tiering:
+            print(tiering.report())
+    print(f"Speedup: {timings['interpreted'] / timings['tiered']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 import sys
 import os
-from run import run_file, run, compile_file, compile_to_llvm, build_executable
+import time
+from run import run_file, run, compile_file, compile_to_llvm, build_executable, build_all, find_sources, jit_file, profile_path
 from src.config import LanguageConfig
+from src.incremental import IncrementalFrontEnd
+from src.build_cache import BuildCache
+from src.tiering import TieredExecution
+from src.type_feedback import TypeFeedback
 
 
 def resolve_config_path(config_arg):
@@ -47,11 +52,52 @@ def main():
         else:
             print("Error: --config requires a file path")
             sys.exit(1)
+
+    # Check for -O0 .. -O3 optimization level flags
+    opt_level = 0
+    for arg in list(args):
+        if arg in ('-O0', '-O1', '-O2', '-O3'):
+            opt_level = int(arg[2])
+            args.remove(arg)
+
+    # --no-cache always rebuilds instead of reusing a cached executable
+    use_cache = '--no-cache' not in args
+    if not use_cache:
+        args.remove('--no-cache')
+
+    # --tiered runs a file in the interpreter, moving hot functions to native code
+    tiered = '--tiered' in args
+    if tiered:
+        args.remove('--tiered')
+
+    # --use-profile compiles with the types recorded by an earlier --profile-run
+    use_profile = '--use-profile' in args
+    if use_profile:
+        args.remove('--use-profile')
+
+    # --build-all stops at the first failure unless --keep-going is given
+    keep_going = '--keep-going' in args
+    if keep_going:
+        args.remove('--keep-going')
+
+    # -j N limits --build-all to N worker processes (default: one per CPU)
+    jobs = None
+    if '-j' in args:
+        jobs_index = args.index('-j')
+        try:
+            jobs = int(args[jobs_index + 1])
+        except (IndexError, ValueError):
+            print("Error: -j requires a number of jobs")
+            sys.exit(1)
+        args.pop(jobs_index)
+        args.pop(jobs_index)
     
     # No arguments - run the shell
     if len(args) == 0:
         print("FunLang Shell - Type 'exit' to quit")
         print("Commands: 'compile <code>' to compile, 'run <code>' to interpret")
+        # Re-submitted (edited) lines only re-parse what changed
+        frontend = IncrementalFrontEnd('<stdin>', config)
         while True:
             source = input('funlang > ')
             if source.lower() == 'exit':
@@ -59,7 +105,7 @@ def main():
 
             if source.startswith('compile '):
                 code = source[8:]
-                llvm_ir, ast, tokens, error = compile_to_llvm('<stdin>', code, config)
+                llvm_ir, ast, tokens, error = compile_to_llvm('<stdin>', code, config, opt_level=opt_level)
 
                 if error:
                     if isinstance(error, str):
@@ -71,14 +117,14 @@ def main():
                     print(llvm_ir)
             elif source.startswith('run '):
                 code = source[4:]
-                result, ast, tokens, error = run('<stdin>', code, config)
+                result, ast, tokens, error = run('<stdin>', code, config, frontend)
 
                 if error:
                     print(error.as_string())
                 else:
                     print("Result:", result)
             else:
-                result, ast, tokens, error = run('<stdin>', source, config)
+                result, ast, tokens, error = run('<stdin>', source, config, frontend)
 
                 if error:
                     print(error.as_string())
@@ -89,6 +135,8 @@ def main():
     elif len(args) == 1 and args[0] == '--dev':
         print("FunLang Development Shell - Type 'exit' to quit")
         print("Commands: 'compile <code>' to compile, 'run <code>' to interpret")
+        # Re-submitted (edited) lines only re-parse what changed
+        frontend = IncrementalFrontEnd('<stdin>', config)
         while True:
             source = input('funlang-dev > ')
             if source.lower() == 'exit':
@@ -96,7 +144,7 @@ def main():
 
             if source.startswith('compile '):
                 code = source[8:]
-                llvm_ir, ast, tokens, error = compile_to_llvm('<stdin>', code, config)
+                llvm_ir, ast, tokens, error = compile_to_llvm('<stdin>', code, config, opt_level=opt_level)
 
                 if error:
                     if isinstance(error, str):
@@ -109,7 +157,7 @@ def main():
                 print("LLVM IR:", llvm_ir)
             elif source.startswith('run '):
                 code = source[4:]
-                result, ast, tokens, error = run('<stdin>', code, config)
+                result, ast, tokens, error = run('<stdin>', code, config, frontend)
 
                 if error:
                     print(error.as_string())
@@ -118,7 +166,7 @@ def main():
                 print("AST:", ast)
                 print("Result:", result)
             else:
-                result, ast, tokens, error = run('<stdin>', source, config)
+                result, ast, tokens, error = run('<stdin>', source, config, frontend)
 
                 if error:
                     print(error.as_string())
@@ -130,7 +178,10 @@ def main():
     # Run a file
     elif len(args) == 1:
         file_path = args[0]
-        result, ast, tokens, error = run_file(file_path, config)
+        tiering = TieredExecution() if tiered else None
+        result, ast, tokens, error = run_file(file_path, config, tiering)
+        if tiering:
+            print(tiering.report(), file=sys.stderr)
 
         if error:
             if isinstance(error, str):
@@ -142,10 +193,27 @@ def main():
         if result is not None:
             print(result)
 
+    # Run a file in the interpreter and record its runtime types with --profile-run flag
+    elif len(args) == 2 and args[0] == '--profile-run':
+        file_path = args[1]
+        type_feedback = TypeFeedback()
+        result, ast, tokens, error = run_file(file_path, config, type_feedback=type_feedback)
+
+        if error:
+            if isinstance(error, str):
+                print(f"Error: {error}")
+            else:
+                print(error.as_string())
+            sys.exit(1)
+
+        type_feedback.save(profile_path(file_path))
+        print(f"Type profile written to {profile_path(file_path)}", file=sys.stderr)
+
     # Compile a file with --compile flag
     elif len(args) == 2 and args[0] == '--compile':
         file_path = args[1]
-        llvm_ir, ast, tokens, error = compile_file(file_path, config)
+        profile = profile_path(file_path) if use_profile else None
+        llvm_ir, ast, tokens, error = compile_file(file_path, config, opt_level, profile)
 
         if error:
             if isinstance(error, str):
@@ -163,22 +231,72 @@ def main():
     # Build executable with --build flag
     elif len(args) == 2 and args[0] == '--build':
         file_path = args[1]
-        executable, error = build_executable(file_path, config)
+        cache = BuildCache() if use_cache else None
+        profile = profile_path(file_path) if use_profile else None
+        executable, error = build_executable(file_path, config, opt_level, cache, profile)
 
         if error:
             print(f"Build Error: {error}")
             sys.exit(1)
 
         if executable:
-            print(f"Executable created: {executable}")
+            if cache:
+                print(f"Executable created: {executable} (build cache {'hit' if cache.last_hit else 'miss'})")
+            else:
+                print(f"Executable created: {executable}")
+
+    # Build every file in a directory or glob in parallel with --build-all flag
+    elif len(args) == 2 and args[0] == '--build-all':
+        def report(file_path, executable, error, seconds, cache_hit):
+            if error:
+                print(f"FAILED {file_path} ({seconds:.2f}s): {error}")
+            else:
+                cached = " (cached)" if cache_hit else ""
+                print(f"ok     {file_path} -> {executable} ({seconds:.2f}s){cached}")
+
+        start = time.perf_counter()
+        results, error = build_all(args[1], config, opt_level, use_cache, keep_going, jobs, report)
+        if error:
+            print(f"Build Error: {error}")
+            sys.exit(1)
+
+        failed = sum(1 for result in results if result[2])
+        skipped = len(find_sources(args[1])) - len(results)
+        build_seconds = sum(result[3] for result in results)
+        print(f"Built {len(results) - failed} of {len(results) + skipped} files"
+              f" ({failed} failed, {skipped} skipped) in {time.perf_counter() - start:.2f}s"
+              f" ({build_seconds:.2f}s of build time)")
+        if failed or skipped:
+            sys.exit(1)
+
+    # Compile and run a file in-process with --jit flag
+    elif len(args) == 2 and args[0] == '--jit':
+        file_path = args[1]
+        profile = profile_path(file_path) if use_profile else None
+        exit_code, error = jit_file(file_path, config, opt_level, profile)
+
+        if error:
+            if isinstance(error, str):
+                print(f"JIT Error: {error}")
+            else:
+                print(error.as_string())
+            sys.exit(1)
 
     # Invalid usage
     else:
         print("Usage:")
         print("  python main.py [--config <config.json>]                    # Interactive shell")
         print("  python main.py [--config <config.json>] <file.fl>          # Run file")
+        print("  python main.py [--config <config.json>] --tiered <file.fl>  # Run file, JIT-compiling hot functions")
+        print("  python main.py [--config <config.json>] --profile-run <file.fl> # Run file, recording types to <file>.flprof")
         print("  python main.py [--config <config.json>] --compile <file.fl> # Compile to LLVM IR")
         print("  python main.py [--config <config.json>] --build <file.fl>   # Build executable")
+        print("  python main.py [--config <config.json>] --build-all <dir|glob> # Build many files in parallel")
+        print("  python main.py [--config <config.json>] --jit <file.fl>     # Compile and run in-process")
+        print("  Add -O0, -O1, -O2 or -O3 to --compile/--build/--jit to set the LLVM optimization level")
+        print("  Add --use-profile to --compile/--build/--jit to compile with the types from --profile-run")
+        print("  Add --keep-going to --build-all to continue past failures, -j N to limit worker processes")
+        print("  Add --no-cache to --build/--build-all to skip the build cache (FUNLANG_CACHE_DIR, default ~/.cache/funlang/build)")
         sys.exit(1)
 
 
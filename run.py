@@ -4,6 +4,7 @@ from src.lexer import Lexer
 from src.parser import Parser
 from src.interpreter import Interpreter, Context, SymbolTable, Number, BuiltInFunction
 from src.config import LanguageConfig
+from src.type_feedback import TypeFeedback
 
 
 def create_global_symbol_table(config):
@@ -27,41 +28,105 @@ def create_global_symbol_table(config):
     symbol_table.set(builtin_names["to_list"], BuiltInFunction("to_list"))
     symbol_table.set(builtin_names["typeof"], BuiltInFunction("typeof"))
     symbol_table.set(builtin_names["elos"], BuiltInFunction("elos"))
+    symbol_table.set(builtin_names["get"], BuiltInFunction("get"))
+    symbol_table.set(builtin_names["set"], BuiltInFunction("set"))
+    symbol_table.set(builtin_names["has"], BuiltInFunction("has"))
+    symbol_table.set(builtin_names["remove"], BuiltInFunction("remove"))
+    symbol_table.set(builtin_names["keys"], BuiltInFunction("keys"))
+    symbol_table.set(builtin_names["slice"], BuiltInFunction("slice"))
+    symbol_table.set(builtin_names["split"], BuiltInFunction("split"))
+    symbol_table.set(builtin_names["join"], BuiltInFunction("join"))
+    symbol_table.set(builtin_names["find"], BuiltInFunction("find"))
+    symbol_table.set(builtin_names["replace"], BuiltInFunction("replace"))
+    symbol_table.set(builtin_names["substring"], BuiltInFunction("substring"))
+    symbol_table.set(builtin_names["upper"], BuiltInFunction("upper"))
+    symbol_table.set(builtin_names["lower"], BuiltInFunction("lower"))
 
     # Register constants
-    symbol_table.set("null", Number(0))
-    symbol_table.set("false", Number(0))
-    symbol_table.set("true", Number(1))
+    symbol_table.set("null", Number.null)
+    symbol_table.set("false", Number.false)
+    symbol_table.set("true", Number.true)
 
     return symbol_table
 
 
-def run(file_name, source, config=None):
-    """Run FunLang code with optional custom configuration"""
+def parse_stream(file_name, source, config):
+    """Parse straight from Lexer.generate_tokens() without building the token list.
+
+    Returns (ast, error). Errors match the list-based path: an illegal character
+    anywhere in the file is reported ahead of a parse error.
+    """
+    lexer = Lexer(file_name, source, config)
+    tokens = lexer.generate_tokens()
+    ast = Parser(tokens, config).parse()
+    if ast.error and not lexer.error:
+        # Finish lexing, dropping the tokens, in case an illegal character follows
+        for _ in tokens:
+            pass
+    if lexer.error:
+        return None, lexer.error
+    return ast, None
+
+
+def profile_path(file_path):
+    """Where --profile-run saves, and --use-profile reads, a file's type profile"""
+    return os.path.splitext(file_path)[0] + ".flprof"
+
+
+def run(file_name, source, config=None, frontend=None, stream=False, tiering=None, type_feedback=None):
+    """Run FunLang code with optional custom configuration.
+
+    Passing an IncrementalFrontEnd re-lexes and re-parses only what changed since
+    the source it saw last. With stream=True the parser consumes tokens as they
+    are lexed and no token list is returned. Passing a TieredExecution compiles
+    hot functions to native code as they run. Passing a TypeFeedback records the
+    runtime types seen at every operation, call and function into it.
+    """
     if config is None:
         config = LanguageConfig()
 
-    lexer = Lexer(file_name, source, config)
-    tokens, error = lexer.tokenizer()
-    if error:
-        return None, None, None, error
+    if frontend:
+        tokens, node, error = frontend.update(source)
+        if error:
+            return None, None, tokens, error
+    elif stream:
+        tokens = None
+        ast, error = parse_stream(file_name, source, config)
+        if error:
+            return None, None, None, error
+        if ast.error:
+            return None, None, None, ast.error
+        node = ast.node
+    else:
+        lexer = Lexer(file_name, source, config)
+        tokens, error = lexer.tokenizer()
+        if error:
+            return None, None, None, error
 
-    parser = Parser(tokens, config)
-    ast = parser.parse()
-    if ast.error:
-        return None, None, tokens, ast.error
+        parser = Parser(tokens, config)
+        ast = parser.parse()
+        if ast.error:
+            return None, None, tokens, ast.error
+        node = ast.node
 
-    interpreter = Interpreter()
+    if type_feedback:
+        type_feedback.index(node, source)
+
+    interpreter = Interpreter(tiering, type_feedback=type_feedback)
     context = Context("<program>")
     # Create symbol table with custom builtin names
     context.symbol_table = create_global_symbol_table(config)
-    result = interpreter.visit(ast.node, context)
+    result = interpreter.visit(node, context)
+
+    return result.value, node, tokens, result.error
 
-    return result.value, ast.node, tokens, result.error
 
+def compile_to_llvm(file_name, source, config=None, stream=False, opt_level=0, profile=None):
+    """Compile FunLang code to LLVM IR with optional custom configuration and optimization level (0-3).
 
-def compile_to_llvm(file_name, source, config=None):
-    """Compile FunLang code to LLVM IR with optional custom configuration"""
+    `profile` is the path of a type profile recorded for this exact source; it
+    decides the types static inference cannot (e.g. of functions never called).
+    """
     # Lazy import so the interpreter can run without LLVM deps (e.g. in-browser via Pyodide).
     try:
         from src.codegen import CodeGenerator
@@ -71,26 +136,38 @@ def compile_to_llvm(file_name, source, config=None):
     if config is None:
         config = LanguageConfig()
 
-    lexer = Lexer(file_name, source, config)
-    tokens, error = lexer.tokenizer()
-    if error:
-        return None, None, None, error
+    if stream:
+        tokens = None
+        ast, error = parse_stream(file_name, source, config)
+        if error:
+            return None, None, None, error
+    else:
+        lexer = Lexer(file_name, source, config)
+        tokens, error = lexer.tokenizer()
+        if error:
+            return None, None, None, error
 
-    parser = Parser(tokens, config)
-    ast = parser.parse()
+        parser = Parser(tokens, config)
+        ast = parser.parse()
     if ast.error:
         return None, None, tokens, ast.error
 
-    codegen = CodeGenerator()
+    type_feedback = None
+    if profile:
+        type_feedback, error = TypeFeedback.load(profile, ast.node, source)
+        if error:
+            return None, ast.node, tokens, error
+
     try:
+        codegen = CodeGenerator(opt_level, type_feedback)
         llvm_ir = codegen.generate(ast.node)
         return llvm_ir, ast.node, tokens, None
     except Exception as e:
         return None, ast.node, tokens, f"Code generation error: {str(e)}"
 
 
-def compile_file(file_path, config=None):
-    """Compile a FunLang file with optional custom configuration"""
+def compile_file(file_path, config=None, opt_level=0, profile=None):
+    """Compile a FunLang file with optional custom configuration and optimization level"""
     if not file_path.endswith(".fl"):
         return None, None, None, "File must have a .fl extension"
 
@@ -99,20 +176,43 @@ def compile_file(file_path, config=None):
             source = file.read()
 
         file_name = os.path.basename(file_path)
-        return compile_to_llvm(file_name, source, config)
+        return compile_to_llvm(file_name, source, config, stream=True, opt_level=opt_level, profile=profile)
     except FileNotFoundError:
         return None, None, None, f"File '{file_path}' not found"
     except Exception as e:
         return None, None, None, f"Error reading file: {str(e)}"
 
 
-def build_executable(file_path, config=None):
-    """Build an executable from a FunLang file with optional custom configuration"""
+def link_object(object_code, exe_file):
+    """Link native object code into an executable with clang; returns an error message or None"""
     import subprocess
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as build_dir:
+        obj_file = os.path.join(build_dir, "program.o")
+        with open(obj_file, "wb") as f:
+            f.write(object_code)
+
+        clang_result = subprocess.run(
+            ["clang", obj_file, "-o", exe_file, "-lm"], capture_output=True, text=True
+        )
+        if clang_result.returncode != 0:
+            return f"Clang error: {clang_result.stderr}"
+    return None
 
+
+def build_executable(file_path, config=None, opt_level=0, cache=None, profile=None):
+    """Build an executable from a FunLang file with optional custom configuration and optimization level.
+
+    Object code is generated in-process; only the final link runs an external tool.
+    With a BuildCache, an executable previously built from the same IR, target,
+    optimization level and toolchain is reused without linking.
+    """
     # Lazy import so non-LLVM usage doesn't require llvmlite.
     try:
-        from src.codegen import CodeGenerator  # noqa: F401
+        from src.codegen import CodeGenerator
+        import llvmlite.binding as llvm
+        from src.build_cache import toolchain_version
     except Exception as e:
         return None, f"LLVM backend not available: {e}"
 
@@ -120,34 +220,24 @@ def build_executable(file_path, config=None):
         return None, "File must have a .fl extension"
 
     try:
-        llvm_ir, ast, tokens, error = compile_file(file_path, config)
+        llvm_ir, ast, tokens, error = compile_file(file_path, config, opt_level, profile)
         if error:
             return None, error
 
-        base_name = file_path.replace(".fl", "")
-        ll_file = f"{base_name}.ll"
-        obj_file = f"{base_name}.o"
-        exe_file = base_name
+        exe_file = file_path.replace(".fl", "")
 
-        with open(ll_file, "w") as f:
-            f.write(llvm_ir)
+        if cache:
+            toolchain = f"LLVM {'.'.join(map(str, llvm.llvm_version_info))}\n{toolchain_version()}"
+            key = cache.key(llvm_ir, llvm.get_default_triple(), opt_level, toolchain)
+            if cache.fetch(key, exe_file):
+                return exe_file, None
 
-        llc_result = subprocess.run(
-            ["llc", "-filetype=obj", ll_file, "-o", obj_file],
-            capture_output=True,
-            text=True,
-        )
-        if llc_result.returncode != 0:
-            return None, f"LLC error: {llc_result.stderr}"
-
-        clang_result = subprocess.run(
-            ["clang", obj_file, "-o", exe_file, "-lm"], capture_output=True, text=True
-        )
-        if clang_result.returncode != 0:
-            return None, f"Clang error: {clang_result.stderr}"
+        error = link_object(CodeGenerator.emit_object(llvm_ir, opt_level), exe_file)
+        if error:
+            return None, error
 
-        os.remove(ll_file)
-        os.remove(obj_file)
+        if cache:
+            cache.store(key, exe_file)
 
         return exe_file, None
 
@@ -157,8 +247,91 @@ def build_executable(file_path, config=None):
         return None, f"Build error: {str(e)}"
 
 
-def run_file(file_path, config=None):
-    """Run a FunLang file with optional custom configuration"""
+def find_sources(target):
+    """Sorted, de-duplicated .fl files in a directory or matching a glob pattern"""
+    import glob
+
+    if os.path.isdir(target):
+        target = os.path.join(target, "*.fl")
+    return sorted({path for path in glob.glob(target, recursive=True) if path.endswith(".fl")})
+
+
+def build_worker(file_path, config, opt_level, use_cache):
+    """Build one file in a worker process, returning (executable, error, seconds, cache_hit)"""
+    import time
+    from src.build_cache import BuildCache
+
+    start = time.perf_counter()
+    cache = BuildCache() if use_cache else None
+    executable, error = build_executable(file_path, config, opt_level, cache)
+    if error and not isinstance(error, str):
+        # Send back plain text rather than pickling positions along with the whole source
+        error = error.as_string() if error.pos_start else f"{error.error_name}: {error.details}"
+    return executable, error, time.perf_counter() - start, cache.last_hit if cache else None
+
+
+def build_all(target, config=None, opt_level=0, use_cache=True, keep_going=False, jobs=None, on_result=None):
+    """Build every .fl file in a directory or glob concurrently, one worker process per CPU.
+
+    Each executable is written next to its source, exactly as build_executable
+    would, so output paths do not depend on scheduling. on_result(file_path,
+    executable, error, seconds, cache_hit) is called as each file finishes.
+    Without keep_going, the first failure cancels every build not yet started.
+
+    Returns (results, error) with results as (file_path, executable, error,
+    seconds, cache_hit) tuples in source order, for the files that were built.
+    Per-file errors are strings.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    files = find_sources(target)
+    if not files:
+        return [], f"No .fl files found in '{target}'"
+
+    results = {}
+    workers = min(jobs or os.cpu_count() or 1, len(files))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(build_worker, path, config, opt_level, use_cache): path
+                   for path in files}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            path = futures[future]
+            try:
+                executable, error, seconds, cache_hit = future.result()
+            except Exception as e:
+                executable, error, seconds, cache_hit = None, f"Build error: {str(e)}", 0.0, None
+            results[path] = (path, executable, error, seconds, cache_hit)
+            if on_result:
+                on_result(*results[path])
+            if error and not keep_going:
+                for pending in futures:
+                    pending.cancel()
+
+    return [results[path] for path in files if path in results], None
+
+
+def jit_file(file_path, config=None, opt_level=0, profile=None):
+    """Compile a FunLang file and run it in-process with the LLVM JIT"""
+    # Lazy import so non-LLVM usage doesn't require llvmlite.
+    try:
+        from src.jit import JIT
+    except Exception as e:
+        return None, f"LLVM backend not available: {e}"
+
+    llvm_ir, ast, tokens, error = compile_file(file_path, config, opt_level, profile)
+    if error:
+        return None, error
+
+    try:
+        result = JIT(opt_level).run(llvm_ir)
+        return result.exit_code, None
+    except Exception as e:
+        return None, f"JIT error: {str(e)}"
+
+
+def run_file(file_path, config=None, tiering=None, type_feedback=None):
+    """Run a FunLang file with optional custom configuration, tiered execution and type profiling"""
     if not file_path.endswith(".fl"):
         return None, None, None, "File must have a .fl extension"
 
@@ -167,7 +340,7 @@ def run_file(file_path, config=None):
             source = file.read()
 
         file_name = os.path.basename(file_path)
-        return run(file_name, source, config)
+        return run(file_name, source, config, stream=True, tiering=tiering, type_feedback=type_feedback)
     except FileNotFoundError:
         return None, None, None, f"File '{file_path}' not found"
     except Exception as e:
@@ -67,6 +67,45 @@ class VariableAssignmentNode:
         return f"VariableAssignment(name={self.tok.value}, value={self.value})"
 
 
+class IndexNode:
+    def __init__(self, target, index, pos_end):
+        self.target = target
+        self.index = index
+
+        self.pos_start = target.pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self):
+        return f"Index({self.target}[{self.index}])"
+
+
+class SliceNode:
+    def __init__(self, target, start, end, pos_end):
+        self.target = target
+        # Either bound may be None, meaning the start or end of the target
+        self.start = start
+        self.end = end
+
+        self.pos_start = target.pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self):
+        return f"Slice({self.target}[{self.start}:{self.end}])"
+
+
+class IndexAssignmentNode:
+    def __init__(self, target, index, value):
+        self.target = target
+        self.index = index
+        self.value = value
+
+        self.pos_start = target.pos_start
+        self.pos_end = value.pos_end
+
+    def __repr__(self):
+        return f"IndexAssignment({self.target}[{self.index}], value={self.value})"
+
+
 class VariableAccessNode:
     def __init__(self, tok):
         self.tok = tok
@@ -155,6 +194,19 @@ class ForNode:
         return f"ForNode(var_name={self.var_name}, start={self.start}, end={self.end}, step={self.step}, body={self.body})"
 
 
+class ForEachNode:
+    def __init__(self, var_name, iterable, body):
+        self.var_name = var_name
+        self.iterable = iterable
+        self.body = body
+
+        self.pos_start = var_name.pos_start
+        self.pos_end = body[-1].pos_end if body else iterable.pos_end
+
+    def __repr__(self):
+        return f"ForEachNode(var_name={self.var_name}, iterable={self.iterable}, body={self.body})"
+
+
 class WhileNode:
     def __init__(self, condition, body):
         self.condition = condition
@@ -179,6 +231,18 @@ class ListNode:
         return f"ListNode(tok_type={self.type_tok}, elements={self.element_nodes})"
 
 
+class MapNode:
+    def __init__(self, entries, pos_start, pos_end):
+        # (key node, value node) pairs in source order
+        self.entries = entries
+
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self):
+        return f"MapNode(entries={self.entries})"
+
+
 class ReturnNode:
     def __init__(self, node_to_return, pos_start, pos_end):
         self.node_to_return = node_to_return
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "funlang", "build")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_toolchain_versions = {}
+
+
+def toolchain_version(tools=("clang",)):
+    """`--version` output of the build tools, queried once per process"""
+    tools = tuple(tools)
+    if tools not in _toolchain_versions:
+        versions = []
+        for tool in tools:
+            try:
+                result = subprocess.run([tool, "--version"], capture_output=True, text=True)
+                versions.append(result.stdout.strip())
+            except FileNotFoundError:
+                versions.append(f"{tool}: not found")
+        _toolchain_versions[tools] = "\n".join(versions)
+    return _toolchain_versions[tools]
+
+
+class BuildCache:
+    """Content-addressed store of built executables, bounded in size with LRU eviction.
+
+    Entries are keyed by a hash of everything that determines the output: the IR,
+    the target triple, the optimization level and the toolchain (LLVM and linker)
+    version. A hit refreshes the entry's modification time, which is what
+    eviction orders by.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get("FUNLANG_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.last_hit = None
+
+    @staticmethod
+    def key(llvm_ir, triple, opt_level, toolchain):
+        digest = hashlib.sha256()
+        for part in (llvm_ir, triple, str(opt_level), toolchain):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def fetch(self, key, destination):
+        """Copy the cached executable for `key` to destination; False on a miss"""
+        path = self.entry_path(key)
+        try:
+            shutil.copy(path, destination)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            self.last_hit = False
+            return False
+        self.hits += 1
+        self.last_hit = True
+        return True
+
+    def store(self, key, source):
+        """Add a freshly built executable to the cache, then evict down to max_bytes"""
+        os.makedirs(self.directory, exist_ok=True)
+        # Write under a temporary name so concurrent builds never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copy(source, temp_path)
+            os.replace(temp_path, self.entry_path(key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.startswith("."):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
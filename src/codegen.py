@@ -1,11 +1,27 @@
 from llvmlite import ir, binding
 import llvmlite.binding as llvm
-from src.token import TokenType, KeywordType
-from src.ast_nodes import NumberNode, BinaryOperationNode, ListNode, FunctionCallNode, StringNode, VariableDeclarationNode, VariableAccessNode, VariableAssignmentNode, IfNode, UnaryOperationNode, ForNode, WhileNode, BreakNode, ContinueNode, FunctionDeclarationNode, ReturnNode
+from src.token import Token, TokenType, KeywordType
+from src.ast_nodes import NumberNode, BinaryOperationNode, ListNode, MapNode, FunctionCallNode, StringNode, VariableDeclarationNode, VariableAccessNode, VariableAssignmentNode, IndexNode, SliceNode, IndexAssignmentNode, IfNode, UnaryOperationNode, ForNode, ForEachNode, WhileNode, BreakNode, ContinueNode, FunctionDeclarationNode, ReturnNode
+from src.type_inference import TypeInference, ListType, MapType, INT, FLOAT, BOOL, STRING, MAIN, MAP_BUILTINS, mangle
 
 
 class CodeGenerator:
-    def __init__(self):
+    # Inliner threshold per optimization level (matches clang's -O2/-O3 defaults)
+    INLINING_THRESHOLDS = {2: 225, 3: 275}
+
+    # Size of the stdout buffer print() writes into
+    OUTPUT_BUFFER_SIZE = 64 * 1024
+
+    # Slots in the hash index of a new map (always a power of two)
+    MAP_INITIAL_CAPACITY = 8
+
+    def __init__(self, opt_level=0, type_feedback=None):
+        if opt_level not in (0, 1, 2, 3):
+            raise Exception(f"Invalid optimization level: {opt_level}")
+        self.opt_level = opt_level
+        # Runtime types recorded by the interpreter, for what static inference leaves open
+        self.type_feedback = type_feedback
+
         # Initialize LLVM
         llvm.initialize()
         llvm.initialize_native_target()
@@ -18,41 +34,68 @@ class CodeGenerator:
         target = llvm.Target.from_default_triple()
         self.module.triple = target.triple
 
-        # Symbol tables
+        # Symbol tables; functions holds one entry per specialization, under its mangled name
         self.global_vars = {}
         self.local_vars = {}
         self.functions = {}
+        self.function_nodes = {}
+
+        # Interned string constants, one global per distinct byte string
+        self.constant_pool = {}
+
+        # Runtime support functions (fl_*), generated on first use
+        self.runtime_functions = {}
+
+        # Output buffer and its fill level, created by the first print
+        self.output_buffer = None
+        self.output_length = None
+
+        # Set to 1 by an out of bounds list access or integer overflow in generate_function()
+        self.error_flag = None
 
         # Loop context stack for break/continue
         self.loop_stack = []
 
+        # (list variable, index variable) pointer pairs an enclosing for loop proves in bounds
+        self.in_bounds = set()
+
         # Function context for tracking current function
         self.current_function = None
         self.function_stack = []
 
+        # Inferred types, filled in by generate(); `scope` names the function being emitted
+        self.types = None
+        self.scope = MAIN
+
         # Setup types
         self.int_type = ir.IntType(64)
         self.float_type = ir.DoubleType()
         self.char_ptr_type = ir.IntType(8).as_pointer()
         self.bool_type = ir.IntType(1)
 
-        # List type: struct containing length and pointer to elements
+        # List type: struct containing length, capacity and pointer to elements
         # For simplicity, all list elements are i64 (can hold int, float as bits, or pointer)
+        # A capacity of 0 marks a borrowed view: the buffer belongs to someone else and
+        # must be copied before it is grown, and is never freed through this value
         self.list_element_type = self.int_type
         self.list_type = ir.LiteralStructType(
-            [self.int_type, self.list_element_type.as_pointer()])
+            [self.int_type, self.int_type, self.list_element_type.as_pointer()])
+
+        # Maps are pointers to a shared header, so every copy sees set() and remove().
+        # Entries are stored densely in insertion order (keys, values and a live flag
+        # per entry); an open-addressing index of `capacity` slots maps hashes to
+        # entries, holding 0 for empty, -1 for a removed entry or entry number + 1.
+        # Fields: size, entry count (including removed), capacity, string keys flag,
+        # index, keys, values, live flags.
+        self.map_struct = ir.LiteralStructType(
+            [self.int_type] * 4 + [self.int_type.as_pointer()] * 3 + [ir.IntType(8).as_pointer()])
+        self.map_type = self.map_struct.as_pointer()
 
         # Declare double pow(double, double)
         pow_type = ir.FunctionType(
             self.float_type, [self.float_type, self.float_type])
         self.pow_func = ir.Function(self.module, pow_type, name="pow")
 
-        # Declare printf function
-        printf_func_type = ir.FunctionType(
-            ir.IntType(32), [self.char_ptr_type], var_arg=True)
-        self.printf_func = ir.Function(
-            self.module, printf_func_type, name="printf")
-
         # Declare malloc and free for dynamic list allocation
         malloc_func_type = ir.FunctionType(self.char_ptr_type, [self.int_type])
         self.malloc_func = ir.Function(
@@ -61,6 +104,14 @@ class CodeGenerator:
         free_func_type = ir.FunctionType(ir.VoidType(), [self.char_ptr_type])
         self.free_func = ir.Function(self.module, free_func_type, name="free")
 
+        realloc_func_type = ir.FunctionType(
+            self.char_ptr_type, [self.char_ptr_type, self.int_type])
+        self.realloc_func = ir.Function(
+            self.module, realloc_func_type, name="realloc")
+
+        self.memcpy_func = self.module.declare_intrinsic(
+            'llvm.memcpy', [self.char_ptr_type, self.char_ptr_type, self.int_type])
+
         # Create main function
         func_type = ir.FunctionType(self.int_type, [])
         self.main_func = ir.Function(self.module, func_type, name="main")
@@ -70,21 +121,169 @@ class CodeGenerator:
         self.builder = ir.IRBuilder(entry_block)
 
     def generate(self, ast_node):
+        self.types = TypeInference(self.type_feedback).infer(ast_node)
+
         # Handle ListNode wrapper from parser
         if isinstance(ast_node, ListNode):
             last_result = None
             for stmt in ast_node.element_nodes:
                 # Process supported node types
-                if isinstance(stmt, (NumberNode, BinaryOperationNode, ListNode, FunctionCallNode, VariableDeclarationNode, VariableAccessNode, VariableAssignmentNode, IfNode, UnaryOperationNode, ForNode, WhileNode, BreakNode, ContinueNode, FunctionDeclarationNode, ReturnNode)):
+                if isinstance(stmt, (NumberNode, BinaryOperationNode, ListNode, FunctionCallNode, VariableDeclarationNode, VariableAccessNode, VariableAssignmentNode, IndexNode, SliceNode, IndexAssignmentNode, IfNode, UnaryOperationNode, ForNode, ForEachNode, WhileNode, BreakNode, ContinueNode, FunctionDeclarationNode, ReturnNode)):
                     last_result = self.visit(stmt)
         else:
             last_result = self.visit(ast_node)
 
-        # Return 0 from main
+        # Return 0 from main, writing out whatever is still buffered
         if not self.builder.block.is_terminated:
+            if self.output_buffer is not None:
+                self.call_runtime('fl_out_flush', [])
             self.builder.ret(ir.Constant(self.int_type, 0))
 
-        return str(self.module)
+        return str(self.optimize(str(self.module)))
+
+    def generate_function(self, node, param_types):
+        """Compile one function on its own, specialized for param_types, to be called from Python.
+
+        The module also defines `<mangled>.entry(i64* args, i64* result) -> i64`, with a
+        signature ctypes can call: every argument is read from args as one i64 (floats
+        as their bits, lists as length, capacity and data pointer), the result is
+        stored the same way, and it returns 1 if an out of bounds list access or
+        integer overflow happened, 0 otherwise. Returns (llvm_ir, mangled name).
+        """
+        func_name = node.name.value
+        param_types = tuple(param_types)
+        self.types = TypeInference().infer_function(node, param_types)
+        self.function_nodes[func_name] = node
+
+        self.error_flag = ir.GlobalVariable(self.module, self.int_type, name="fl_error")
+        self.error_flag.initializer = ir.Constant(self.int_type, 0)
+        self.error_flag.linkage = 'internal'
+
+        mangled = mangle(func_name, param_types)
+        function = self.specialize(func_name, mangled)
+        self.builder.ret(ir.Constant(self.int_type, 0))
+
+        slot_type = self.int_type.as_pointer()
+        entry = ir.Function(self.module, ir.FunctionType(self.int_type, [slot_type, slot_type]),
+                            name=f"{mangled}.entry")
+        self.current_function = entry
+        self.builder = ir.IRBuilder(entry.append_basic_block('entry'))
+        args_ptr, result_ptr = entry.args
+        self.builder.store(ir.Constant(self.int_type, 0), self.error_flag)
+
+        def slot(base, index):
+            return self.builder.gep(base, [ir.Constant(self.int_type, index)])
+
+        args = []
+        index = 0
+        for param_type in self.types.param_types(mangled):
+            if isinstance(param_type, ListType):
+                # Lists come in as borrowed views of memory the caller owns
+                data = self.builder.inttoptr(self.builder.load(slot(args_ptr, index + 2)),
+                                             self.list_element_type.as_pointer())
+                args.append(self.build_list(self.builder.load(slot(args_ptr, index)),
+                                            ir.Constant(self.int_type, 0), data))
+                index += 3
+            else:
+                args.append(self.from_list_element(self.builder.load(slot(args_ptr, index)), param_type))
+                index += 1
+
+        result = self.builder.call(function, args)
+        if result.type == self.list_type:
+            length, capacity, data = self.list_fields(result)
+            self.builder.store(length, slot(result_ptr, 0))
+            self.builder.store(capacity, slot(result_ptr, 1))
+            self.builder.store(self.builder.ptrtoint(data, self.int_type), slot(result_ptr, 2))
+        else:
+            self.builder.store(self.to_list_element(result), slot(result_ptr, 0))
+        self.builder.ret(self.builder.load(self.error_flag))
+
+        return str(self.optimize(str(self.module))), mangled
+
+    def optimize(self, llvm_ir):
+        """Parse and verify generated IR, then run the pipeline for self.opt_level over it.
+
+        -O1 promotes allocas to SSA registers (SROA/mem2reg) and runs instcombine and
+        CFG simplification; -O2 adds GVN, the loop passes (rotate, LICM, indvars,
+        unroll), the inliner and the loop vectorizer; -O3 raises the inlining
+        threshold and turns on SLP vectorization.
+        """
+        module = llvm.parse_assembly(llvm_ir)
+        module.verify()
+        if self.opt_level == 0:
+            return module
+
+        target_machine = llvm.Target.from_default_triple().create_target_machine(opt=self.opt_level)
+        module.data_layout = str(target_machine.target_data)
+
+        pass_manager_builder = llvm.create_pass_manager_builder()
+        pass_manager_builder.opt_level = self.opt_level
+        pass_manager_builder.loop_vectorize = self.opt_level >= 2
+        pass_manager_builder.slp_vectorize = self.opt_level >= 3
+        if self.opt_level in self.INLINING_THRESHOLDS:
+            pass_manager_builder.inlining_threshold = self.INLINING_THRESHOLDS[self.opt_level]
+
+        pass_manager = llvm.create_module_pass_manager()
+        target_machine.add_analysis_passes(pass_manager)
+        pass_manager.add_target_library_info(module.triple)
+        pass_manager_builder.populate(pass_manager)
+        pass_manager.run(module)
+        return module
+
+    @staticmethod
+    def emit_object(llvm_ir, opt_level=0):
+        """Compile IR to a native object file for the host in-process, returning its bytes"""
+        llvm.initialize()
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+
+        module = llvm.parse_assembly(llvm_ir)
+        module.verify()
+        # Position-independent, so the object links into the PIE executables compilers default to
+        target_machine = llvm.Target.from_default_triple().create_target_machine(
+            opt=opt_level, reloc='pic')
+        return target_machine.emit_object(module)
+
+    def llvm_type(self, value_type):
+        """LLVM type used for an inferred FunLang type (int when nothing is known)"""
+        if value_type is None:
+            return self.int_type
+        if isinstance(value_type, ListType):
+            return self.list_type
+        if isinstance(value_type, MapType):
+            return self.map_type
+        return {INT: self.int_type, FLOAT: self.float_type, BOOL: self.bool_type,
+                STRING: self.char_ptr_type}[value_type]
+
+    def type_of(self, node):
+        return self.types.type_of(self.scope, node)
+
+    def convert(self, value, target_type):
+        """Convert a value to target_type where FunLang allows it implicitly"""
+        if value.type == target_type:
+            return value
+        if target_type == self.float_type:
+            if value.type == self.int_type:
+                return self.builder.sitofp(value, self.float_type)
+            if value.type == self.bool_type:
+                return self.builder.uitofp(value, self.float_type)
+        elif target_type == self.int_type:
+            if value.type == self.bool_type:
+                return self.builder.zext(value, self.int_type)
+            if value.type == self.float_type:
+                return self.builder.fptosi(value, self.int_type)
+        elif target_type == self.bool_type and value.type in (self.int_type, self.float_type):
+            return self._to_boolean(value)
+        raise Exception(f"Cannot convert {value.type} to {target_type}")
+
+    def entry_alloca(self, llvm_type, name):
+        """Stack slot in the current function's entry block.
+
+        Allocas anywhere else run every time their block does, growing the stack
+        inside loops, and are not promoted to registers by mem2reg.
+        """
+        with self.builder.goto_entry_block():
+            return self.builder.alloca(llvm_type, name=name)
 
     def visit(self, node):
         method_name = f"visit_{type(node).__name__}"
@@ -100,18 +299,25 @@ class CodeGenerator:
         else:
             return ir.Constant(self.float_type, float(node.tok.value))
 
+    def constant_string(self, value):
+        """Pointer to a null-terminated global holding `value`, shared by every use in the module"""
+        data = bytearray((value + '\0').encode('utf-8'))
+        key = bytes(data)
+        if key not in self.constant_pool:
+            string_const = ir.Constant(ir.ArrayType(ir.IntType(8), len(data)), data)
+            string_global = ir.GlobalVariable(
+                self.module, string_const.type, name=f"str_{len(self.constant_pool)}")
+            string_global.initializer = string_const
+            string_global.global_constant = True
+            string_global.unnamed_addr = True
+
+            # A constant GEP can be used from any function
+            zero = ir.Constant(ir.IntType(32), 0)
+            self.constant_pool[key] = string_global.gep([zero, zero])
+        return self.constant_pool[key]
+
     def visit_StringNode(self, node):
-        # Create a global string constant
-        string_val = node.tok.value + '\0'  # Null terminate
-        string_const = ir.Constant(ir.ArrayType(ir.IntType(8), len(
-            string_val)), bytearray(string_val.encode('utf-8')))
-        string_global = ir.GlobalVariable(
-            self.module, string_const.type, name=f"str_{len(self.module.globals)}")
-        string_global.initializer = string_const
-        string_global.global_constant = True
-
-        # Get pointer to the string
-        return self.builder.gep(string_global, [ir.Constant(ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
+        return self.constant_string(node.tok.value)
 
     def visit_ListNode(self, node):
         # Create list with elements
@@ -119,25 +325,14 @@ class CodeGenerator:
 
         # Allocate memory for list elements
         if num_elements > 0:
-            # Allocate array for elements
-            # 8 bytes per element (i64)
-            element_size = ir.Constant(self.int_type, 8)
-            array_size = self.builder.mul(ir.Constant(
-                self.int_type, num_elements), element_size)
-            elements_ptr = self.builder.call(self.malloc_func, [array_size])
-            elements_ptr = self.builder.bitcast(
-                elements_ptr, self.list_element_type.as_pointer())
+            elements_ptr = self.allocate_elements(
+                ir.Constant(self.int_type, num_elements))
 
             # Store each element
+            element_type = self.llvm_type(self.list_element(self.type_of(node)))
             for i, element_node in enumerate(node.element_nodes):
-                element_val = self.visit(element_node)
-
-                # Convert element to i64 if needed
-                if element_val.type == self.float_type:
-                    element_val = self.builder.bitcast(
-                        element_val, self.int_type)
-                elif element_val.type == self.bool_type:
-                    element_val = self.builder.zext(element_val, self.int_type)
+                element_val = self.convert(self.visit(element_node), element_type)
+                element_val = self.to_list_element(element_val)
 
                 # Store element at index i
                 element_ptr = self.builder.gep(
@@ -149,46 +344,42 @@ class CodeGenerator:
                 self.list_element_type.as_pointer(), None)
 
         # Create list structure
-        list_struct = ir.Constant(self.list_type, ir.Undefined)
-        list_struct = self.builder.insert_value(
-            list_struct, ir.Constant(self.int_type, num_elements), 0)
-        list_struct = self.builder.insert_value(list_struct, elements_ptr, 1)
-
-        return list_struct
+        size = ir.Constant(self.int_type, num_elements)
+        return self.build_list(size, size, elements_ptr)
 
     def visit_FunctionCallNode(self, node):
         # Extract function name
         func_name = node.name.tok.value if hasattr(
             node.name, 'tok') else node.name.value
 
-        # Handle built-in functions
-        if func_name == "print":
-            return self.handle_print_call(node)
+        # Handle built-in functions, unless the program declares a function of the same name
+        if func_name not in self.function_nodes:
+            if func_name == "print":
+                return self.handle_print_call(node)
+            if func_name == "len":
+                return self.handle_len_call(node)
+            if func_name in MAP_BUILTINS:
+                return self.handle_map_call(func_name, node)
+            if func_name == "slice":
+                if len(node.args) != 3:
+                    raise Exception("slice() expects exactly three arguments")
+                return self.slice_value(*[self.visit(arg) for arg in node.args])
 
         # Handle user-defined functions
-        if func_name in self.functions:
-            func = self.functions[func_name]
+        if func_name in self.function_nodes:
+            declaration = self.function_nodes[func_name]
 
             # Generate arguments
-            args = []
-            for arg_node in node.args:
-                arg_val = self.visit(arg_node)
-                # Keep lists as-is, convert other types to int64 for simplicity
-                if arg_val.type == self.list_type:
-                    args.append(arg_val)
-                elif arg_val.type == self.float_type:
-                    arg_val = self.builder.fptosi(arg_val, self.int_type)
-                    args.append(arg_val)
-                elif arg_val.type == self.bool_type:
-                    arg_val = self.builder.zext(arg_val, self.int_type)
-                    args.append(arg_val)
-                else:
-                    args.append(arg_val)
+            args = [self.visit(arg_node) for arg_node in node.args]
 
             # Check argument count
-            if len(args) != len(func.args):
+            if len(args) != len(declaration.args):
                 raise Exception(
-                    f"Function '{func_name}' expects {len(func.args)} arguments, got {len(args)}")
+                    f"Function '{func_name}' expects {len(declaration.args)} arguments, got {len(args)}")
+
+            # Call the copy of the function compiled for these argument types
+            func = self.specialize(func_name, self.types.call_target(self.scope, node))
+            args = [self.convert(arg, param.type) for arg, param in zip(args, func.args)]
 
             # Call function
             return self.builder.call(func, args)
@@ -196,168 +387,121 @@ class CodeGenerator:
         else:
             raise Exception(f"Function '{func_name}' not defined")
 
+    def handle_len_call(self, node):
+        if len(node.args) != 1:
+            raise Exception("len() expects exactly one argument")
+
+        arg = self.visit(node.args[0])
+        if arg.type == self.list_type:
+            return self.builder.extract_value(arg, 0)
+        if arg.type == self.char_ptr_type:
+            return self.builder.call(self.libc_function('strlen'), [arg])
+        if arg.type == self.map_type:
+            return self.builder.load(self.map_field(arg, 0))
+        raise Exception(f"len() not supported for type {arg.type}")
+
+    # Value kinds fl_print_map is told to print, by map value type
+    MAP_VALUE_KINDS = {INT: 0, FLOAT: 1, STRING: 2}
+
+    def map_field(self, map_val, index):
+        """Pointer to field `index` of a map's header"""
+        return self.builder.gep(map_val, [ir.Constant(ir.IntType(32), 0), ir.Constant(ir.IntType(32), index)])
+
+    def map_value_type(self, map_type):
+        """Value type of an inferred map type (int when unknown)"""
+        value_type = map_type.value if isinstance(map_type, MapType) else None
+        if value_type is None:
+            return INT
+        if value_type not in self.MAP_VALUE_KINDS:
+            raise Exception(f"Maps of {value_type} values are not supported in compiled code")
+        return value_type
+
+    def map_key(self, key):
+        """i64 form of a map key, which must be an int or a string"""
+        if key.type not in (self.int_type, self.bool_type, self.char_ptr_type):
+            raise Exception(f"Map keys must be ints or strings in compiled code, got {key.type}")
+        return self.to_list_element(key)
+
+    def map_set(self, map_val, key, value, value_type):
+        """Insert or overwrite the entry for key (returns the map)"""
+        if key.type == self.char_ptr_type:
+            # Maps created empty learn that their keys are strings from the first set()
+            self.builder.store(ir.Constant(self.int_type, 1), self.map_field(map_val, 3))
+        value = self.convert(value, self.llvm_type(value_type))
+        return self.call_runtime('fl_map_set', [map_val, self.map_key(key), self.to_list_element(value)])
+
+    def visit_MapNode(self, node):
+        map_type = self.type_of(node)
+        value_type = self.map_value_type(map_type)
+        string_keys = 1 if map_type.key == STRING else 0
+        if map_type.key not in (None, INT, STRING):
+            raise Exception(f"Map keys must be ints or strings in compiled code, got {map_type.key}")
+
+        map_val = self.call_runtime('fl_map_new', [ir.Constant(self.int_type, string_keys)])
+        for key_node, value_node in node.entries:
+            self.map_set(map_val, self.visit(key_node), self.visit(value_node), value_type)
+        return map_val
+
+    def handle_map_call(self, func_name, node):
+        arg_counts = {"get": 2, "set": 3, "has": 2, "remove": 2, "keys": 1}
+        if len(node.args) != arg_counts[func_name]:
+            raise Exception(f"{func_name}() expects exactly {arg_counts[func_name]} arguments")
+
+        map_type = self.type_of(node.args[0])
+        map_val = self.visit(node.args[0])
+        if map_val.type != self.map_type:
+            raise Exception(f"{func_name}() expects a map, got {map_val.type}")
+        if func_name == "keys":
+            return self.call_runtime('fl_map_keys', [map_val])
+
+        key = self.visit(node.args[1])
+        if func_name == "set":
+            return self.map_set(map_val, key, self.visit(node.args[2]), self.map_value_type(map_type))
+        if func_name == "remove":
+            return self.call_runtime('fl_map_remove', [map_val, self.map_key(key)])
+        if func_name == "has":
+            found = self.call_runtime('fl_map_has', [map_val, self.map_key(key)])
+            return self.builder.icmp_signed('!=', found, ir.Constant(self.int_type, 0))
+        if key.type == self.char_ptr_type:
+            # A map that is still empty only learns its keys are strings here, for the error message
+            self.builder.store(ir.Constant(self.int_type, 1), self.map_field(map_val, 3))
+        value = self.call_runtime('fl_map_get', [map_val, self.map_key(key)])
+        return self.from_list_element(value, self.map_value_type(map_type))
+
     def handle_print_call(self, node):
         if len(node.args) != 1:
             raise Exception("print() expects exactly one argument")
 
         arg = self.visit(node.args[0])
 
-        # Handle different argument types
+        # Handle different argument types; output matches printf's %ld, %.6f and %s
         if arg.type == self.int_type:
-            # Print integer with format "%ld\n"
-            fmt_str = "%ld\n\0"
-            fmt_const = ir.Constant(ir.ArrayType(ir.IntType(
-                8), len(fmt_str)), bytearray(fmt_str.encode('utf-8')))
-            fmt_global = ir.GlobalVariable(
-                self.module, fmt_const.type, name=f"fmt_{len(self.module.globals)}")
-            fmt_global.initializer = fmt_const
-            fmt_global.global_constant = True
-            fmt_ptr = self.builder.gep(fmt_global, [ir.Constant(
-                ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
-
-            self.builder.call(self.printf_func, [fmt_ptr, arg])
+            self.call_runtime('fl_out_int', [arg])
+            self.write_output("\n")
         elif arg.type == self.float_type:
-            # Print float with format "%.6f\n"
-            fmt_str = "%.6f\n\0"
-            fmt_const = ir.Constant(ir.ArrayType(ir.IntType(
-                8), len(fmt_str)), bytearray(fmt_str.encode('utf-8')))
-            fmt_global = ir.GlobalVariable(
-                self.module, fmt_const.type, name=f"fmt_{len(self.module.globals)}")
-            fmt_global.initializer = fmt_const
-            fmt_global.global_constant = True
-            fmt_ptr = self.builder.gep(fmt_global, [ir.Constant(
-                ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
-
-            self.builder.call(self.printf_func, [fmt_ptr, arg])
+            self.call_runtime('fl_out_float', [arg])
+            self.write_output("\n")
         elif arg.type == self.char_ptr_type:
-            # Print string with format "%s\n"
-            fmt_str = "%s\n\0"
-            fmt_const = ir.Constant(ir.ArrayType(ir.IntType(
-                8), len(fmt_str)), bytearray(fmt_str.encode('utf-8')))
-            fmt_global = ir.GlobalVariable(
-                self.module, fmt_const.type, name=f"fmt_{len(self.module.globals)}")
-            fmt_global.initializer = fmt_const
-            fmt_global.global_constant = True
-            fmt_ptr = self.builder.gep(fmt_global, [ir.Constant(
-                ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
-
-            self.builder.call(self.printf_func, [fmt_ptr, arg])
+            self.call_runtime('fl_out_string', [arg])
+            self.write_output("\n")
         elif arg.type == self.bool_type:
             # Print boolean as integer (0 or 1)
             arg = self.builder.zext(arg, self.int_type)  # zero-extend to i64
-
-            # Then print as integer
-            fmt_str = "%ld\n\0"
-            fmt_const = ir.Constant(ir.ArrayType(ir.IntType(
-                8), len(fmt_str)), bytearray(fmt_str.encode('utf-8')))
-            fmt_global = ir.GlobalVariable(
-                self.module, fmt_const.type, name=f"fmt_{len(self.module.globals)}")
-            fmt_global.initializer = fmt_const
-            fmt_global.global_constant = True
-            fmt_ptr = self.builder.gep(fmt_global, [ir.Constant(
-                ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
-
-            self.builder.call(self.printf_func, [fmt_ptr, arg])
+            self.call_runtime('fl_out_int', [arg])
+            self.write_output("\n")
         elif arg.type == self.list_type:
             # Print list with format "[element1, element2, ...]\n"
-            # Extract list length and elements pointer
-            list_length = self.builder.extract_value(arg, 0)
-            elements_ptr = self.builder.extract_value(arg, 1)
-
-            # Print opening bracket
-            fmt_str = "[\0"
-            fmt_const = ir.Constant(ir.ArrayType(ir.IntType(8), len(
-                fmt_str)), bytearray(fmt_str.encode('utf-8')))
-            fmt_global = ir.GlobalVariable(
-                self.module, fmt_const.type, name=f"fmt_{len(self.module.globals)}")
-            fmt_global.initializer = fmt_const
-            fmt_global.global_constant = True
-            fmt_ptr = self.builder.gep(fmt_global, [ir.Constant(
-                ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
-            self.builder.call(self.printf_func, [fmt_ptr])
-
-            # Create loop to print elements
-            current_func = self.current_function if self.current_function else self.main_func
-            loop_start = current_func.append_basic_block('print_list_loop')
-            loop_body = current_func.append_basic_block('print_list_body')
-            loop_end = current_func.append_basic_block('print_list_end')
-
-            # Create loop counter
-            with self.builder.goto_entry_block():
-                counter_ptr = self.builder.alloca(
-                    self.int_type, name="list_print_counter")
-            self.builder.store(ir.Constant(self.int_type, 0), counter_ptr)
-
-            self.builder.branch(loop_start)
-
-            # Loop condition
-            self.builder.position_at_end(loop_start)
-            counter = self.builder.load(counter_ptr)
-            condition = self.builder.icmp_signed('<', counter, list_length)
-            self.builder.cbranch(condition, loop_body, loop_end)
-
-            # Loop body - print element
-            self.builder.position_at_end(loop_body)
-            counter = self.builder.load(counter_ptr)
-
-            # Print comma separator if not first element
-            zero = ir.Constant(self.int_type, 0)
-            is_first = self.builder.icmp_signed('==', counter, zero)
-            comma_block = current_func.append_basic_block('print_comma')
-            no_comma_block = current_func.append_basic_block('no_comma')
-            self.builder.cbranch(is_first, no_comma_block, comma_block)
-
-            # Print comma
-            self.builder.position_at_end(comma_block)
-            comma_str = ", \0"
-            comma_const = ir.Constant(ir.ArrayType(ir.IntType(8), len(
-                comma_str)), bytearray(comma_str.encode('utf-8')))
-            comma_global = ir.GlobalVariable(
-                self.module, comma_const.type, name=f"fmt_{len(self.module.globals)}")
-            comma_global.initializer = comma_const
-            comma_global.global_constant = True
-            comma_ptr = self.builder.gep(comma_global, [ir.Constant(
-                ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
-            self.builder.call(self.printf_func, [comma_ptr])
-            self.builder.branch(no_comma_block)
-
-            # Print element
-            self.builder.position_at_end(no_comma_block)
-            counter = self.builder.load(counter_ptr)
-            element_ptr = self.builder.gep(elements_ptr, [counter])
-            element_val = self.builder.load(element_ptr)
-
-            # Print element as integer
-            elem_fmt_str = "%ld\0"
-            elem_fmt_const = ir.Constant(ir.ArrayType(ir.IntType(8), len(
-                elem_fmt_str)), bytearray(elem_fmt_str.encode('utf-8')))
-            elem_fmt_global = ir.GlobalVariable(
-                self.module, elem_fmt_const.type, name=f"fmt_{len(self.module.globals)}")
-            elem_fmt_global.initializer = elem_fmt_const
-            elem_fmt_global.global_constant = True
-            elem_fmt_ptr = self.builder.gep(elem_fmt_global, [ir.Constant(
-                ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
-            self.builder.call(self.printf_func, [elem_fmt_ptr, element_val])
-
-            # Increment counter
-            counter = self.builder.load(counter_ptr)
-            next_counter = self.builder.add(
-                counter, ir.Constant(self.int_type, 1))
-            self.builder.store(next_counter, counter_ptr)
-            self.builder.branch(loop_start)
-
-            # Print closing bracket and newline
-            self.builder.position_at_end(loop_end)
-            close_str = "]\n\0"
-            close_const = ir.Constant(ir.ArrayType(ir.IntType(8), len(
-                close_str)), bytearray(close_str.encode('utf-8')))
-            close_global = ir.GlobalVariable(
-                self.module, close_const.type, name=f"fmt_{len(self.module.globals)}")
-            close_global.initializer = close_const
-            close_global.global_constant = True
-            close_ptr = self.builder.gep(close_global, [ir.Constant(
-                ir.IntType(32), 0), ir.Constant(ir.IntType(32), 0)])
-            self.builder.call(self.printf_func, [close_ptr])
+            element = self.list_element(self.type_of(node.args[0]))
+            if element == FLOAT:
+                self.call_runtime('fl_print_float_list', [arg])
+            elif element == STRING:
+                self.call_runtime('fl_print_string_list', [arg])
+            else:
+                self.call_runtime('fl_print_list', [arg])
+        elif arg.type == self.map_type:
+            # Print map with format "{key1: value1, ...}\n"
+            value_kind = self.MAP_VALUE_KINDS[self.map_value_type(self.type_of(node.args[0]))]
+            self.call_runtime('fl_print_map', [arg, ir.Constant(self.int_type, value_kind)])
         else:
             raise Exception(f"Cannot print type: {arg.type}")
 
@@ -367,10 +511,14 @@ class CodeGenerator:
     def visit_VariableDeclarationNode(self, node):
         var_name = node.tok.value
         value = self.visit(node.value)
+        value = self.convert(value, self.llvm_type(self.type_of(node)))
+
+        # Every list variable owns its buffer
+        if value.type == self.list_type and not self.is_fresh_list(node.value):
+            value = self.list_own(value)
 
         # Allocate space for the variable in the entry block
-        with self.builder.goto_entry_block():
-            var_ptr = self.builder.alloca(value.type, name=var_name)
+        var_ptr = self.entry_alloca(value.type, var_name)
 
         # Store the value
         self.builder.store(value, var_ptr)
@@ -387,27 +535,130 @@ class CodeGenerator:
             raise Exception(f"Variable '{var_name}' not defined")
 
         var_ptr = self.local_vars[var_name]
-        return self.builder.load(var_ptr, name=var_name)
+        value = self.builder.load(var_ptr, name=var_name)
+
+        # Reads of a list variable are views of the buffer the variable owns
+        if value.type == self.list_type:
+            value = self.list_borrow(value)
+        return value
 
     def visit_VariableAssignmentNode(self, node):
         var_name = node.tok.value
-        value = self.visit(node.value)
 
         if var_name not in self.local_vars:
             raise Exception(f"Variable '{var_name}' not defined")
 
         var_ptr = self.local_vars[var_name]
+
+        # xs = xs + element: the old value of xs is dead, so grow its buffer in place
+        if (var_ptr.type.pointee == self.list_type
+                and isinstance(node.value, BinaryOperationNode)
+                and node.value.op.type == TokenType.PLUS
+                and isinstance(node.value.left, VariableAccessNode)
+                and node.value.left.tok.value == var_name):
+            element = self.visit(node.value.right)
+            if element.type == self.list_type:
+                raise Exception(
+                    "List + operation requires list on left and element on right")
+            element_type = self.list_element(self.type_of(node))
+            element = self.convert(element, self.llvm_type(element_type))
+            value = self.list_push(self.builder.load(var_ptr), element)
+            self.builder.store(value, var_ptr)
+            return value
+
+        value = self.convert(self.visit(node.value), var_ptr.type.pointee)
+
+        # The variable's previous buffer is unreachable once it is overwritten
+        if value.type == self.list_type and var_ptr.type.pointee == self.list_type:
+            if not self.is_fresh_list(node.value):
+                value = self.list_own(value)
+            self.list_release(self.builder.load(var_ptr))
+
         self.builder.store(value, var_ptr)
 
         return value
 
+    def visit_IndexNode(self, node):
+        list_val = self.visit(node.target)
+        index = self.visit(node.index)
+        if list_val.type != self.list_type or index.type != self.int_type:
+            raise Exception("Indexing requires a list and an integer index")
+        element = self.list_access_at_index(list_val, index, checked=not self.index_in_bounds(node), strict=True)
+        return self.from_list_element(element, self.type_of(node))
+
+    def visit_SliceNode(self, node):
+        target = self.visit(node.target)
+        start = self.visit(node.start) if node.start else None
+        end = self.visit(node.end) if node.end else None
+        return self.slice_value(target, start, end)
+
+    def slice_value(self, value, start, end):
+        """xs[start:end] as a view into the list's buffer, or s[start:end] as a substring.
+
+        List slices are (length, 0, elements + start): the buffer is shared, not
+        copied, and binding the view to a variable copies it like any other view.
+        String bounds count characters, not bytes, as in the interpreter. Suffixes
+        of a string share its bytes too; other substrings are copied out to get
+        their terminator.
+        """
+        if value.type == self.list_type:
+            length = self.builder.extract_value(value, 0)
+        elif value.type == self.char_ptr_type:
+            length = self.call_runtime('fl_utf8_length', [value])
+        else:
+            raise Exception(f"Cannot slice {value.type}")
+        if any(bound is not None and bound.type != self.int_type for bound in (start, end)):
+            raise Exception("Slice bounds must be integers")
+
+        start = self.slice_bound(start, length, ir.Constant(self.int_type, 0))
+        end = self.slice_bound(end, length, length)
+        end = self.builder.select(self.builder.icmp_signed('<', end, start), start, end)
+
+        if value.type == self.char_ptr_type:
+            return self.call_runtime('fl_string_slice', [value, start, end, length])
+        elements = self.builder.gep(self.builder.extract_value(value, 2), [start])
+        return self.build_list(self.builder.sub(end, start), ir.Constant(self.int_type, 0), elements)
+
+    def slice_bound(self, bound, length, default):
+        """A slice bound clamped to [0, length], counting negative bounds from the end"""
+        if bound is None:
+            return default
+        zero = ir.Constant(self.int_type, 0)
+        bound = self.builder.select(self.builder.icmp_signed('<', bound, zero),
+                                    self.builder.add(bound, length), bound)
+        bound = self.builder.select(self.builder.icmp_signed('<', bound, zero), zero, bound)
+        return self.builder.select(self.builder.icmp_signed('>', bound, length), length, bound)
+
+    def visit_IndexAssignmentNode(self, node):
+        list_val = self.visit(node.target)
+        index = self.visit(node.index)
+        if list_val.type != self.list_type or index.type != self.int_type:
+            raise Exception("Indexed assignment requires a list and an integer index")
+        element_type = self.list_element(self.type_of(node.target))
+        value = self.convert(self.visit(node.value), self.llvm_type(element_type))
+
+        # Lists are passed as views of their buffer, so the store is seen by every holder of it
+        self.list_store_at_index(list_val, index, self.to_list_element(value), checked=not self.index_in_bounds(node))
+        return value
+
+    def index_in_bounds(self, node):
+        """Whether xs[i] is known to be in bounds: i is the variable of a for loop over len(xs)"""
+        return (isinstance(node.target, VariableAccessNode)
+                and isinstance(node.index, VariableAccessNode)
+                and (self.local_vars.get(node.target.tok.value),
+                     self.local_vars.get(node.index.tok.value)) in self.in_bounds)
+
     def visit_BinaryOperationNode(self, node):
         left = self.visit(node.left)
         right = self.visit(node.right)
 
         # Handle list operations
         if left.type == self.list_type or right.type == self.list_type:
-            return self.handle_list_operation(node.op.type, left, right)
+            in_bounds = (isinstance(node.left, VariableAccessNode)
+                         and isinstance(node.right, VariableAccessNode)
+                         and (self.local_vars.get(node.left.tok.value),
+                              self.local_vars.get(node.right.tok.value)) in self.in_bounds)
+            return self.handle_list_operation(node.op.type, left, right, self.type_of(node), in_bounds)
 
         # Type promotion if needed
         if left.type != right.type:
@@ -419,6 +670,8 @@ class CodeGenerator:
         result_type = left.type
 
         if result_type == self.int_type:
+            if self.error_flag is not None and node.op.type in self.CHECKED_INT_OPERATIONS:
+                return self.checked_int_operation(self.CHECKED_INT_OPERATIONS[node.op.type], left, right)
             if node.op.type == TokenType.PLUS:
                 return self.builder.add(left, right)
             elif node.op.type == TokenType.MINUS:
@@ -432,6 +685,18 @@ class CodeGenerator:
                 right = self.builder.sitofp(right, self.float_type)
                 result = self.builder.call(self.pow_func, [left, right])
                 return self.builder.fptosi(result, self.int_type)
+            elif node.op.type in (TokenType.MODULO, TokenType.FLOOR_DIVIDE):
+                return self.int_floor_division(node.op.type, left, right)
+            elif node.op.type == TokenType.BIT_AND:
+                return self.builder.and_(left, right)
+            elif node.op.type == TokenType.BIT_OR:
+                return self.builder.or_(left, right)
+            elif node.op.type == TokenType.BIT_XOR:
+                return self.builder.xor(left, right)
+            elif node.op.type == TokenType.SHIFT_LEFT:
+                return self.shift_left(left, right)
+            elif node.op.type == TokenType.SHIFT_RIGHT:
+                return self.shift_right(left, right)
             elif node.op.type == TokenType.EE:
                 return self.builder.icmp_signed("==", left, right)
             elif node.op.type == TokenType.NE:
@@ -456,6 +721,8 @@ class CodeGenerator:
                 return self.builder.fdiv(left, right)
             elif node.op.type == TokenType.POWER:
                 return self.builder.call(self.pow_func, [left, right])
+            elif node.op.type in (TokenType.MODULO, TokenType.FLOOR_DIVIDE):
+                return self.float_floor_division(node.op.type, left, right)
             elif node.op.type == TokenType.EE:
                 return self.builder.fcmp_ordered("==", left, right)
             elif node.op.type == TokenType.NE:
@@ -476,12 +743,92 @@ class CodeGenerator:
 
         raise Exception(f"Unsupported binary operation: {node.op.type}")
 
-    def handle_list_operation(self, op_type, left, right):
-        """Handle list-specific binary operations"""
+    # Overflow-checked versions of integer operations, used when error_flag is set
+    CHECKED_INT_OPERATIONS = {TokenType.PLUS: 'sadd', TokenType.MINUS: 'ssub', TokenType.MULTIPLY: 'smul'}
+
+    def checked_int_operation(self, operation, left, right):
+        """Integer arithmetic that sets error_flag when the result does not fit in 64 bits"""
+        intrinsic = self.module.declare_intrinsic(
+            f'llvm.{operation}.with.overflow', [self.int_type],
+            ir.FunctionType(ir.LiteralStructType([self.int_type, self.bool_type]), [self.int_type, self.int_type]))
+        result = self.builder.call(intrinsic, [left, right])
+        overflow = self.builder.zext(self.builder.extract_value(result, 1), self.int_type)
+        self.builder.store(self.builder.or_(self.builder.load(self.error_flag), overflow), self.error_flag)
+        return self.builder.extract_value(result, 0)
+
+    def flag_error(self, condition):
+        """Set error_flag when an i1 condition holds"""
+        flag = self.builder.or_(self.builder.load(self.error_flag), self.builder.zext(condition, self.int_type))
+        self.builder.store(flag, self.error_flag)
+
+    def int_floor_division(self, op_type, left, right):
+        """left % right or left // right with the quotient rounded down, as the interpreter does"""
+        zero = ir.Constant(self.int_type, 0)
+        one = ir.Constant(self.int_type, 1)
+        if self.error_flag is not None:
+            # Division by zero and INT64_MIN // -1 have no 64-bit result
+            invalid = self.builder.or_(
+                self.builder.icmp_signed('==', right, zero),
+                self.builder.and_(self.builder.icmp_signed('==', right, ir.Constant(self.int_type, -1)),
+                                  self.builder.icmp_signed('==', left, ir.Constant(self.int_type, -(1 << 63)))))
+            self.flag_error(invalid)
+            right = self.builder.select(invalid, one, right)
+
+        # srem and sdiv truncate: step down when the remainder's sign differs from the divisor's
+        remainder = self.builder.srem(left, right)
+        adjust = self.builder.and_(
+            self.builder.icmp_signed('!=', remainder, zero),
+            self.builder.icmp_signed('<', self.builder.xor(remainder, right), zero))
+        if op_type == TokenType.MODULO:
+            return self.builder.select(adjust, self.builder.add(remainder, right), remainder)
+        quotient = self.builder.sdiv(left, right)
+        return self.builder.select(adjust, self.builder.sub(quotient, one), quotient)
+
+    def float_floor_division(self, op_type, left, right):
+        """left % right or left // right on floats, computed the way Python does"""
+        zero = ir.Constant(self.float_type, 0.0)
+        if self.error_flag is not None:
+            self.flag_error(self.builder.fcmp_ordered('==', right, zero))
+
+        remainder = self.builder.frem(left, right)
+        adjust = self.builder.and_(
+            self.builder.fcmp_ordered('!=', remainder, zero),
+            self.builder.xor(self.builder.fcmp_ordered('<', remainder, zero),
+                             self.builder.fcmp_ordered('<', right, zero)))
+        if op_type == TokenType.MODULO:
+            return self.builder.select(adjust, self.builder.fadd(remainder, right), remainder)
+        # (left - remainder) / right is within rounding of a whole number
+        quotient = self.builder.fdiv(self.builder.fsub(left, remainder), right)
+        quotient = self.builder.select(adjust, self.builder.fsub(quotient, ir.Constant(self.float_type, 1.0)), quotient)
+        round_func = self.module.declare_intrinsic('llvm.round', [self.float_type])
+        return self.builder.call(round_func, [quotient])
+
+    def shift_left(self, left, right):
+        """left << right, where shifting every bit out gives 0 rather than poison"""
+        in_range = self.builder.icmp_unsigned('<', right, ir.Constant(self.int_type, 64))
+        count = self.builder.select(in_range, right, ir.Constant(self.int_type, 0))
+        shifted = self.builder.shl(left, count)
+        if self.error_flag is not None:
+            # Negative counts, and bits shifted out of 64, have no native result
+            lost_bits = self.builder.icmp_signed('!=', self.builder.ashr(shifted, count), left)
+            self.flag_error(self.builder.or_(self.builder.not_(in_range), lost_bits))
+        return self.builder.select(in_range, shifted, ir.Constant(self.int_type, 0))
+
+    def shift_right(self, left, right):
+        """Arithmetic left >> right; counts of 64 and over shift in the sign bit everywhere"""
+        in_range = self.builder.icmp_unsigned('<', right, ir.Constant(self.int_type, 64))
+        if self.error_flag is not None:
+            self.flag_error(self.builder.icmp_signed('<', right, ir.Constant(self.int_type, 0)))
+        return self.builder.ashr(left, self.builder.select(in_range, right, ir.Constant(self.int_type, 63)))
+
+    def handle_list_operation(self, op_type, left, right, result_type=None, in_bounds=False):
+        """Handle list-specific binary operations (result_type is the inferred type of the
+        result; in_bounds means an index is already known to be valid)"""
         if op_type == TokenType.PLUS:
             # list + element -> append element to list
             if left.type == self.list_type and right.type != self.list_type:
-                return self.list_append(left, right)
+                element_type = self.llvm_type(self.list_element(result_type))
+                return self.list_append(left, self.convert(right, element_type))
             else:
                 raise Exception(
                     "List + operation requires list on left and element on right")
@@ -504,7 +851,8 @@ class CodeGenerator:
         elif op_type == TokenType.DIVIDE:
             # list / index -> access element at index
             if left.type == self.list_type and right.type == self.int_type:
-                return self.list_access_at_index(left, right)
+                element = self.list_access_at_index(left, right, checked=not in_bounds)
+                return self.from_list_element(element, result_type)
             else:
                 raise Exception(
                     "List / operation requires list on left and integer index on right")
@@ -512,317 +860,1147 @@ class CodeGenerator:
         else:
             raise Exception(f"Unsupported list operation: {op_type}")
 
-    def list_append(self, list_val, element):
-        """Append an element to a list (returns new list)"""
-        # Extract current list info
-        current_length = self.builder.extract_value(list_val, 0)
-        current_elements = self.builder.extract_value(list_val, 1)
+    def list_fields(self, list_val):
+        """Split a list into its (length, capacity, elements) fields"""
+        return (self.builder.extract_value(list_val, 0),
+                self.builder.extract_value(list_val, 1),
+                self.builder.extract_value(list_val, 2))
 
-        # Calculate new length
-        new_length = self.builder.add(
-            current_length, ir.Constant(self.int_type, 1))
-
-        # Allocate memory for new list
-        element_size = ir.Constant(self.int_type, 8)  # 8 bytes per element
-        new_array_size = self.builder.mul(new_length, element_size)
-        new_elements_ptr = self.builder.call(
-            self.malloc_func, [new_array_size])
-        new_elements_ptr = self.builder.bitcast(
-            new_elements_ptr, self.list_element_type.as_pointer())
+    def build_list(self, length, capacity, elements_ptr):
+        """Pack (length, capacity, elements) into a list struct"""
+        new_list = ir.Constant(self.list_type, ir.Undefined)
+        new_list = self.builder.insert_value(new_list, length, 0)
+        new_list = self.builder.insert_value(new_list, capacity, 1)
+        return self.builder.insert_value(new_list, elements_ptr, 2)
 
-        # Copy existing elements if any
+    def empty_list(self):
         zero = ir.Constant(self.int_type, 0)
-        has_elements = self.builder.icmp_signed('>', current_length, zero)
+        return self.build_list(zero, zero, ir.Constant(self.list_element_type.as_pointer(), None))
+
+    def list_element(self, list_type):
+        """Element type of an inferred list type (int when unknown)"""
+        if isinstance(list_type, ListType) and list_type.element is not None:
+            return list_type.element
+        return INT
+
+    def to_list_element(self, value):
+        """Convert a value to the i64 representation stored in lists"""
+        if value.type == self.float_type:
+            return self.builder.bitcast(value, self.int_type)
+        elif value.type == self.bool_type:
+            return self.builder.zext(value, self.int_type)
+        elif value.type in (self.char_ptr_type, self.map_type):
+            return self.builder.ptrtoint(value, self.int_type)
+        return value
 
-        current_func = self.current_function if self.current_function else self.main_func
-        copy_block = current_func.append_basic_block('copy_elements')
-        append_block = current_func.append_basic_block('append_element')
+    def from_list_element(self, element, element_type):
+        """Reinterpret an i64 list slot as a value of element_type"""
+        if element_type == FLOAT:
+            return self.builder.bitcast(element, self.float_type)
+        elif element_type == STRING:
+            return self.builder.inttoptr(element, self.char_ptr_type)
+        elif isinstance(element_type, MapType):
+            return self.builder.inttoptr(element, self.map_type)
+        return element
+
+    def allocate_elements(self, count):
+        """malloc room for `count` list elements"""
+        size = self.builder.mul(count, ir.Constant(self.int_type, 8))
+        elements_ptr = self.builder.call(self.malloc_func, [size])
+        return self.builder.bitcast(elements_ptr, self.list_element_type.as_pointer())
+
+    def copy_elements(self, dst, src, count):
+        """Copy `count` elements from src to dst"""
+        size = self.builder.mul(count, ir.Constant(self.int_type, 8))
+        self.builder.call(self.memcpy_func, [
+            self.builder.bitcast(dst, self.char_ptr_type),
+            self.builder.bitcast(src, self.char_ptr_type),
+            size, ir.Constant(self.bool_type, 0)])
+
+    def grown_capacity(self, length):
+        """Capacity to grow a full list of `length` elements to: double it, at least 4"""
+        doubled = self.builder.mul(length, ir.Constant(self.int_type, 2))
+        minimum = ir.Constant(self.int_type, 4)
+        return self.builder.select(
+            self.builder.icmp_signed('<', doubled, minimum), minimum, doubled)
+
+    def list_borrow(self, list_val):
+        """View of a list that shares its buffer without owning it"""
+        return self.builder.insert_value(list_val, ir.Constant(self.int_type, 0), 1)
+
+    # Runtime support library: list and print helpers are emitted once per module as
+    # internal functions and called from every use site, leaving inlining to the optimizer
+    RUNTIME_FUNCTIONS = {
+        'fl_out_write': ('void', ['string', 'int'], 'emit_out_write'),
+        'fl_out_flush': ('void', [], 'emit_out_flush'),
+        'fl_out_bytes': ('void', ['string', 'int'], 'emit_out_bytes'),
+        'fl_out_string': ('void', ['string'], 'emit_out_string'),
+        'fl_out_int': ('void', ['int'], 'emit_out_int'),
+        'fl_out_float': ('void', ['float'], 'emit_out_float'),
+        'fl_list_own': ('list', ['list'], 'emit_list_own'),
+        'fl_list_push': ('list', ['list', 'int'], 'emit_list_push'),
+        'fl_list_append': ('list', ['list', 'int'], 'emit_list_append'),
+        'fl_list_concat': ('list', ['list', 'list'], 'emit_list_concat'),
+        'fl_list_remove': ('list', ['list', 'int'], 'emit_list_remove'),
+        'fl_print_list': ('void', ['list'], 'emit_print_list'),
+        'fl_print_float_list': ('void', ['list'], 'emit_print_float_list'),
+        'fl_print_string_list': ('void', ['list'], 'emit_print_string_list'),
+        'fl_map_new': ('map', ['int'], 'emit_map_new'),
+        'fl_map_hash': ('int', ['map', 'int'], 'emit_map_hash'),
+        'fl_map_probe': ('int', ['map', 'int'], 'emit_map_probe'),
+        'fl_map_grow': ('void', ['map'], 'emit_map_grow'),
+        'fl_map_get': ('int', ['map', 'int'], 'emit_map_get'),
+        'fl_map_has': ('int', ['map', 'int'], 'emit_map_has'),
+        'fl_map_set': ('map', ['map', 'int', 'int'], 'emit_map_set'),
+        'fl_map_remove': ('map', ['map', 'int'], 'emit_map_remove'),
+        'fl_map_keys': ('list', ['map'], 'emit_map_keys'),
+        'fl_print_map': ('void', ['map', 'int'], 'emit_print_map'),
+        'fl_string_slice': ('string', ['string', 'int', 'int', 'int'], 'emit_string_slice'),
+        'fl_utf8_length': ('int', ['string'], 'emit_utf8_length'),
+        'fl_runtime_error': ('void', ['string'], 'emit_runtime_error'),
+        'fl_key_not_found': ('void', ['map', 'int'], 'emit_key_not_found'),
+    }
+
+    def runtime_function(self, name):
+        """Declare and emit the runtime function `name` the first time it is needed"""
+        if name in self.runtime_functions:
+            return self.runtime_functions[name]
+
+        types = {'int': self.int_type, 'float': self.float_type, 'string': self.char_ptr_type,
+                 'list': self.list_type, 'map': self.map_type, 'void': ir.VoidType()}
+        return_type, arg_types, emitter = self.RUNTIME_FUNCTIONS[name]
+        func_type = ir.FunctionType(types[return_type], [types[t] for t in arg_types])
+        func = ir.Function(self.module, func_type, name=name)
+        func.linkage = 'internal'
+        self.runtime_functions[name] = func
+
+        # Emit the body with its own builder, then return to the call site
+        old_builder = self.builder
+        old_function = self.current_function
+        self.current_function = func
+        self.builder = ir.IRBuilder(func.append_basic_block('entry'))
 
-        self.builder.cbranch(has_elements, copy_block, append_block)
+        result = getattr(self, emitter)(*func.args)
+        if return_type == 'void':
+            self.builder.ret_void()
+        else:
+            self.builder.ret(result)
 
-        # Copy existing elements
-        self.builder.position_at_end(copy_block)
-        # Simple loop to copy elements
-        counter_ptr = self.builder.alloca(self.int_type, name="copy_counter")
-        self.builder.store(zero, counter_ptr)
+        self.builder = old_builder
+        self.current_function = old_function
+        return func
 
-        copy_loop = current_func.append_basic_block('copy_loop')
-        copy_body = current_func.append_basic_block('copy_body')
-        self.builder.branch(copy_loop)
+    def call_runtime(self, name, args):
+        return self.builder.call(self.runtime_function(name), args)
+
+    # C library functions besides the ones every module declares, declared on first use
+    LIBC_FUNCTIONS = {
+        'strlen': ('int', ['string'], False),
+        'strcmp': ('i32', ['string', 'string'], False),
+        'calloc': ('string', ['int', 'int'], False),
+        'write': ('int', ['i32', 'string', 'int'], False),
+        'snprintf': ('i32', ['string', 'int', 'string'], True),
+        'exit': ('void', ['i32'], False),
+    }
+
+    def libc_function(self, name):
+        function = self.module.globals.get(name)
+        if function is None:
+            types = {'int': self.int_type, 'i32': ir.IntType(32), 'string': self.char_ptr_type,
+                     'void': ir.VoidType()}
+            return_type, arg_types, var_arg = self.LIBC_FUNCTIONS[name]
+            func_type = ir.FunctionType(types[return_type], [types[t] for t in arg_types], var_arg=var_arg)
+            function = ir.Function(self.module, func_type, name=name)
+        return function
+
+    def is_fresh_list(self, node):
+        """Whether a list-valued node always produces a list that owns a new buffer"""
+        # Function results are not: a function can hand back a list parameter it borrowed
+        return isinstance(node, (ListNode, BinaryOperationNode))
+
+    def list_own(self, list_val):
+        """Return a list that owns its buffer, copying it if list_val is a borrowed view"""
+        return self.call_runtime('fl_list_own', [list_val])
+
+    def list_push(self, list_val, element):
+        """Append in place to a list whose old value is dead"""
+        return self.call_runtime('fl_list_push', [list_val, self.to_list_element(element)])
 
-        # Copy loop condition
-        self.builder.position_at_end(copy_loop)
-        counter = self.builder.load(counter_ptr)
-        copy_condition = self.builder.icmp_signed('<', counter, current_length)
-        self.builder.cbranch(copy_condition, copy_body, append_block)
+    def list_append(self, list_val, element):
+        """Append an element to a list (returns new list)"""
+        return self.call_runtime('fl_list_append', [list_val, self.to_list_element(element)])
 
-        # Copy loop body
-        self.builder.position_at_end(copy_body)
-        counter = self.builder.load(counter_ptr)
+    def list_concatenate(self, left_list, right_list):
+        """Concatenate two lists (returns new list)"""
+        return self.call_runtime('fl_list_concat', [left_list, right_list])
 
-        # Load from old array
-        old_element_ptr = self.builder.gep(current_elements, [counter])
-        old_element = self.builder.load(old_element_ptr)
+    def list_remove_at_index(self, list_val, index):
+        """Remove element at index from list (returns new list)"""
+        return self.call_runtime('fl_list_remove', [list_val, index])
 
-        # Store to new array
-        new_element_ptr = self.builder.gep(new_elements_ptr, [counter])
-        self.builder.store(old_element, new_element_ptr)
+    def emit_list_own(self, list_val):
+        """Body of fl_list_own: return a list that owns its buffer, copying it if list_val is a borrowed view"""
+        length, capacity, elements = self.list_fields(list_val)
+        zero = ir.Constant(self.int_type, 0)
+        borrowed = self.builder.and_(
+            self.builder.icmp_signed('==', capacity, zero),
+            self.builder.icmp_signed('>', length, zero))
 
-        # Increment counter
-        next_counter = self.builder.add(counter, ir.Constant(self.int_type, 1))
-        self.builder.store(next_counter, counter_ptr)
-        self.builder.branch(copy_loop)
+        current_func = self.current_function if self.current_function else self.main_func
+        start_block = self.builder.block
+        copy_block = current_func.append_basic_block('own_copy')
+        end_block = current_func.append_basic_block('own_end')
+        self.builder.cbranch(borrowed, copy_block, end_block)
 
-        # Append new element
-        self.builder.position_at_end(append_block)
+        self.builder.position_at_end(copy_block)
+        copied_list = self.allocate_elements(length)
+        self.copy_elements(copied_list, elements, length)
+        copied = self.build_list(length, length, copied_list)
+        self.builder.branch(end_block)
 
-        # Convert element to i64 if needed
-        converted_element = element
-        if element.type == self.float_type:
-            converted_element = self.builder.bitcast(element, self.int_type)
-        elif element.type == self.bool_type:
-            converted_element = self.builder.zext(element, self.int_type)
+        self.builder.position_at_end(end_block)
+        result = self.builder.phi(self.list_type)
+        result.add_incoming(list_val, start_block)
+        result.add_incoming(copied, copy_block)
+        return result
 
-        # Store new element at the end
-        last_index = self.builder.sub(
-            new_length, ir.Constant(self.int_type, 1))
-        last_element_ptr = self.builder.gep(new_elements_ptr, [last_index])
-        self.builder.store(converted_element, last_element_ptr)
+    def list_release(self, list_val):
+        """Free the buffer of a list that is no longer reachable, if it owns one"""
+        _, capacity, elements = self.list_fields(list_val)
+        owned = self.builder.icmp_signed('>', capacity, ir.Constant(self.int_type, 0))
+        elements = self.builder.bitcast(elements, self.char_ptr_type)
+        self.builder.call(self.free_func, [self.builder.select(
+            owned, elements, ir.Constant(self.char_ptr_type, None))])
 
-        # Create new list struct
-        new_list = ir.Constant(self.list_type, ir.Undefined)
-        new_list = self.builder.insert_value(new_list, new_length, 0)
-        new_list = self.builder.insert_value(new_list, new_elements_ptr, 1)
+    def emit_list_push(self, list_val, element):
+        """Body of fl_list_push: append in place to a list whose old value is dead (amortized O(1))"""
+        length, capacity, elements = self.list_fields(list_val)
 
-        return new_list
+        current_func = self.current_function if self.current_function else self.main_func
+        start_block = self.builder.block
+        grow_block = current_func.append_basic_block('push_grow')
+        store_block = current_func.append_basic_block('push_store')
 
-    def list_concatenate(self, left_list, right_list):
-        """Concatenate two lists (returns new list)"""
-        # Extract list info
-        left_length = self.builder.extract_value(left_list, 0)
-        left_elements = self.builder.extract_value(left_list, 1)
-        right_length = self.builder.extract_value(right_list, 0)
-        right_elements = self.builder.extract_value(right_list, 1)
+        has_room = self.builder.icmp_signed('<', length, capacity)
+        self.builder.cbranch(has_room, store_block, grow_block)
 
-        # Calculate total length
-        total_length = self.builder.add(left_length, right_length)
+        # Out of room: realloc an owned buffer, or move a borrowed one into a new buffer
+        self.builder.position_at_end(grow_block)
+        new_capacity = self.grown_capacity(length)
+        zero = ir.Constant(self.int_type, 0)
+        owned = self.builder.icmp_signed('>', capacity, zero)
+        old_buffer = self.builder.bitcast(elements, self.char_ptr_type)
+        new_buffer = self.builder.call(self.realloc_func, [
+            self.builder.select(owned, old_buffer, ir.Constant(self.char_ptr_type, None)),
+            self.builder.mul(new_capacity, ir.Constant(self.int_type, 8))])
+        grown_elements = self.builder.bitcast(new_buffer, self.list_element_type.as_pointer())
+        self.copy_elements(grown_elements, elements, self.builder.select(owned, zero, length))
+        self.builder.branch(store_block)
+
+        self.builder.position_at_end(store_block)
+        elements_ptr = self.builder.phi(self.list_element_type.as_pointer())
+        elements_ptr.add_incoming(elements, start_block)
+        elements_ptr.add_incoming(grown_elements, grow_block)
+        final_capacity = self.builder.phi(self.int_type)
+        final_capacity.add_incoming(capacity, start_block)
+        final_capacity.add_incoming(new_capacity, grow_block)
+
+        element_ptr = self.builder.gep(elements_ptr, [length])
+        self.builder.store(self.to_list_element(element), element_ptr)
+        new_length = self.builder.add(length, ir.Constant(self.int_type, 1))
+        return self.build_list(new_length, final_capacity, elements_ptr)
+
+    def emit_list_append(self, list_val, element):
+        """Body of fl_list_append: append an element to a list (returns new list)"""
+        current_length, _, current_elements = self.list_fields(list_val)
+        new_length = self.builder.add(
+            current_length, ir.Constant(self.int_type, 1))
 
-        # Allocate memory for new list
-        element_size = ir.Constant(self.int_type, 8)
-        new_array_size = self.builder.mul(total_length, element_size)
-        new_elements_ptr = self.builder.call(
-            self.malloc_func, [new_array_size])
-        new_elements_ptr = self.builder.bitcast(
-            new_elements_ptr, self.list_element_type.as_pointer())
+        # Leave room to keep growing the copy in place
+        new_capacity = self.grown_capacity(current_length)
+        new_elements_ptr = self.allocate_elements(new_capacity)
+        self.copy_elements(new_elements_ptr, current_elements, current_length)
 
-        # Copy left list elements
-        zero = ir.Constant(self.int_type, 0)
-        current_func = self.current_function if self.current_function else self.main_func
+        # Store new element at the end
+        last_element_ptr = self.builder.gep(new_elements_ptr, [current_length])
+        self.builder.store(self.to_list_element(element), last_element_ptr)
 
-        # Copy left elements
-        left_counter_ptr = self.builder.alloca(
-            self.int_type, name="left_copy_counter")
-        self.builder.store(zero, left_counter_ptr)
+        return self.build_list(new_length, new_capacity, new_elements_ptr)
 
-        left_copy_loop = current_func.append_basic_block('left_copy_loop')
-        left_copy_body = current_func.append_basic_block('left_copy_body')
-        right_copy_start = current_func.append_basic_block('right_copy_start')
+    def emit_list_concat(self, left_list, right_list):
+        """Body of fl_list_concat: concatenate two lists (returns new list)"""
+        left_length, _, left_elements = self.list_fields(left_list)
+        right_length, _, right_elements = self.list_fields(right_list)
 
-        self.builder.branch(left_copy_loop)
+        total_length = self.builder.add(left_length, right_length)
+        new_elements_ptr = self.allocate_elements(total_length)
 
-        # Left copy loop
-        self.builder.position_at_end(left_copy_loop)
-        left_counter = self.builder.load(left_counter_ptr)
-        left_condition = self.builder.icmp_signed(
-            '<', left_counter, left_length)
-        self.builder.cbranch(left_condition, left_copy_body, right_copy_start)
+        self.copy_elements(new_elements_ptr, left_elements, left_length)
+        right_start = self.builder.gep(new_elements_ptr, [left_length])
+        self.copy_elements(right_start, right_elements, right_length)
 
-        self.builder.position_at_end(left_copy_body)
-        left_counter = self.builder.load(left_counter_ptr)
+        return self.build_list(total_length, total_length, new_elements_ptr)
 
-        left_element_ptr = self.builder.gep(left_elements, [left_counter])
-        left_element = self.builder.load(left_element_ptr)
+    def emit_list_remove(self, list_val, index):
+        """Body of fl_list_remove: remove element at index from list (returns new list)"""
+        current_length, _, current_elements = self.list_fields(list_val)
 
-        new_element_ptr = self.builder.gep(new_elements_ptr, [left_counter])
-        self.builder.store(left_element, new_element_ptr)
+        # An out of bounds index removes nothing
+        zero = ir.Constant(self.int_type, 0)
+        one = ir.Constant(self.int_type, 1)
+        index_valid = self.builder.and_(
+            self.builder.icmp_signed('>=', index, zero),
+            self.builder.icmp_signed('<', index, current_length)
+        )
+        before = self.builder.select(index_valid, index, current_length)
+        after = self.builder.select(
+            index_valid, self.builder.sub(self.builder.sub(current_length, index), one), zero)
+        new_length = self.builder.add(before, after)
 
-        next_left_counter = self.builder.add(
-            left_counter, ir.Constant(self.int_type, 1))
-        self.builder.store(next_left_counter, left_counter_ptr)
-        self.builder.branch(left_copy_loop)
+        # Copy the elements before and after the removed one
+        new_elements_ptr = self.allocate_elements(new_length)
+        self.copy_elements(new_elements_ptr, current_elements, before)
+        self.copy_elements(
+            self.builder.gep(new_elements_ptr, [before]),
+            self.builder.gep(current_elements, [self.builder.add(before, one)]),
+            after)
 
-        # Copy right elements
-        self.builder.position_at_end(right_copy_start)
-        right_counter_ptr = self.builder.alloca(
-            self.int_type, name="right_copy_counter")
-        self.builder.store(zero, right_counter_ptr)
+        return self.build_list(new_length, new_length, new_elements_ptr)
 
-        right_copy_loop = current_func.append_basic_block('right_copy_loop')
-        right_copy_body = current_func.append_basic_block('right_copy_body')
-        concat_end = current_func.append_basic_block('concat_end')
+    def emit_print_float_list(self, list_val):
+        """Body of fl_print_float_list: print a list of floats"""
+        self.emit_print_list(list_val, FLOAT)
 
-        self.builder.branch(right_copy_loop)
+    def emit_print_string_list(self, list_val):
+        """Body of fl_print_string_list: print a list of strings"""
+        self.emit_print_list(list_val, STRING)
 
-        self.builder.position_at_end(right_copy_loop)
-        right_counter = self.builder.load(right_counter_ptr)
-        right_condition = self.builder.icmp_signed(
-            '<', right_counter, right_length)
-        self.builder.cbranch(right_condition, right_copy_body, concat_end)
+    def emit_print_list(self, list_val, element_type=INT):
+        """Body of fl_print_list: print a list as [element1, element2, ...] and a newline"""
+        list_length, _, elements_ptr = self.list_fields(list_val)
 
-        self.builder.position_at_end(right_copy_body)
-        right_counter = self.builder.load(right_counter_ptr)
+        # Print opening bracket
+        self.write_output("[")
 
-        right_element_ptr = self.builder.gep(right_elements, [right_counter])
-        right_element = self.builder.load(right_element_ptr)
+        # Create loop to print elements
+        current_func = self.current_function if self.current_function else self.main_func
+        loop_start = current_func.append_basic_block('print_list_loop')
+        loop_body = current_func.append_basic_block('print_list_body')
+        loop_end = current_func.append_basic_block('print_list_end')
 
-        # Calculate position in new array (left_length + right_counter)
-        new_index = self.builder.add(left_length, right_counter)
-        new_element_ptr = self.builder.gep(new_elements_ptr, [new_index])
-        self.builder.store(right_element, new_element_ptr)
+        # Create loop counter
+        counter_ptr = self.entry_alloca(self.int_type, "list_print_counter")
+        self.builder.store(ir.Constant(self.int_type, 0), counter_ptr)
 
-        next_right_counter = self.builder.add(
-            right_counter, ir.Constant(self.int_type, 1))
-        self.builder.store(next_right_counter, right_counter_ptr)
-        self.builder.branch(right_copy_loop)
+        self.builder.branch(loop_start)
 
-        # Create new list struct
-        self.builder.position_at_end(concat_end)
-        new_list = ir.Constant(self.list_type, ir.Undefined)
-        new_list = self.builder.insert_value(new_list, total_length, 0)
-        new_list = self.builder.insert_value(new_list, new_elements_ptr, 1)
+        # Loop condition
+        self.builder.position_at_end(loop_start)
+        counter = self.builder.load(counter_ptr)
+        condition = self.builder.icmp_signed('<', counter, list_length)
+        self.builder.cbranch(condition, loop_body, loop_end)
 
-        return new_list
+        # Loop body - print element
+        self.builder.position_at_end(loop_body)
+        counter = self.builder.load(counter_ptr)
 
-    def list_remove_at_index(self, list_val, index):
-        """Remove element at index from list (returns new list)"""
-        # Extract list info
-        current_length = self.builder.extract_value(list_val, 0)
-        current_elements = self.builder.extract_value(list_val, 1)
+        # Print comma separator if not first element
+        zero = ir.Constant(self.int_type, 0)
+        is_first = self.builder.icmp_signed('==', counter, zero)
+        comma_block = current_func.append_basic_block('print_comma')
+        no_comma_block = current_func.append_basic_block('no_comma')
+        self.builder.cbranch(is_first, no_comma_block, comma_block)
+
+        # Print comma
+        self.builder.position_at_end(comma_block)
+        self.write_output(", ")
+        self.builder.branch(no_comma_block)
+
+        # Print element
+        self.builder.position_at_end(no_comma_block)
+        counter = self.builder.load(counter_ptr)
+        element_ptr = self.builder.gep(elements_ptr, [counter])
+        element_val = self.builder.load(element_ptr)
 
-        # Check bounds
+        # Print element in its own format
+        element_writers = {INT: 'fl_out_int', FLOAT: 'fl_out_float', STRING: 'fl_out_string'}
+        element_val = self.from_list_element(element_val, element_type)
+        self.call_runtime(element_writers[element_type], [element_val])
+
+        # Increment counter
+        counter = self.builder.load(counter_ptr)
+        next_counter = self.builder.add(
+            counter, ir.Constant(self.int_type, 1))
+        self.builder.store(next_counter, counter_ptr)
+        self.builder.branch(loop_start)
+
+        # Print closing bracket and newline
+        self.builder.position_at_end(loop_end)
+        self.write_output("]\n")
+
+    # Maps: an insertion-ordered table of entries plus an open-addressing hash
+    # index with linear probing. Removing an entry leaves a tombstone in the
+    # index that is dropped when the table next grows, which also compacts the
+    # entries. The index is kept at most 3/4 full, counting tombstones.
+
+    def map_arrays(self, capacity):
+        """Fresh (index, keys, values, live flags) arrays for a map of `capacity` slots"""
+        eight = ir.Constant(self.int_type, 8)
+        index = self.builder.bitcast(
+            self.builder.call(self.libc_function('calloc'), [capacity, eight]), self.int_type.as_pointer())
+        return (index, self.allocate_elements(capacity), self.allocate_elements(capacity),
+                self.builder.call(self.malloc_func, [capacity]))
+
+    def store_map_arrays(self, map_val, arrays):
+        for field, array in zip((4, 5, 6, 7), arrays):
+            self.builder.store(array, self.map_field(map_val, field))
+
+    def emit_map_new(self, string_keys):
+        """Body of fl_map_new: allocate an empty map"""
+        size = ir.Constant(self.int_type, len(self.map_struct.elements) * 8)
+        map_val = self.builder.bitcast(self.builder.call(self.malloc_func, [size]), self.map_type)
         zero = ir.Constant(self.int_type, 0)
-        index_valid = self.builder.and_(
-            self.builder.icmp_signed('>=', index, zero),
-            self.builder.icmp_signed('<', index, current_length)
-        )
+        capacity = ir.Constant(self.int_type, self.MAP_INITIAL_CAPACITY)
+        for field, value in enumerate((zero, zero, capacity, string_keys)):
+            self.builder.store(value, self.map_field(map_val, field))
+        self.store_map_arrays(map_val, self.map_arrays(capacity))
+        return map_val
+
+    def emit_map_hash(self, map_val, key):
+        """Body of fl_map_hash: hash an int key (multiplicative) or a string key (FNV-1a)"""
+        current_func = self.current_function
+        string_block = current_func.append_basic_block('hash_string')
+        loop_block = current_func.append_basic_block('hash_string_loop')
+        body_block = current_func.append_basic_block('hash_string_body')
+        int_block = current_func.append_basic_block('hash_int')
+        end_block = current_func.append_basic_block('hash_end')
+        string_keys = self.builder.load(self.map_field(map_val, 3))
+        self.builder.cbranch(self.builder.icmp_signed('!=', string_keys, ir.Constant(self.int_type, 0)),
+                             string_block, int_block)
+
+        self.builder.position_at_end(int_block)
+        mixed = self.builder.mul(key, ir.Constant(self.int_type, 0x9E3779B97F4A7C15 - 2 ** 64))
+        int_hash = self.builder.xor(mixed, self.builder.lshr(mixed, ir.Constant(self.int_type, 32)))
+        self.builder.branch(end_block)
 
-        current_func = self.current_function if self.current_function else self.main_func
-        valid_block = current_func.append_basic_block('index_valid')
-        error_block = current_func.append_basic_block('index_error')
+        self.builder.position_at_end(string_block)
+        chars = self.builder.inttoptr(key, self.char_ptr_type)
+        self.builder.branch(loop_block)
+
+        self.builder.position_at_end(loop_block)
+        position = self.builder.phi(self.int_type)
+        string_hash = self.builder.phi(self.int_type)
+        char = self.builder.load(self.builder.gep(chars, [position]))
+        self.builder.cbranch(self.builder.icmp_unsigned('==', char, ir.Constant(ir.IntType(8), 0)),
+                             end_block, body_block)
+
+        self.builder.position_at_end(body_block)
+        next_hash = self.builder.mul(self.builder.xor(string_hash, self.builder.zext(char, self.int_type)),
+                                     ir.Constant(self.int_type, 0x100000001B3))
+        next_position = self.builder.add(position, ir.Constant(self.int_type, 1))
+        self.builder.branch(loop_block)
+        position.add_incoming(ir.Constant(self.int_type, 0), string_block)
+        position.add_incoming(next_position, body_block)
+        string_hash.add_incoming(ir.Constant(self.int_type, 0xCBF29CE484222325 - 2 ** 64), string_block)
+        string_hash.add_incoming(next_hash, body_block)
 
-        self.builder.cbranch(index_valid, valid_block, error_block)
+        self.builder.position_at_end(end_block)
+        result = self.builder.phi(self.int_type)
+        result.add_incoming(int_hash, int_block)
+        result.add_incoming(string_hash, loop_block)
+        return result
 
-        # Handle error case - for now just return original list
-        self.builder.position_at_end(error_block)
-        # In a real implementation, we'd throw an exception here
-        # For now, just return the original list
-        self.builder.branch(valid_block)
+    def emit_map_probe(self, map_val, key):
+        """Body of fl_map_probe: index slot holding key's entry, or the empty slot that ends its probe sequence"""
+        current_func = self.current_function
+        zero = ir.Constant(self.int_type, 0)
+        one = ir.Constant(self.int_type, 1)
+        index = self.builder.load(self.map_field(map_val, 4))
+        keys = self.builder.load(self.map_field(map_val, 5))
+        string_keys = self.builder.load(self.map_field(map_val, 3))
+        mask = self.builder.sub(self.builder.load(self.map_field(map_val, 2)), one)
+        start = self.builder.and_(self.call_runtime('fl_map_hash', [map_val, key]), mask)
+        start_block = self.builder.block
+
+        loop_block = current_func.append_basic_block('probe_loop')
+        check_block = current_func.append_basic_block('probe_check')
+        compare_block = current_func.append_basic_block('probe_compare')
+        string_block = current_func.append_basic_block('probe_compare_string')
+        strcmp_block = current_func.append_basic_block('probe_strcmp')
+        next_block = current_func.append_basic_block('probe_next')
+        done_block = current_func.append_basic_block('probe_done')
+        self.builder.branch(loop_block)
+
+        self.builder.position_at_end(loop_block)
+        slot = self.builder.phi(self.int_type)
+        entry = self.builder.load(self.builder.gep(index, [slot]))
+        self.builder.cbranch(self.builder.icmp_signed('==', entry, zero), done_block, check_block)
+
+        # Skip tombstones
+        self.builder.position_at_end(check_block)
+        self.builder.cbranch(self.builder.icmp_signed('>', entry, zero), compare_block, next_block)
+
+        # Equal keys are identical ints, or strings that are the same pointer or compare equal
+        self.builder.position_at_end(compare_block)
+        stored = self.builder.load(self.builder.gep(keys, [self.builder.sub(entry, one)]))
+        self.builder.cbranch(self.builder.icmp_signed('==', stored, key), done_block, string_block)
+
+        self.builder.position_at_end(string_block)
+        self.builder.cbranch(self.builder.icmp_signed('!=', string_keys, zero), strcmp_block, next_block)
+
+        self.builder.position_at_end(strcmp_block)
+        compared = self.builder.call(self.libc_function('strcmp'), [
+            self.builder.inttoptr(stored, self.char_ptr_type), self.builder.inttoptr(key, self.char_ptr_type)])
+        self.builder.cbranch(self.builder.icmp_signed('==', compared, ir.Constant(ir.IntType(32), 0)),
+                             done_block, next_block)
+
+        self.builder.position_at_end(next_block)
+        next_slot = self.builder.and_(self.builder.add(slot, one), mask)
+        self.builder.branch(loop_block)
+        slot.add_incoming(start, start_block)
+        slot.add_incoming(next_slot, next_block)
+
+        self.builder.position_at_end(done_block)
+        return slot
+
+    def map_lookup(self, map_val, key):
+        """(index slot, entry number + 1 or 0 when key is missing) for key"""
+        slot = self.call_runtime('fl_map_probe', [map_val, key])
+        index = self.builder.load(self.map_field(map_val, 4))
+        slot_ptr = self.builder.gep(index, [slot])
+        return slot_ptr, self.builder.load(slot_ptr)
+
+    def emit_map_get(self, map_val, key):
+        """Body of fl_map_get: value stored for key; a missing key stops the program,
+        or gives 0 and sets the error flag in native code called by the interpreter"""
+        _, entry = self.map_lookup(map_val, key)
+        current_func = self.current_function
+        found_block = current_func.append_basic_block('get_found')
+        missing_block = current_func.append_basic_block('get_missing')
+        end_block = current_func.append_basic_block('get_end')
+        self.builder.cbranch(self.builder.icmp_signed('>', entry, ir.Constant(self.int_type, 0)),
+                             found_block, missing_block)
+
+        self.builder.position_at_end(found_block)
+        values = self.builder.load(self.map_field(map_val, 6))
+        value = self.builder.load(self.builder.gep(values, [self.builder.sub(entry, ir.Constant(self.int_type, 1))]))
+        self.builder.branch(end_block)
 
-        # Valid index case
-        self.builder.position_at_end(valid_block)
+        self.builder.position_at_end(missing_block)
+        if self.error_flag is not None:
+            self.builder.store(ir.Constant(self.int_type, 1), self.error_flag)
+        else:
+            self.call_runtime('fl_key_not_found', [map_val, key])
+        self.builder.branch(end_block)
 
-        # Calculate new length
-        new_length = self.builder.sub(
-            current_length, ir.Constant(self.int_type, 1))
+        self.builder.position_at_end(end_block)
+        result = self.builder.phi(self.int_type)
+        result.add_incoming(value, found_block)
+        result.add_incoming(ir.Constant(self.int_type, 0), missing_block)
+        return result
 
-        # Allocate memory for new list (if new_length > 0)
-        has_elements = self.builder.icmp_signed('>', new_length, zero)
+    def emit_key_not_found(self, map_val, key):
+        """Body of fl_key_not_found: stop with the interpreter's error for a missing key"""
+        size = 256
+        message = self.builder.bitcast(self.entry_alloca(ir.ArrayType(ir.IntType(8), size), 'message'),
+                                       self.char_ptr_type)
+        string_keys = self.builder.icmp_signed('!=', self.builder.load(self.map_field(map_val, 3)),
+                                               ir.Constant(self.int_type, 0))
+        with self.builder.if_else(string_keys) as (string_key, int_key):
+            with string_key:
+                self.builder.call(self.libc_function('snprintf'), [
+                    message, ir.Constant(self.int_type, size), self.constant_string("Key not found: %s"),
+                    self.builder.inttoptr(key, self.char_ptr_type)])
+            with int_key:
+                self.builder.call(self.libc_function('snprintf'), [
+                    message, ir.Constant(self.int_type, size), self.constant_string("Key not found: %ld"), key])
+        self.call_runtime('fl_runtime_error', [message])
+
+    def emit_map_has(self, map_val, key):
+        """Body of fl_map_has: 1 if key is in the map, 0 otherwise"""
+        _, entry = self.map_lookup(map_val, key)
+        found = self.builder.icmp_signed('>', entry, ir.Constant(self.int_type, 0))
+        return self.builder.zext(found, self.int_type)
+
+    def emit_map_set(self, map_val, key, value):
+        """Body of fl_map_set: overwrite key's value, or append a new entry (returns the map)"""
+        zero = ir.Constant(self.int_type, 0)
+        one = ir.Constant(self.int_type, 1)
+        slot_ptr, entry = self.map_lookup(map_val, key)
+
+        current_func = self.current_function
+        overwrite_block = current_func.append_basic_block('set_overwrite')
+        insert_block = current_func.append_basic_block('set_insert')
+        grow_block = current_func.append_basic_block('set_grow')
+        store_block = current_func.append_basic_block('set_store')
+        end_block = current_func.append_basic_block('set_end')
+        self.builder.cbranch(self.builder.icmp_signed('>', entry, zero), overwrite_block, insert_block)
+
+        self.builder.position_at_end(overwrite_block)
+        values = self.builder.load(self.map_field(map_val, 6))
+        self.builder.store(value, self.builder.gep(values, [self.builder.sub(entry, one)]))
+        self.builder.branch(end_block)
 
-        alloc_block = current_func.append_basic_block('allocate_new')
-        empty_block = current_func.append_basic_block('return_empty')
-        copy_start = current_func.append_basic_block('copy_start')
+        # Grow before the index gets more than 3/4 full
+        self.builder.position_at_end(insert_block)
+        count = self.builder.load(self.map_field(map_val, 1))
+        capacity = self.builder.load(self.map_field(map_val, 2))
+        four = ir.Constant(self.int_type, 4)
+        full = self.builder.icmp_signed('>', self.builder.mul(self.builder.add(count, one), four),
+                                        self.builder.mul(capacity, ir.Constant(self.int_type, 3)))
+        self.builder.cbranch(full, grow_block, store_block)
+
+        self.builder.position_at_end(grow_block)
+        self.call_runtime('fl_map_grow', [map_val])
+        grown_slot_ptr, _ = self.map_lookup(map_val, key)
+        self.builder.branch(store_block)
+
+        self.builder.position_at_end(store_block)
+        target = self.builder.phi(self.int_type.as_pointer())
+        target.add_incoming(slot_ptr, insert_block)
+        target.add_incoming(grown_slot_ptr, grow_block)
+        count = self.builder.load(self.map_field(map_val, 1))
+        self.builder.store(key, self.builder.gep(self.builder.load(self.map_field(map_val, 5)), [count]))
+        self.builder.store(value, self.builder.gep(self.builder.load(self.map_field(map_val, 6)), [count]))
+        self.builder.store(ir.Constant(ir.IntType(8), 1),
+                           self.builder.gep(self.builder.load(self.map_field(map_val, 7)), [count]))
+        self.builder.store(self.builder.add(count, one), target)
+        self.builder.store(self.builder.add(count, one), self.map_field(map_val, 1))
+        size_ptr = self.map_field(map_val, 0)
+        self.builder.store(self.builder.add(self.builder.load(size_ptr), one), size_ptr)
+        self.builder.branch(end_block)
 
-        self.builder.cbranch(has_elements, alloc_block, empty_block)
+        self.builder.position_at_end(end_block)
+        return map_val
 
-        # Allocate new array
-        self.builder.position_at_end(alloc_block)
-        element_size = ir.Constant(self.int_type, 8)
-        new_array_size = self.builder.mul(new_length, element_size)
-        new_elements_ptr = self.builder.call(
-            self.malloc_func, [new_array_size])
-        new_elements_ptr = self.builder.bitcast(
-            new_elements_ptr, self.list_element_type.as_pointer())
-        self.builder.branch(copy_start)
+    def emit_map_remove(self, map_val, key):
+        """Body of fl_map_remove: remove key's entry if there is one (returns the map)"""
+        zero = ir.Constant(self.int_type, 0)
+        one = ir.Constant(self.int_type, 1)
+        slot_ptr, entry = self.map_lookup(map_val, key)
+
+        current_func = self.current_function
+        remove_block = current_func.append_basic_block('remove_found')
+        end_block = current_func.append_basic_block('remove_end')
+        self.builder.cbranch(self.builder.icmp_signed('>', entry, zero), remove_block, end_block)
+
+        self.builder.position_at_end(remove_block)
+        self.builder.store(ir.Constant(self.int_type, -1), slot_ptr)
+        live = self.builder.load(self.map_field(map_val, 7))
+        self.builder.store(ir.Constant(ir.IntType(8), 0), self.builder.gep(live, [self.builder.sub(entry, one)]))
+        size_ptr = self.map_field(map_val, 0)
+        self.builder.store(self.builder.sub(self.builder.load(size_ptr), one), size_ptr)
+        self.builder.branch(end_block)
 
-        # Return empty list
-        self.builder.position_at_end(empty_block)
-        empty_ptr = ir.Constant(self.list_element_type.as_pointer(), None)
-        self.builder.branch(copy_start)
+        self.builder.position_at_end(end_block)
+        return map_val
+
+    def for_each_map_entry(self, map_val, name, visit_entry):
+        """Emit a loop calling visit_entry(entry number) for every live entry, in insertion order"""
+        current_func = self.current_function
+        loop_block = current_func.append_basic_block(f'{name}_loop')
+        body_block = current_func.append_basic_block(f'{name}_body')
+        live_block = current_func.append_basic_block(f'{name}_live')
+        next_block = current_func.append_basic_block(f'{name}_next')
+        end_block = current_func.append_basic_block(f'{name}_end')
+
+        count = self.builder.load(self.map_field(map_val, 1))
+        live = self.builder.load(self.map_field(map_val, 7))
+        counter_ptr = self.entry_alloca(self.int_type, f"{name}_entry")
+        self.builder.store(ir.Constant(self.int_type, 0), counter_ptr)
+        self.builder.branch(loop_block)
+
+        self.builder.position_at_end(loop_block)
+        entry = self.builder.load(counter_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', entry, count), body_block, end_block)
+
+        self.builder.position_at_end(body_block)
+        alive = self.builder.load(self.builder.gep(live, [entry]))
+        self.builder.cbranch(self.builder.icmp_unsigned('!=', alive, ir.Constant(ir.IntType(8), 0)),
+                             live_block, next_block)
+
+        self.builder.position_at_end(live_block)
+        visit_entry(entry)
+        self.builder.branch(next_block)
+
+        self.builder.position_at_end(next_block)
+        self.builder.store(self.builder.add(entry, ir.Constant(self.int_type, 1)), counter_ptr)
+        self.builder.branch(loop_block)
 
-        # Copy elements (skipping the one at index)
-        self.builder.position_at_end(copy_start)
-        elements_ptr = self.builder.phi(self.list_element_type.as_pointer())
-        elements_ptr.add_incoming(new_elements_ptr, alloc_block)
-        elements_ptr.add_incoming(empty_ptr, empty_block)
-
-        # Copy before index and after index separately
-        src_counter_ptr = self.builder.alloca(
-            self.int_type, name="src_counter")
-        dst_counter_ptr = self.builder.alloca(
-            self.int_type, name="dst_counter")
-        self.builder.store(zero, src_counter_ptr)
-        self.builder.store(zero, dst_counter_ptr)
-
-        copy_loop = current_func.append_basic_block('copy_loop')
-        copy_body = current_func.append_basic_block('copy_body')
-        skip_element = current_func.append_basic_block('skip_element')
-        copy_element = current_func.append_basic_block('copy_element')
-        remove_end = current_func.append_basic_block('remove_end')
-
-        self.builder.branch(copy_loop)
-
-        # Copy loop condition
-        self.builder.position_at_end(copy_loop)
-        src_counter = self.builder.load(src_counter_ptr)
-        copy_condition = self.builder.icmp_signed(
-            '<', src_counter, current_length)
-        self.builder.cbranch(copy_condition, copy_body, remove_end)
-
-        # Copy body - check if this is the index to skip
-        self.builder.position_at_end(copy_body)
-        src_counter = self.builder.load(src_counter_ptr)
-        is_skip_index = self.builder.icmp_signed('==', src_counter, index)
-        self.builder.cbranch(is_skip_index, skip_element, copy_element)
-
-        # Skip this element
-        self.builder.position_at_end(skip_element)
-        src_counter = self.builder.load(src_counter_ptr)
-        next_src = self.builder.add(src_counter, ir.Constant(self.int_type, 1))
-        self.builder.store(next_src, src_counter_ptr)
-        self.builder.branch(copy_loop)
-
-        # Copy this element
-        self.builder.position_at_end(copy_element)
-        src_counter = self.builder.load(src_counter_ptr)
-        dst_counter = self.builder.load(dst_counter_ptr)
-
-        src_element_ptr = self.builder.gep(current_elements, [src_counter])
-        src_element = self.builder.load(src_element_ptr)
-
-        dst_element_ptr = self.builder.gep(elements_ptr, [dst_counter])
-        self.builder.store(src_element, dst_element_ptr)
-
-        next_src = self.builder.add(src_counter, ir.Constant(self.int_type, 1))
-        next_dst = self.builder.add(dst_counter, ir.Constant(self.int_type, 1))
-        self.builder.store(next_src, src_counter_ptr)
-        self.builder.store(next_dst, dst_counter_ptr)
-        self.builder.branch(copy_loop)
-
-        # Create new list struct
-        self.builder.position_at_end(remove_end)
-        new_list = ir.Constant(self.list_type, ir.Undefined)
-        new_list = self.builder.insert_value(new_list, new_length, 0)
-        new_list = self.builder.insert_value(new_list, elements_ptr, 1)
+        self.builder.position_at_end(end_block)
 
-        return new_list
+    def emit_map_grow(self, map_val):
+        """Body of fl_map_grow: rebuild the index without tombstones, doubling it unless they made it full"""
+        one = ir.Constant(self.int_type, 1)
+        size = self.builder.load(self.map_field(map_val, 0))
+        capacity = self.builder.load(self.map_field(map_val, 2))
+        old_arrays = [self.builder.load(self.map_field(map_val, field)) for field in (4, 5, 6, 7)]
+        _, old_keys, old_values, _ = old_arrays
+        doubled = self.builder.mul(capacity, ir.Constant(self.int_type, 2))
+        needs_room = self.builder.icmp_signed('>', self.builder.mul(self.builder.add(size, one), ir.Constant(self.int_type, 2)), capacity)
+        new_capacity = self.builder.select(needs_room, doubled, capacity)
+        mask = self.builder.sub(new_capacity, one)
+
+        new_arrays = self.map_arrays(new_capacity)
+        new_index, new_keys, new_values, new_live = new_arrays
+        moved_ptr = self.entry_alloca(self.int_type, "grow_moved")
+        self.builder.store(ir.Constant(self.int_type, 0), moved_ptr)
+
+        def move_entry(entry):
+            # Entries keep their order; their keys are unique, so any empty slot will do
+            moved = self.builder.load(moved_ptr)
+            key = self.builder.load(self.builder.gep(old_keys, [entry]))
+            self.builder.store(key, self.builder.gep(new_keys, [moved]))
+            self.builder.store(self.builder.load(self.builder.gep(old_values, [entry])),
+                               self.builder.gep(new_values, [moved]))
+            self.builder.store(ir.Constant(ir.IntType(8), 1), self.builder.gep(new_live, [moved]))
+            start = self.builder.and_(self.call_runtime('fl_map_hash', [map_val, key]), mask)
+            start_block = self.builder.block
+
+            current_func = self.current_function
+            probe_block = current_func.append_basic_block('grow_probe')
+            next_block = current_func.append_basic_block('grow_probe_next')
+            place_block = current_func.append_basic_block('grow_place')
+            self.builder.branch(probe_block)
+
+            self.builder.position_at_end(probe_block)
+            slot = self.builder.phi(self.int_type)
+            slot_ptr = self.builder.gep(new_index, [slot])
+            self.builder.cbranch(self.builder.icmp_signed('==', self.builder.load(slot_ptr), ir.Constant(self.int_type, 0)),
+                                 place_block, next_block)
+
+            self.builder.position_at_end(next_block)
+            next_slot = self.builder.and_(self.builder.add(slot, one), mask)
+            self.builder.branch(probe_block)
+            slot.add_incoming(start, start_block)
+            slot.add_incoming(next_slot, next_block)
+
+            self.builder.position_at_end(place_block)
+            self.builder.store(self.builder.add(moved, one), slot_ptr)
+            self.builder.store(self.builder.add(moved, one), moved_ptr)
+
+        self.for_each_map_entry(map_val, 'grow', move_entry)
+
+        self.builder.store(new_capacity, self.map_field(map_val, 2))
+        self.builder.store(self.builder.load(moved_ptr), self.map_field(map_val, 1))
+        self.store_map_arrays(map_val, new_arrays)
+        for array in old_arrays:
+            self.builder.call(self.free_func, [self.builder.bitcast(array, self.char_ptr_type)])
+
+    def emit_map_keys(self, map_val):
+        """Body of fl_map_keys: list of the map's keys in insertion order"""
+        size = self.builder.load(self.map_field(map_val, 0))
+        keys = self.builder.load(self.map_field(map_val, 5))
+        elements_ptr = self.allocate_elements(size)
+        length_ptr = self.entry_alloca(self.int_type, "keys_length")
+        self.builder.store(ir.Constant(self.int_type, 0), length_ptr)
+
+        def add_key(entry):
+            length = self.builder.load(length_ptr)
+            self.builder.store(self.builder.load(self.builder.gep(keys, [entry])),
+                               self.builder.gep(elements_ptr, [length]))
+            self.builder.store(self.builder.add(length, ir.Constant(self.int_type, 1)), length_ptr)
+
+        self.for_each_map_entry(map_val, 'keys', add_key)
+        return self.build_list(size, size, elements_ptr)
+
+    def emit_print_map(self, map_val, value_kind):
+        """Body of fl_print_map: print a map as {key1: value1, ...} and a newline.
+
+        value_kind picks how values are printed: 0 for ints, 1 for floats, 2 for strings.
+        """
+        zero = ir.Constant(self.int_type, 0)
+        string_keys = self.builder.icmp_signed('!=', self.builder.load(self.map_field(map_val, 3)), zero)
+        keys = self.builder.load(self.map_field(map_val, 5))
+        values = self.builder.load(self.map_field(map_val, 6))
+        printed_ptr = self.entry_alloca(self.int_type, "map_print_count")
+        self.builder.store(zero, printed_ptr)
+        self.write_output("{")
+
+        def print_entry(entry):
+            printed = self.builder.load(printed_ptr)
+            with self.builder.if_then(self.builder.icmp_signed('>', printed, zero)):
+                self.write_output(", ")
+            self.builder.store(self.builder.add(printed, ir.Constant(self.int_type, 1)), printed_ptr)
+
+            key = self.builder.load(self.builder.gep(keys, [entry]))
+            with self.builder.if_else(string_keys) as (then, otherwise):
+                with then:
+                    self.call_runtime('fl_out_string', [self.builder.inttoptr(key, self.char_ptr_type)])
+                with otherwise:
+                    self.call_runtime('fl_out_int', [key])
+            self.write_output(": ")
+
+            value = self.builder.load(self.builder.gep(values, [entry]))
+            done_block = self.current_function.append_basic_block('print_map_value_done')
+            switch = self.builder.switch(value_kind, done_block)
+            for value_type, kind in self.MAP_VALUE_KINDS.items():
+                kind_block = self.current_function.append_basic_block(f'print_map_{value_type}')
+                switch.add_case(ir.Constant(self.int_type, kind), kind_block)
+                self.builder.position_at_end(kind_block)
+                writers = {INT: 'fl_out_int', FLOAT: 'fl_out_float', STRING: 'fl_out_string'}
+                self.call_runtime(writers[value_type], [self.from_list_element(value, value_type)])
+                self.builder.branch(done_block)
+            self.builder.position_at_end(done_block)
+
+        self.for_each_map_entry(map_val, 'print_map', print_entry)
+        self.write_output("}\n")
+
+    # Buffered output: print() formats into a 64 KB buffer that is written to
+    # stdout (fd 1) when full and when main returns. Anything else that writes to
+    # stdout must call fl_out_flush first to keep the output in order.
+
+    def emit_string_slice(self, string, start, end, length):
+        """Body of fl_string_slice: the characters [start, end) of a string of `length` characters.
+
+        The copy made for a substring that is not a suffix is never freed: compiled
+        strings have no owner to free them, so each one lasts until the program exits.
+        """
+        byte_start = self.utf8_skip(string, ir.Constant(self.int_type, 0), start)
+        substring = self.builder.gep(string, [byte_start])
+        with self.builder.if_then(self.builder.icmp_signed('==', end, length)):
+            self.builder.ret(substring)
+
+        size = self.builder.sub(self.utf8_skip(string, byte_start, self.builder.sub(end, start)), byte_start)
+        copy = self.builder.call(self.malloc_func, [self.builder.add(size, ir.Constant(self.int_type, 1))])
+        self.builder.call(self.memcpy_func, [copy, substring, size, ir.Constant(self.bool_type, 0)])
+        self.builder.store(ir.Constant(ir.IntType(8), 0), self.builder.gep(copy, [size]))
+        return copy
+
+    def emit_utf8_length(self, string):
+        """Body of fl_utf8_length: the number of characters in a string, as the interpreter counts them"""
+        current_func = self.current_function
+        loop_block = current_func.append_basic_block('utf8_length_loop')
+        done_block = current_func.append_basic_block('utf8_length_done')
+        entry_block = self.builder.block
+        zero = ir.Constant(self.int_type, 0)
+        self.builder.branch(loop_block)
+
+        # Every byte but the continuation bytes (10xxxxxx) starts a character
+        self.builder.position_at_end(loop_block)
+        offset = self.builder.phi(self.int_type)
+        count = self.builder.phi(self.int_type)
+        offset.add_incoming(zero, entry_block)
+        count.add_incoming(zero, entry_block)
+        byte = self.builder.load(self.builder.gep(string, [offset]))
+        next_count = self.builder.add(count, self.builder.zext(self.utf8_is_lead(byte), self.int_type))
+        offset.add_incoming(self.builder.add(offset, ir.Constant(self.int_type, 1)), loop_block)
+        count.add_incoming(next_count, loop_block)
+        self.builder.cbranch(self.builder.icmp_unsigned('==', byte, ir.Constant(ir.IntType(8), 0)),
+                             done_block, loop_block)
+
+        self.builder.position_at_end(done_block)
+        return count
+
+    def utf8_skip(self, string, offset, count):
+        """Byte offset of the character `count` characters after the one at byte `offset`,
+        stopping at the terminator"""
+        current_func = self.current_function
+        loop_block = current_func.append_basic_block('utf8_skip_loop')
+        done_block = current_func.append_basic_block('utf8_skip_done')
+        entry_block = self.builder.block
+        self.builder.branch(loop_block)
+
+        self.builder.position_at_end(loop_block)
+        position = self.builder.phi(self.int_type)
+        seen = self.builder.phi(self.int_type)
+        position.add_incoming(offset, entry_block)
+        seen.add_incoming(ir.Constant(self.int_type, 0), entry_block)
+        byte = self.builder.load(self.builder.gep(string, [position]))
+        lead = self.utf8_is_lead(byte)
+        found = self.builder.or_(
+            self.builder.and_(lead, self.builder.icmp_signed('==', seen, count)),
+            self.builder.icmp_unsigned('==', byte, ir.Constant(ir.IntType(8), 0)))
+        position.add_incoming(self.builder.add(position, ir.Constant(self.int_type, 1)), loop_block)
+        seen.add_incoming(self.builder.add(seen, self.builder.zext(lead, self.int_type)), loop_block)
+        self.builder.cbranch(found, done_block, loop_block)
+
+        self.builder.position_at_end(done_block)
+        return position
+
+    def utf8_is_lead(self, byte):
+        """Whether a byte starts a UTF-8 character rather than continuing one"""
+        top_bits = self.builder.and_(byte, ir.Constant(ir.IntType(8), 0xC0))
+        return self.builder.icmp_unsigned('!=', top_bits, ir.Constant(ir.IntType(8), 0x80))
+
+    def output_state(self):
+        """Pointers to the output buffer and its fill level, created on first use"""
+        if self.output_buffer is None:
+            buffer_type = ir.ArrayType(ir.IntType(8), self.OUTPUT_BUFFER_SIZE)
+            self.output_buffer = ir.GlobalVariable(self.module, buffer_type, name="fl_out_buffer")
+            self.output_buffer.initializer = ir.Constant(buffer_type, None)
+            self.output_buffer.linkage = 'internal'
+            self.output_length = ir.GlobalVariable(self.module, self.int_type, name="fl_out_length")
+            self.output_length.initializer = ir.Constant(self.int_type, 0)
+            self.output_length.linkage = 'internal'
+        zero = ir.Constant(ir.IntType(32), 0)
+        return self.output_buffer.gep([zero, zero]), self.output_length
+
+    def write_output(self, text):
+        """Append a constant string to the output buffer"""
+        data = text.encode('utf-8')
+        self.call_runtime('fl_out_bytes', [self.constant_string(text), ir.Constant(self.int_type, len(data))])
+
+    def reserve_output(self, size):
+        """Flush unless `size` more bytes fit in the buffer; returns where to write them"""
+        buffer, length = self.output_state()
+        current_func = self.current_function if self.current_function else self.main_func
+        flush_block = current_func.append_basic_block('out_flush')
+        ready_block = current_func.append_basic_block('out_ready')
+
+        fits = self.builder.icmp_signed(
+            '<=', self.builder.add(self.builder.load(length), ir.Constant(self.int_type, size)),
+            ir.Constant(self.int_type, self.OUTPUT_BUFFER_SIZE))
+        self.builder.cbranch(fits, ready_block, flush_block)
+
+        self.builder.position_at_end(flush_block)
+        self.call_runtime('fl_out_flush', [])
+        self.builder.branch(ready_block)
+
+        self.builder.position_at_end(ready_block)
+        return self.builder.gep(buffer, [self.builder.load(length)])
+
+    def commit_output(self, size):
+        """Count `size` bytes written at the pointer reserve_output returned"""
+        _, length = self.output_state()
+        self.builder.store(self.builder.add(self.builder.load(length), size), length)
+
+    def emit_out_write(self, data, size):
+        """Body of fl_out_write: write bytes straight to stdout, retrying short writes"""
+        current_func = self.current_function
+        loop_block = current_func.append_basic_block('write_loop')
+        body_block = current_func.append_basic_block('write_body')
+        advance_block = current_func.append_basic_block('write_advance')
+        done_block = current_func.append_basic_block('write_done')
+
+        offset_ptr = self.entry_alloca(self.int_type, "offset")
+        self.builder.store(ir.Constant(self.int_type, 0), offset_ptr)
+        self.builder.branch(loop_block)
+
+        self.builder.position_at_end(loop_block)
+        offset = self.builder.load(offset_ptr)
+        self.builder.cbranch(self.builder.icmp_signed('<', offset, size), body_block, done_block)
+
+        # A failed write drops the rest, as stdio does
+        self.builder.position_at_end(body_block)
+        written = self.builder.call(self.libc_function('write'), [
+            ir.Constant(ir.IntType(32), 1), self.builder.gep(data, [offset]),
+            self.builder.sub(size, offset)])
+        ok = self.builder.icmp_signed('>', written, ir.Constant(self.int_type, 0))
+        self.builder.cbranch(ok, advance_block, done_block)
+
+        self.builder.position_at_end(advance_block)
+        self.builder.store(self.builder.add(offset, written), offset_ptr)
+        self.builder.branch(loop_block)
+
+        self.builder.position_at_end(done_block)
+
+    def emit_out_flush(self):
+        """Body of fl_out_flush: write the buffered output to stdout"""
+        buffer, length = self.output_state()
+        self.call_runtime('fl_out_write', [buffer, self.builder.load(length)])
+        self.builder.store(ir.Constant(self.int_type, 0), length)
+
+    def emit_runtime_error(self, message):
+        """Body of fl_runtime_error: flush the output, report the error on stderr and exit with 1"""
+        self.call_runtime('fl_out_flush', [])
+        stderr = ir.Constant(ir.IntType(32), 2)
+        for text, size in ((self.constant_string("Runtime Error: "), ir.Constant(self.int_type, 15)),
+                           (message, self.builder.call(self.libc_function('strlen'), [message])),
+                           (self.constant_string("\n"), ir.Constant(self.int_type, 1))):
+            self.builder.call(self.libc_function('write'), [stderr, text, size])
+        self.builder.call(self.libc_function('exit'), [ir.Constant(ir.IntType(32), 1)])
+
+    def emit_out_bytes(self, data, size):
+        """Body of fl_out_bytes: append bytes to the output buffer"""
+        current_func = self.current_function
+        buffered_block = current_func.append_basic_block('bytes_buffered')
+        direct_block = current_func.append_basic_block('bytes_direct')
+        done_block = current_func.append_basic_block('bytes_done')
+
+        # Anything bigger than the whole buffer bypasses it
+        too_big = self.builder.icmp_signed('>', size, ir.Constant(self.int_type, self.OUTPUT_BUFFER_SIZE))
+        self.builder.cbranch(too_big, direct_block, buffered_block)
+
+        self.builder.position_at_end(direct_block)
+        self.call_runtime('fl_out_flush', [])
+        self.call_runtime('fl_out_write', [data, size])
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(buffered_block)
+        buffer, length = self.output_state()
+        fits = self.builder.icmp_signed(
+            '<=', self.builder.add(self.builder.load(length), size),
+            ir.Constant(self.int_type, self.OUTPUT_BUFFER_SIZE))
+        flush_block = current_func.append_basic_block('bytes_flush')
+        copy_block = current_func.append_basic_block('bytes_copy')
+        self.builder.cbranch(fits, copy_block, flush_block)
+
+        self.builder.position_at_end(flush_block)
+        self.call_runtime('fl_out_flush', [])
+        self.builder.branch(copy_block)
 
-    def list_access_at_index(self, list_val, index):
-        """Access element at index from list (returns element value)"""
+        self.builder.position_at_end(copy_block)
+        target = self.builder.gep(buffer, [self.builder.load(length)])
+        self.builder.call(self.memcpy_func, [target, data, size, ir.Constant(ir.IntType(1), 0)])
+        self.commit_output(size)
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(done_block)
+
+    def emit_out_string(self, string):
+        """Body of fl_out_string: append a null-terminated string to the output buffer"""
+        size = self.builder.call(self.libc_function('strlen'), [string])
+        self.call_runtime('fl_out_bytes', [string, size])
+
+    def emit_out_int(self, value):
+        """Body of fl_out_int: append a signed integer in decimal, like printf's %ld"""
+        current_func = self.current_function
+        count_block = current_func.append_basic_block('int_count')
+        counted_block = current_func.append_basic_block('int_counted')
+        digit_block = current_func.append_basic_block('int_digit')
+        done_block = current_func.append_basic_block('int_done')
+        zero = ir.Constant(self.int_type, 0)
+        one = ir.Constant(self.int_type, 1)
+        ten = ir.Constant(self.int_type, 10)
+
+        # Work on the magnitude as an unsigned value, which also covers INT64_MIN
+        negative = self.builder.icmp_signed('<', value, zero)
+        magnitude = self.builder.select(negative, self.builder.sub(zero, value), value)
+        entry_block = self.builder.block
+        self.builder.branch(count_block)
+
+        # Count the digits (at most 19) so they can be written backwards in place
+        self.builder.position_at_end(count_block)
+        digits = self.builder.phi(self.int_type)
+        power = self.builder.phi(self.int_type)
+        digits.add_incoming(one, entry_block)
+        power.add_incoming(ten, entry_block)
+        more = self.builder.and_(
+            self.builder.icmp_signed('<', digits, ir.Constant(self.int_type, 19)),
+            self.builder.icmp_unsigned('>=', magnitude, power))
+        digits.add_incoming(self.builder.add(digits, one), count_block)
+        power.add_incoming(self.builder.mul(power, ten), count_block)
+        self.builder.cbranch(more, count_block, counted_block)
+
+        self.builder.position_at_end(counted_block)
+        size = self.builder.add(digits, self.builder.zext(negative, self.int_type))
+        target = self.reserve_output(20)
+        self.builder.store(ir.Constant(ir.IntType(8), ord('-')), target)
+        self.commit_output(size)
+        end = self.builder.gep(target, [size])
+        ready_block = self.builder.block
+        self.builder.branch(digit_block)
+
+        self.builder.position_at_end(digit_block)
+        remaining = self.builder.phi(self.int_type)
+        position = self.builder.phi(self.int_type)
+        remaining.add_incoming(magnitude, ready_block)
+        position.add_incoming(ir.Constant(self.int_type, -1), ready_block)
+        digit = self.builder.trunc(self.builder.urem(remaining, ten), ir.IntType(8))
+        self.builder.store(self.builder.add(digit, ir.Constant(ir.IntType(8), ord('0'))),
+                           self.builder.gep(end, [position]))
+        remaining_next = self.builder.udiv(remaining, ten)
+        remaining.add_incoming(remaining_next, digit_block)
+        position.add_incoming(self.builder.sub(position, one), digit_block)
+        self.builder.cbranch(self.builder.icmp_unsigned('!=', remaining_next, zero), digit_block, done_block)
+
+        self.builder.position_at_end(done_block)
+
+    def emit_out_float(self, value):
+        """Body of fl_out_float: append a double with six decimals, like printf's %.6f.
+
+        |value| < 2^40 is converted exactly: value = m * 2^-s, so value * 10^6 is
+        m * 10^6 >> s in 128-bit integers, rounded half to even on the bits shifted
+        out, the same rounding glibc applies to the exact binary value. Larger
+        magnitudes, infinities and NaNs go through snprintf.
+        """
+        current_func = self.current_function
+        exact_block = current_func.append_basic_block('float_exact')
+        fallback_block = current_func.append_basic_block('float_fallback')
+        done_block = current_func.append_basic_block('float_done')
+        i128 = ir.IntType(128)
+
+        bits = self.builder.bitcast(value, self.int_type)
+        exponent = self.builder.and_(self.builder.lshr(bits, ir.Constant(self.int_type, 52)),
+                                     ir.Constant(self.int_type, 0x7ff))
+        small = self.builder.icmp_unsigned('<', exponent, ir.Constant(self.int_type, 1023 + 40))
+        self.builder.cbranch(small, exact_block, fallback_block)
+
+        self.builder.position_at_end(fallback_block)
+        fallback_size = 400
+        target = self.reserve_output(fallback_size)
+        written = self.builder.call(self.libc_function('snprintf'), [
+            target, ir.Constant(self.int_type, fallback_size), self.constant_string("%.6f"), value])
+        self.commit_output(self.builder.sext(written, self.int_type))
+        self.builder.branch(done_block)
+
+        # Subnormals have no implicit leading bit and the minimum exponent
+        self.builder.position_at_end(exact_block)
+        fraction = self.builder.and_(bits, ir.Constant(self.int_type, (1 << 52) - 1))
+        subnormal = self.builder.icmp_unsigned('==', exponent, ir.Constant(self.int_type, 0))
+        mantissa = self.builder.select(
+            subnormal, fraction, self.builder.or_(fraction, ir.Constant(self.int_type, 1 << 52)))
+        shift = self.builder.select(
+            subnormal, ir.Constant(self.int_type, 1074),
+            self.builder.sub(ir.Constant(self.int_type, 1075), exponent))
+        # m * 10^6 < 2^73, so shifting by 127 leaves 0 with less than half shifted out
+        shift = self.builder.select(
+            self.builder.icmp_unsigned('<', shift, ir.Constant(self.int_type, 127)),
+            shift, ir.Constant(self.int_type, 127))
+        shift = self.builder.zext(shift, i128)
+
+        scaled = self.builder.mul(self.builder.zext(mantissa, i128), ir.Constant(i128, 10 ** 6))
+        quotient = self.builder.lshr(scaled, shift)
+        one = ir.Constant(i128, 1)
+        remainder = self.builder.and_(scaled, self.builder.sub(self.builder.shl(one, shift), one))
+        half = self.builder.shl(one, self.builder.sub(shift, one))
+        odd = self.builder.icmp_unsigned('!=', self.builder.and_(quotient, one), ir.Constant(i128, 0))
+        round_up = self.builder.or_(
+            self.builder.icmp_unsigned('>', remainder, half),
+            self.builder.and_(self.builder.icmp_unsigned('==', remainder, half), odd))
+        quotient = self.builder.trunc(
+            self.builder.add(quotient, self.builder.zext(round_up, i128)), self.int_type)
+
+        # Sign (kept for values that round to zero, and -0.0), integer part, then ".dddddd"
+        negative = self.builder.icmp_signed('<', bits, ir.Constant(self.int_type, 0))
+        sign_block = current_func.append_basic_block('float_sign')
+        digits_block = current_func.append_basic_block('float_digits')
+        self.builder.cbranch(negative, sign_block, digits_block)
+
+        self.builder.position_at_end(sign_block)
+        self.write_output("-")
+        self.builder.branch(digits_block)
+
+        self.builder.position_at_end(digits_block)
+        million = ir.Constant(self.int_type, 10 ** 6)
+        self.call_runtime('fl_out_int', [self.builder.udiv(quotient, million)])
+        decimals = self.builder.urem(quotient, million)
+        target = self.reserve_output(7)
+        self.builder.store(ir.Constant(ir.IntType(8), ord('.')), target)
+        for i in range(6):
+            digit = self.builder.urem(
+                self.builder.udiv(decimals, ir.Constant(self.int_type, 10 ** (5 - i))),
+                ir.Constant(self.int_type, 10))
+            digit = self.builder.add(self.builder.trunc(digit, ir.IntType(8)), ir.Constant(ir.IntType(8), ord('0')))
+            self.builder.store(digit, self.builder.gep(target, [ir.Constant(self.int_type, i + 1)]))
+        self.commit_output(ir.Constant(self.int_type, 7))
+        self.builder.branch(done_block)
+
+        self.builder.position_at_end(done_block)
+
+    def list_access_at_index(self, list_val, index, checked=True, strict=False):
+        """Access element at index from list (returns element value); unchecked
+        accesses skip the bounds check and must only be used for valid indexes.
+        Out of bounds accesses give 0, or stop a strict (xs[i]) access"""
         # Extract list info
-        list_length = self.builder.extract_value(list_val, 0)
-        list_elements = self.builder.extract_value(list_val, 1)
+        list_length, _, list_elements = self.list_fields(list_val)
+
+        if not checked:
+            return self.builder.load(self.builder.gep(list_elements, [index]))
 
         # Check bounds
+        index = self.from_end(index, list_length)
         zero = ir.Constant(self.int_type, 0)
         index_valid = self.builder.and_(
             self.builder.icmp_signed('>=', index, zero),
@@ -844,6 +2022,7 @@ class CodeGenerator:
 
         # Error case - return 0
         self.builder.position_at_end(error_block)
+        self.out_of_bounds(strict)
         error_value = ir.Constant(self.int_type, 0)
         self.builder.branch(end_block)
 
@@ -855,6 +2034,40 @@ class CodeGenerator:
 
         return result
 
+    def list_store_at_index(self, list_val, index, element, checked=True):
+        """Store an i64 element at index in place, stopping the program on out of bounds
+        indexes; unchecked stores must only be used for valid indexes"""
+        list_length, _, list_elements = self.list_fields(list_val)
+
+        if not checked:
+            self.builder.store(element, self.builder.gep(list_elements, [index]))
+            return
+
+        index = self.from_end(index, list_length)
+        zero = ir.Constant(self.int_type, 0)
+        index_valid = self.builder.and_(
+            self.builder.icmp_signed('>=', index, zero),
+            self.builder.icmp_signed('<', index, list_length)
+        )
+        with self.builder.if_else(index_valid) as (then, otherwise):
+            with then:
+                self.builder.store(element, self.builder.gep(list_elements, [index]))
+            with otherwise:
+                self.out_of_bounds(strict=True)
+
+    def from_end(self, index, length):
+        """Negative indexes count back from the end of the list, as in the interpreter"""
+        negative = self.builder.icmp_signed('<', index, ir.Constant(self.int_type, 0))
+        return self.builder.select(negative, self.builder.add(index, length), index)
+
+    def out_of_bounds(self, strict):
+        """Report an out of bounds access: native code called by the interpreter sets the
+        error flag so the call is re-run there, and a strict access stops a compiled program"""
+        if self.error_flag is not None:
+            self.builder.store(ir.Constant(self.int_type, 1), self.error_flag)
+        elif strict:
+            self.call_runtime('fl_runtime_error', [self.constant_string("Out of bounds")])
+
     def _to_boolean(self, value):
         if value.type == self.bool_type:
             return value
@@ -874,6 +2087,8 @@ class CodeGenerator:
 
         elif node.op.type == TokenType.MINUS:
             if operand.type == self.int_type:
+                if self.error_flag is not None:
+                    return self.checked_int_operation('ssub', ir.Constant(self.int_type, 0), operand)
                 return self.builder.neg(operand)
             elif operand.type == self.float_type:
                 return self.builder.fneg(operand)
@@ -933,6 +2148,63 @@ class CodeGenerator:
 
         return ir.Constant(self.int_type, 0)
 
+    def bounds_checked_loop(self, node):
+        """Name of the list a for loop makes indexing by its loop variable safe for, or None.
+
+        `for i = start, len(xs) [, step]` with constant start >= 0 and step > 0 keeps
+        0 <= i < len(xs) in its body, as long as the body never assigns i or xs:
+        i only grows from a valid start, the loop exits once i reaches the length
+        xs had on entry, and xs can only change length through an assignment.
+        """
+        start, end, step = node.start, node.end, node.step
+        if not (isinstance(start, NumberNode) and isinstance(start.tok.value, int) and start.tok.value >= 0):
+            return None
+        if step and not (isinstance(step, NumberNode) and isinstance(step.tok.value, int) and step.tok.value > 0):
+            return None
+        if not (isinstance(end, FunctionCallNode) and len(end.args) == 1
+                and isinstance(end.args[0], VariableAccessNode)):
+            return None
+        func_name = end.name.tok.value if hasattr(end.name, 'tok') else end.name.value
+        if func_name != "len":
+            return None
+
+        list_name = end.args[0].tok.value
+        assigned = set()
+        self.collect_assigned(node.body, assigned)
+        if list_name in assigned or node.var_name.value in assigned:
+            return None
+        return list_name
+
+    def collect_assigned(self, value, assigned):
+        """Add the name of every variable assigned anywhere inside an AST subtree"""
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                self.collect_assigned(item, assigned)
+        elif hasattr(value, 'pos_start') and not isinstance(value, Token):
+            if isinstance(value, VariableAssignmentNode):
+                assigned.add(value.tok.value)
+            for item in vars(value).values():
+                self.collect_assigned(item, assigned)
+
+    # Builtins that only read the string arguments they are given
+    READING_BUILTINS = ("print", "len", "get", "has", "remove")
+
+    def escapes(self, value, var_name):
+        """Whether a variable's value may outlive a loop iteration: it is used anywhere but
+        as a direct argument to print, len, get, has or remove"""
+        if isinstance(value, (list, tuple)):
+            return any(self.escapes(item, var_name) for item in value)
+        if not hasattr(value, 'pos_start') or isinstance(value, Token):
+            return False
+        if isinstance(value, VariableAccessNode):
+            return value.tok.value == var_name
+        if isinstance(value, FunctionCallNode) and getattr(value.name, 'tok', None) \
+                and value.name.tok.value in self.READING_BUILTINS \
+                and value.name.tok.value not in self.function_nodes:
+            return any(self.escapes(arg, var_name) for arg in value.args
+                       if not (isinstance(arg, VariableAccessNode) and arg.tok.value == var_name))
+        return any(self.escapes(item, var_name) for item in vars(value).values())
+
     def visit_ForNode(self, node):
         # Generate start, end, and step values
         start_val = self.visit(node.start)
@@ -952,14 +2224,20 @@ class CodeGenerator:
                 step_val, self.int_type) if step_val.type == self.float_type else step_val
 
         # Allocate loop variable
-        loop_var_ptr = self.builder.alloca(
-            self.int_type, name=node.var_name.value)
+        loop_var_ptr = self.entry_alloca(self.int_type, node.var_name.value)
         self.builder.store(start_val, loop_var_ptr)
 
         # Save old variable if it exists
         old_var = self.local_vars.get(node.var_name.value)
         self.local_vars[node.var_name.value] = loop_var_ptr
 
+        # Indexing the list the loop is bounded by needs no bounds check in the body
+        list_name = self.bounds_checked_loop(node)
+        in_bounds = None
+        if list_name in self.local_vars:
+            in_bounds = (self.local_vars[list_name], loop_var_ptr)
+            self.in_bounds.add(in_bounds)
+
         # Create basic blocks
         current_func = self.current_function if self.current_function else self.main_func
         loop_cond_block = current_func.append_basic_block('for_cond')
@@ -1003,6 +2281,7 @@ class CodeGenerator:
 
         # Pop loop context
         self.loop_stack.pop()
+        self.in_bounds.discard(in_bounds)
 
         # Restore old variable or remove from scope
         if old_var:
@@ -1012,6 +2291,109 @@ class CodeGenerator:
 
         return ir.Constant(self.int_type, 0)
 
+    def visit_ForEachNode(self, node):
+        """`for x in xs { ... }` walks the list's buffer (or the string's UTF-8 characters) directly"""
+        var_name = node.var_name.value
+        iterable_type = self.type_of(node.iterable)
+        iterable = self.visit(node.iterable)
+        if iterable.type not in (self.list_type, self.char_ptr_type):
+            raise Exception(f"Cannot iterate over {iterable.type}")
+
+        # A view of a list variable the body reassigns could see its buffer reallocated
+        owned_copy = False
+        viewed = node.iterable
+        while isinstance(viewed, SliceNode):
+            viewed = viewed.target
+        if iterable.type == self.list_type and isinstance(viewed, VariableAccessNode):
+            assigned = set()
+            self.collect_assigned(node.body, assigned)
+            if viewed.tok.value in assigned:
+                iterable = self.list_own(iterable)
+                owned_copy = True
+
+        index_ptr = self.entry_alloca(self.int_type, f"{var_name}_index")
+        self.builder.store(ir.Constant(self.int_type, 0), index_ptr)
+        # Lists step one element at a time, strings one UTF-8 sequence (one character)
+        step_ptr = self.entry_alloca(self.int_type, f"{var_name}_step")
+        self.builder.store(ir.Constant(self.int_type, 1), step_ptr)
+        char_buffer = None
+        if iterable.type == self.char_ptr_type and not self.escapes(node.body, var_name):
+            # Every character is decoded into the same buffer when none outlives its iteration
+            char_buffer = self.builder.bitcast(
+                self.entry_alloca(ir.ArrayType(ir.IntType(8), 5), f"{var_name}_char"), self.char_ptr_type)
+        var_type = self.llvm_type(self.types.loop_variable_type(self.scope, node))
+        var_ptr = self.entry_alloca(var_type, var_name)
+
+        old_var = self.local_vars.get(var_name)
+        self.local_vars[var_name] = var_ptr
+
+        current_func = self.current_function if self.current_function else self.main_func
+        loop_cond_block = current_func.append_basic_block('for_each_cond')
+        loop_body_block = current_func.append_basic_block('for_each_body')
+        loop_incr_block = current_func.append_basic_block('for_each_incr')
+        loop_end_block = current_func.append_basic_block('for_each_end')
+
+        self.loop_stack.append({
+            'continue_block': loop_incr_block,
+            'break_block': loop_end_block
+        })
+        self.builder.branch(loop_cond_block)
+
+        # Lists run up to the length they had on entry; strings up to their terminator
+        self.builder.position_at_end(loop_cond_block)
+        index = self.builder.load(index_ptr)
+        if iterable.type == self.list_type:
+            length = self.builder.extract_value(iterable, 0)
+            self.builder.cbranch(self.builder.icmp_signed('<', index, length), loop_body_block, loop_end_block)
+            self.builder.position_at_end(loop_body_block)
+            element = self.list_access_at_index(iterable, index, checked=False)
+            element = self.from_list_element(element, self.list_element(iterable_type))
+        else:
+            char = self.builder.load(self.builder.gep(iterable, [index]))
+            self.builder.cbranch(self.builder.icmp_unsigned('!=', char, ir.Constant(ir.IntType(8), 0)),
+                                 loop_body_block, loop_end_block)
+            self.builder.position_at_end(loop_body_block)
+            step = self.utf8_sequence_length(char)
+            self.builder.store(step, step_ptr)
+            # Characters that are kept past their iteration get a copy of their own
+            element = char_buffer
+            if element is None:
+                element = self.builder.call(self.malloc_func, [self.builder.add(step, ir.Constant(self.int_type, 1))])
+            self.builder.call(self.memcpy_func, [element, self.builder.gep(iterable, [index]), step,
+                                                 ir.Constant(self.bool_type, 0)])
+            self.builder.store(ir.Constant(ir.IntType(8), 0), self.builder.gep(element, [step]))
+        self.builder.store(self.convert(element, var_type), var_ptr)
+
+        for stmt in node.body:
+            self.visit(stmt)
+        if not self.builder.block.is_terminated:
+            self.builder.branch(loop_incr_block)
+
+        self.builder.position_at_end(loop_incr_block)
+        self.builder.store(self.builder.add(self.builder.load(index_ptr), self.builder.load(step_ptr)), index_ptr)
+        self.builder.branch(loop_cond_block)
+
+        self.builder.position_at_end(loop_end_block)
+        if owned_copy:
+            self.list_release(iterable)
+        self.loop_stack.pop()
+
+        if old_var:
+            self.local_vars[var_name] = old_var
+        else:
+            del self.local_vars[var_name]
+
+        return ir.Constant(self.int_type, 0)
+
+    def utf8_sequence_length(self, lead):
+        """Number of bytes in the UTF-8 sequence that starts with the byte `lead`"""
+        lead = self.builder.zext(lead, self.int_type)
+        length = ir.Constant(self.int_type, 4)
+        for limit, count in ((0xF0, 3), (0xE0, 2), (0x80, 1)):
+            below = self.builder.icmp_unsigned('<', lead, ir.Constant(self.int_type, limit))
+            length = self.builder.select(below, ir.Constant(self.int_type, count), length)
+        return length
+
     def visit_WhileNode(self, node):
         # Create basic blocks
         current_func = self.current_function if self.current_function else self.main_func
@@ -1087,9 +2469,23 @@ class CodeGenerator:
         # Extract function name
         func_name = node.name.value if hasattr(
             node.name, 'value') else str(node.name)
+        self.function_nodes[func_name] = node
 
-        # Determine return type based on declaration
-        return_type = self.int_type  # default
+        # Specializations are emitted by the calls that need them; a function that is
+        # never called still gets its default one so its body is compiled and checked
+        default = self.types.default_specializations.get(func_name)
+        if default:
+            return self.specialize(func_name, default)
+        return ir.Constant(self.int_type, 0)
+
+    def specialize(self, func_name, mangled):
+        """Return the specialization `mangled` of a function, emitting it on first use"""
+        if mangled in self.functions:
+            return self.functions[mangled]
+        node = self.function_nodes[func_name]
+
+        # Determine return type based on declaration, or the inferred one
+        return_type = self.llvm_type(self.types.return_type(mangled))
         if node.return_type:
             if node.return_type.type == KeywordType.INT_TYPE:
                 return_type = self.int_type
@@ -1100,24 +2496,28 @@ class CodeGenerator:
             elif node.return_type.type == KeywordType.LIST_TYPE:
                 return_type = self.list_type
 
-        # Create function type - for simplicity, all parameters are int64
-        param_types = [self.int_type] * len(node.args)
+        # Parameters take exactly the argument types of the calls that use this copy
+        param_types = [self.llvm_type(t) for t in self.types.param_types(mangled)]
         func_type = ir.FunctionType(return_type, param_types)
 
         # Create function
-        func = ir.Function(self.module, func_type, func_name)
+        func = ir.Function(self.module, func_type, mangled)
         # Store return type information for validation
         func._funlang_return_type = node.return_type
-        self.functions[func_name] = func
+        self.functions[mangled] = func
 
-        # Save current context
+        # Save current context (this may run in the middle of another function)
         old_builder = self.builder
         old_function = self.current_function
         old_local_vars = self.local_vars.copy()
+        old_scope = self.scope
+        old_loop_stack = self.loop_stack
 
         # Set new context
         self.current_function = func
         self.local_vars = {}
+        self.scope = mangled
+        self.loop_stack = []
 
         # Create entry block
         entry_block = func.append_basic_block('entry')
@@ -1126,10 +2526,11 @@ class CodeGenerator:
         # Add parameters to local variables
         for i, param in enumerate(node.args):
             param_name = param.value if hasattr(param, 'value') else str(param)
-            # Allocate space for parameter
-            param_ptr = self.builder.alloca(self.int_type, name=param_name)
+            # Allocate space for parameter (it can be reassigned to a wider type)
+            param_type = self.llvm_type(self.types.param_type(mangled, param_name))
+            param_ptr = self.entry_alloca(param_type, param_name)
             # Store the parameter value
-            self.builder.store(func.args[i], param_ptr)
+            self.builder.store(self.convert(func.args[i], param_type), param_ptr)
             # Add to local variables
             self.local_vars[param_name] = param_ptr
 
@@ -1152,14 +2553,9 @@ class CodeGenerator:
                 elif func.return_value.type == self.char_ptr_type:
                     return_value = ir.Constant(self.char_ptr_type, None)
                 elif func.return_value.type == self.list_type:
-                    # Return empty list
-                    empty_list = ir.Constant(self.list_type, ir.Undefined)
-                    empty_list = self.builder.insert_value(
-                        # length = 0
-                        empty_list, ir.Constant(self.int_type, 0), 0)
-                    empty_list = self.builder.insert_value(empty_list, ir.Constant(
-                        self.list_element_type.as_pointer(), None), 1)  # elements = null
-                    return_value = empty_list
+                    return_value = self.empty_list()
+                elif func.return_value.type == self.map_type:
+                    return_value = ir.Constant(self.map_type, None)
                 else:
                     return_value = ir.Constant(self.int_type, 0)
             self.builder.ret(return_value)
@@ -1168,13 +2564,23 @@ class CodeGenerator:
         self.builder = old_builder
         self.current_function = old_function
         self.local_vars = old_local_vars
+        self.scope = old_scope
+        self.loop_stack = old_loop_stack
 
         return func
 
     def visit_ReturnNode(self, node):
         # Generate return value
         if node.node_to_return:
-            return_val = self.visit(node.node_to_return)
+            var_ptr = None
+            if isinstance(node.node_to_return, VariableAccessNode):
+                var_ptr = self.local_vars.get(node.node_to_return.tok.value)
+
+            if var_ptr is not None and var_ptr.type.pointee == self.list_type:
+                # A local list dies with the function, so hand its buffer to the caller
+                return_val = self.builder.load(var_ptr)
+            else:
+                return_val = self.visit(node.node_to_return)
 
             # Get expected return type from current function
             expected_type = self.current_function.return_value.type
@@ -1241,13 +2647,7 @@ class CodeGenerator:
             elif expected_type == self.char_ptr_type:
                 return_val = ir.Constant(self.char_ptr_type, None)
             elif expected_type == self.list_type:
-                # Return empty list
-                empty_list = ir.Constant(self.list_type, ir.Undefined)
-                empty_list = self.builder.insert_value(
-                    empty_list, ir.Constant(self.int_type, 0), 0)  # length = 0
-                empty_list = self.builder.insert_value(empty_list, ir.Constant(
-                    self.list_element_type.as_pointer(), None), 1)  # elements = null
-                return_val = empty_list
+                return_val = self.empty_list()
             else:
                 return_val = ir.Constant(self.int_type, 0)
 
@@ -1,3 +1,4 @@
+import copy
 import json
 
 
@@ -19,6 +20,7 @@ class LanguageConfig:
             "elif": "elif",
             "else": "else",
             "for": "for",
+            "in": "in",
             "while": "while",
             "return": "return",
             "break": "break",
@@ -38,12 +40,36 @@ class LanguageConfig:
             "to_list": "to_list",
             "typeof": "typeof",
             "elos": "elos",
+            "get": "get",
+            "set": "set",
+            "has": "has",
+            "remove": "remove",
+            "keys": "keys",
+            "slice": "slice",
+            "split": "split",
+            "join": "join",
+            "find": "find",
+            "replace": "replace",
+            "substring": "substring",
+            "upper": "upper",
+            "lower": "lower",
+        },
+        # Operators may be spelled with symbols or, like "and" and "or", with a word
+        "operators": {
+            "modulo": "%",
+            "floor_divide": "//",
+            "bit_and": "&",
+            "bit_or": "|",
+            "bit_xor": "xor",
+            "shift_left": "<<",
+            "shift_right": ">>",
         },
     }
 
     def __init__(self, config_path=None):
         """Load configuration from file or use defaults"""
-        self.config = self.DEFAULT_CONFIG.copy()
+        # Deep copy, so loading a pack never changes the defaults for other configs
+        self.config = copy.deepcopy(self.DEFAULT_CONFIG)
 
         if config_path:
             self.load_config(config_path)
@@ -64,6 +90,8 @@ class LanguageConfig:
                 self.config["keywords"].update(user_config["keywords"])
             if "builtins" in user_config:
                 self.config["builtins"].update(user_config["builtins"])
+            if "operators" in user_config:
+                self.config["operators"].update(user_config["operators"])
 
             # Validate configuration
             self._validate_config()
@@ -90,9 +118,14 @@ class LanguageConfig:
                 )
             all_words.add(word)
 
+        for word in self.config["operators"].values():
+            if word in all_words:
+                raise Exception(f"Operator conflicts with another word: '{word}'")
+            all_words.add(word)
+
     def _build_mappings(self):
         """Build reverse mappings from custom words to token types"""
-        from src.token import KeywordType, BuiltInFunctionType
+        from src.token import TokenType, KeywordType, BuiltInFunctionType
 
         # Map custom keywords to their token types
         keyword_mapping = {
@@ -109,6 +142,7 @@ class LanguageConfig:
             "elif": KeywordType.ELIF,
             "else": KeywordType.ELSE,
             "for": KeywordType.FOR,
+            "in": KeywordType.IN,
             "while": KeywordType.WHILE,
             "return": KeywordType.RETURN,
             "break": KeywordType.BREAK,
@@ -134,12 +168,45 @@ class LanguageConfig:
             "to_list": BuiltInFunctionType.TO_LIST,
             "typeof": BuiltInFunctionType.TYPEOF,
             "elos": BuiltInFunctionType.ELOS,
+            "get": BuiltInFunctionType.GET,
+            "set": BuiltInFunctionType.SET,
+            "has": BuiltInFunctionType.HAS,
+            "remove": BuiltInFunctionType.REMOVE,
+            "keys": BuiltInFunctionType.KEYS,
+            "slice": BuiltInFunctionType.SLICE,
+            "split": BuiltInFunctionType.SPLIT,
+            "join": BuiltInFunctionType.JOIN,
+            "find": BuiltInFunctionType.FIND,
+            "replace": BuiltInFunctionType.REPLACE,
+            "substring": BuiltInFunctionType.SUBSTRING,
+            "upper": BuiltInFunctionType.UPPER,
+            "lower": BuiltInFunctionType.LOWER,
         }
 
         for internal_name, token_type in builtin_mapping.items():
             custom_word = self.config["builtins"][internal_name]
             self.builtin_to_type[custom_word] = token_type
 
+        operator_mapping = {
+            "modulo": TokenType.MODULO,
+            "floor_divide": TokenType.FLOOR_DIVIDE,
+            "bit_and": TokenType.BIT_AND,
+            "bit_or": TokenType.BIT_OR,
+            "bit_xor": TokenType.BIT_XOR,
+            "shift_left": TokenType.SHIFT_LEFT,
+            "shift_right": TokenType.SHIFT_RIGHT,
+        }
+
+        self.operator_to_type = {}
+        for internal_name, token_type in operator_mapping.items():
+            self.operator_to_type[self.config["operators"][internal_name]] = token_type
+
+        # The lexer tries symbolic spellings longest first, so "<<" wins over "<"
+        self.symbol_operators = sorted(
+            (spelling for spelling in self.operator_to_type if not spelling.isidentifier()),
+            key=len, reverse=True)
+        self.operator_starts = {spelling[0] for spelling in self.symbol_operators}
+
     def get_keyword_type(self, word):
         """Get the token type for a custom keyword"""
         return self.keyword_to_type.get(word)
@@ -148,6 +215,10 @@ class LanguageConfig:
         """Get the token type for a custom builtin function"""
         return self.builtin_to_type.get(word)
 
+    def get_operator_type(self, spelling):
+        """Get the token type for a custom operator spelling"""
+        return self.operator_to_type.get(spelling)
+
     def get_custom_word(self, token_type):
         """Get the custom word for a token type (for error messages)"""
 
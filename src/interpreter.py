@@ -1,5 +1,6 @@
 import math
 import os
+from itertools import islice
 from src.error import RuntimeError
 from src.token import TokenType as TT, KeywordType as TK
 
@@ -33,6 +34,27 @@ class Value:
     def powered_by(self, other):
         return None, self.illegal_operation(other)
 
+    def modulo_by(self, other):
+        return None, self.illegal_operation(other)
+
+    def floor_divided_by(self, other):
+        return None, self.illegal_operation(other)
+
+    def bit_anded_with(self, other):
+        return None, self.illegal_operation(other)
+
+    def bit_ored_with(self, other):
+        return None, self.illegal_operation(other)
+
+    def bit_xored_with(self, other):
+        return None, self.illegal_operation(other)
+
+    def shifted_left_by(self, other):
+        return None, self.illegal_operation(other)
+
+    def shifted_right_by(self, other):
+        return None, self.illegal_operation(other)
+
     def comparison_equals(self, other):
         return None, self.illegal_operation(other)
 
@@ -75,23 +97,51 @@ class Value:
 
 
 class Number(Value):
+    """Immutable numeric value, either an Int or a Float; create them with Number.of.
+
+    Numbers are shared between variables, expressions and calls, so they carry
+    no position or context: set_pos and set_context leave them untouched, and
+    the interpreter locates errors involving them from the AST instead.
+    Operations shared by both kinds live here; Int and Float specialize the
+    arithmetic.
+    """
+
+    type_name = "number"
+
+    pos_start = None
+    pos_end = None
+    context = None
+
     def __init__(self, value):
-        super().__init__()
         self.value = value
 
+    @staticmethod
+    def of(value):
+        if type(value) is int:
+            if Int.SMALL_INT_MIN <= value <= Int.SMALL_INT_MAX:
+                return SMALL_INTS[value - Int.SMALL_INT_MIN]
+            return Int(value)
+        return Float(value)
+
+    def set_pos(self, pos_start=None, pos_end=None):
+        return self
+
+    def set_context(self, context=None):
+        return self
+
     def added_to(self, other):
         if isinstance(other, Number):
-            return Number(self.value + other.value).set_context(self.context), None
+            return Number.of(self.value + other.value), None
         return None, Value.illegal_operation(self, other)
 
     def subtracted_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value - other.value).set_context(self.context), None
+            return Number.of(self.value - other.value), None
         return None, Value.illegal_operation(self, other)
 
     def multiplied_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value * other.value).set_context(self.context), None
+            return Number.of(self.value * other.value), None
         return None, Value.illegal_operation(self, other)
 
     def divided_by(self, other):
@@ -103,89 +153,206 @@ class Number(Value):
                     "Division by zero",
                     self.context,
                 )
-            return Number(self.value / other.value).set_context(self.context), None
+            return Float(self.value / other.value), None
         return None, Value.illegal_operation(self, other)
 
     def powered_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value**other.value).set_context(self.context), None
+            return Number.of(self.value**other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    # % and // round the quotient down, so a remainder takes the sign of the divisor
+    def modulo_by(self, other):
+        if isinstance(other, Number):
+            if other.value == 0:
+                return None, RuntimeError(self.pos_start, other.pos_end, "Division by zero", self.context)
+            return Number.of(self.value % other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    def floor_divided_by(self, other):
+        if isinstance(other, Number):
+            if other.value == 0:
+                return None, RuntimeError(self.pos_start, other.pos_end, "Division by zero", self.context)
+            return Number.of(self.value // other.value), None
         return None, Value.illegal_operation(self, other)
 
     def comparison_equals(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value == other.value)).set_context(
-                self.context
-            ), None
+            return Number.true if self.value == other.value else Number.false, None
         return None, Value.illegal_operation(self, other)
 
     def comparison_not_equals(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value != other.value)).set_context(
-                self.context
-            ), None
+            return Number.true if self.value != other.value else Number.false, None
         return None, Value.illegal_operation(self, other)
 
     def comparison_less_than(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value < other.value)).set_context(self.context), None
+            return Number.true if self.value < other.value else Number.false, None
         return None, Value.illegal_operation(self, other)
 
     def comparison_greater_than(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value > other.value)).set_context(self.context), None
+            return Number.true if self.value > other.value else Number.false, None
         return None, Value.illegal_operation(self, other)
 
     def comparison_less_than_or_equals(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value <= other.value)).set_context(
-                self.context
-            ), None
+            return Number.true if self.value <= other.value else Number.false, None
         return None, Value.illegal_operation(self, other)
 
     def comparison_greater_than_or_equals(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value >= other.value)).set_context(
-                self.context
-            ), None
+            return Number.true if self.value >= other.value else Number.false, None
         return None, Value.illegal_operation(self, other)
 
     def anded_with(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value and other.value)).set_context(
-                self.context
-            ), None
+            return Int.of(int(self.value and other.value)), None
         return None, Value.illegal_operation(self, other)
 
     def ored_with(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value or other.value)).set_context(
-                self.context
-            ), None
+            return Int.of(int(self.value or other.value)), None
         return None, Value.illegal_operation(self, other)
 
     def notted(self):
-        return Number(1 if self.value == 0 else 0).set_context(self.context), None
+        return Number.true if self.value == 0 else Number.false, None
 
     def copy(self):
-        copy = Number(self.value)
-        copy.set_pos(self.pos_start, self.pos_end)
-        copy.set_context(self.context)
-        return copy
+        return self
 
     def __repr__(self):
         return str(self.value)
 
 
-Number.null = Number(0)
-Number.false = Number(0)
-Number.true = Number(1)
-Number.math_PI = Number(math.pi)
+class Int(Number):
+    """Arbitrary-precision integer; Int.of reuses the preallocated small ints"""
+
+    type_name = "int"
+
+    # Small ints (which include the booleans 0 and 1) are preallocated
+    SMALL_INT_MIN = -5
+    SMALL_INT_MAX = 1024
+
+    @staticmethod
+    def of(value):
+        if Int.SMALL_INT_MIN <= value <= Int.SMALL_INT_MAX:
+            return SMALL_INTS[value - Int.SMALL_INT_MIN]
+        return Int(value)
+
+    def added_to(self, other):
+        if type(other) is Int:
+            return Int.of(self.value + other.value), None
+        return Number.added_to(self, other)
+
+    def subtracted_by(self, other):
+        if type(other) is Int:
+            return Int.of(self.value - other.value), None
+        return Number.subtracted_by(self, other)
+
+    def multiplied_by(self, other):
+        if type(other) is Int:
+            return Int.of(self.value * other.value), None
+        return Number.multiplied_by(self, other)
+
+    def modulo_by(self, other):
+        if type(other) is Int and other.value:
+            return Int.of(self.value % other.value), None
+        return Number.modulo_by(self, other)
+
+    def floor_divided_by(self, other):
+        if type(other) is Int and other.value:
+            return Int.of(self.value // other.value), None
+        return Number.floor_divided_by(self, other)
+
+    # Bitwise operators only take ints
+    def bit_anded_with(self, other):
+        if type(other) is Int:
+            return Int.of(self.value & other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    def bit_ored_with(self, other):
+        if type(other) is Int:
+            return Int.of(self.value | other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    def bit_xored_with(self, other):
+        if type(other) is Int:
+            return Int.of(self.value ^ other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    def shifted_left_by(self, other):
+        if type(other) is Int:
+            if other.value < 0:
+                return None, RuntimeError(self.pos_start, other.pos_end, "Negative shift count", self.context)
+            return Int.of(self.value << other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    def shifted_right_by(self, other):
+        if type(other) is Int:
+            if other.value < 0:
+                return None, RuntimeError(self.pos_start, other.pos_end, "Negative shift count", self.context)
+            return Int.of(self.value >> other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    def comparison_equals(self, other):
+        if type(other) is Int:
+            return Number.true if self.value == other.value else Number.false, None
+        return Number.comparison_equals(self, other)
+
+    def comparison_less_than(self, other):
+        if type(other) is Int:
+            return Number.true if self.value < other.value else Number.false, None
+        return Number.comparison_less_than(self, other)
+
+    def comparison_greater_than(self, other):
+        if type(other) is Int:
+            return Number.true if self.value > other.value else Number.false, None
+        return Number.comparison_greater_than(self, other)
+
+
+class Float(Number):
+    """Double-precision float; arithmetic with any Number stays a Float"""
+
+    type_name = "float"
+
+    def added_to(self, other):
+        if isinstance(other, Number):
+            return Float(self.value + other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    def subtracted_by(self, other):
+        if isinstance(other, Number):
+            return Float(self.value - other.value), None
+        return None, Value.illegal_operation(self, other)
+
+    def multiplied_by(self, other):
+        if isinstance(other, Number):
+            return Float(self.value * other.value), None
+        return None, Value.illegal_operation(self, other)
+
+
+SMALL_INTS = [Int(value) for value in range(Int.SMALL_INT_MIN, Int.SMALL_INT_MAX + 1)]
+Number.null = Int.of(0)
+Number.false = Int.of(0)
+Number.true = Int.of(1)
+Number.math_PI = Float(math.pi)
+
+
+def slice_bounds(length, start, stop):
+    """Clamped [start, stop) offsets of a slice; None is either end and negatives count from the end"""
+    start, stop, _ = slice(start, stop).indices(length)
+    return start, max(start, stop)
 
 
 class String(Value):
     def __init__(self, value):
-        super().__init__()
+        # split() makes millions of these, so the fields are set directly
         self.value = value
+        self.pos_start = None
+        self.pos_end = None
+        self.context = None
 
     def added_to(self, other):
         if isinstance(other, String):
@@ -199,6 +366,10 @@ class String(Value):
         else:
             return None, Value.illegal_operation(self, other)
 
+    def sliced(self, start, stop):
+        start, stop = slice_bounds(len(self.value), start, stop)
+        return StringView(self.value, start, stop).set_context(self.context)
+
     def copy(self):
         copy = String(self.value)
         copy.set_pos(self.pos_start, self.pos_end)
@@ -209,6 +380,38 @@ class String(Value):
         return self.value
 
 
+class StringView(String):
+    """Substring that points into its parent's text until the characters are needed.
+
+    Slicing a view slices the parent again, so chains of slices never copy the
+    characters in between.
+    """
+
+    def __init__(self, source, start, stop):
+        Value.__init__(self)
+        self.source = source
+        self.start = start
+        self.stop = stop
+        self.text = None
+
+    @property
+    def value(self):
+        if self.text is None:
+            self.text = self.source[self.start:self.stop]
+        return self.text
+
+    def sliced(self, start, stop):
+        start, stop = slice_bounds(self.stop - self.start, start, stop)
+        return StringView(self.source, self.start + start, self.start + stop).set_context(self.context)
+
+    def copy(self):
+        copy = StringView(self.source, self.start, self.stop)
+        copy.text = self.text
+        copy.set_pos(self.pos_start, self.pos_end)
+        copy.set_context(self.context)
+        return copy
+
+
 class List(Value):
     def __init__(self, elements):
         super().__init__()
@@ -222,7 +425,7 @@ class List(Value):
     def multiplied_by(self, other):
         if isinstance(other, List):
             new_list = self.copy()
-            new_list.elements.extend(other.elements)
+            new_list.elements.extend(other.iter_elements())
             return new_list, None
         else:
             return None, Value.illegal_operation(self, other)
@@ -251,6 +454,24 @@ class List(Value):
         else:
             return None, Value.illegal_operation(self, other)
 
+    def stored_at(self, index, value):
+        """Replace the element at index in place, where every copy of the list sees it"""
+        if type(index) is Int and -len(self.elements) <= index.value < len(self.elements):
+            self.elements[index.value] = value
+            return value, None
+        return None, RuntimeError(index.pos_start, index.pos_end, "Out of bounds", self.context)
+
+    def length(self):
+        return len(self.elements)
+
+    def iter_elements(self):
+        """The elements the list has now, even if it grows while they are walked"""
+        return islice(self.elements, len(self.elements))
+
+    def sliced(self, start, stop):
+        start, stop = slice_bounds(len(self.elements), start, stop)
+        return ListView(self.elements, start, stop).set_context(self.context)
+
     def copy(self):
         copy = List(self.elements)
         copy.set_pos(self.pos_start, self.pos_end)
@@ -258,7 +479,91 @@ class List(Value):
         return copy
 
     def __repr__(self):
-        return f"[{', '.join([str(x) for x in self.elements])}]"
+        return f"[{', '.join([str(x) for x in self.iter_elements()])}]"
+
+
+class ListView(List):
+    """Slice of another list that reads straight from the parent's elements.
+
+    Nothing is copied until the view itself is modified (appended to, stored
+    into or removed from); then its elements are copied out once and every copy
+    of the view sees the new list, as with any other list. Until that happens,
+    stores into the parent show through the view.
+    """
+
+    def __init__(self, source, start, stop, state=None):
+        Value.__init__(self)
+        # [parent elements, start, stop, copied-out elements or None], shared by copies
+        self.state = state if state else [source, start, stop, None]
+
+    @property
+    def elements(self):
+        state = self.state
+        if state[3] is None:
+            state[3] = state[0][state[1]:state[2]]
+        return state[3]
+
+    def length(self):
+        source, start, stop, elements = self.state
+        return stop - start if elements is None else len(elements)
+
+    def iter_elements(self):
+        source, start, stop, elements = self.state
+        if elements is None:
+            return islice(source, start, stop)
+        return islice(elements, len(elements))
+
+    def divided_by(self, other):
+        source, start, stop, elements = self.state
+        if elements is not None or not isinstance(other, Number):
+            return super().divided_by(other)
+        index = other.value
+        if type(other) is Int and -(stop - start) <= index < stop - start:
+            return source[start + index % (stop - start)], None
+        return None, RuntimeError(other.pos_start, other.pos_end, "Out of bounds", self.context)
+
+    def sliced(self, start, stop):
+        source, offset, end, elements = self.state
+        if elements is not None:
+            return super().sliced(start, stop)
+        start, stop = slice_bounds(end - offset, start, stop)
+        return ListView(source, offset + start, offset + stop).set_context(self.context)
+
+    def copy(self):
+        copy = ListView(None, 0, 0, self.state)
+        copy.set_pos(self.pos_start, self.pos_end)
+        copy.set_context(self.context)
+        return copy
+
+
+class Map(Value):
+    """Hash map from numbers or strings to values.
+
+    Like lists, copies share their entries, so set and remove are seen through
+    every copy. Entries keep their insertion order, which is what keys() and
+    printing use.
+    """
+
+    def __init__(self, entries):
+        super().__init__()
+        # Python key -> (key value, value)
+        self.entries = entries
+
+    @staticmethod
+    def hash_key(key):
+        """Python key for a FunLang key, or None if the value cannot be a key"""
+        if isinstance(key, (Number, String)):
+            return key.value
+        return None
+
+    def copy(self):
+        copy = Map(self.entries)
+        copy.set_pos(self.pos_start, self.pos_end)
+        copy.set_context(self.context)
+        return copy
+
+    def __repr__(self):
+        return "{" + ", ".join(f"{key}: {value}" for key, value in self.entries.values()) + "}"
 
 
 class BaseFunction(Value):
@@ -310,21 +615,36 @@ class BaseFunction(Value):
 
 
 class Function(BaseFunction):
-    def __init__(self, name, body, arg_names, return_type=None):
+    def __init__(self, name, body, arg_names, return_type=None, declaration=None, tiering=None,
+                 type_feedback=None):
         super().__init__(name)
         self.body = body
         self.arg_names = arg_names
         self.return_type = return_type
+        # With tiered execution, hot functions are handed to native code
+        self.declaration = declaration
+        self.tiering = tiering
+        # Records argument and return types when profiling
+        self.type_feedback = type_feedback
 
     def execute(self, args):
         res = InterpreterResult()
-        interpreter = Interpreter()
+        profile = None
+        if self.tiering:
+            profile, native_value = self.tiering.enter(self, args)
+            if native_value is not None:
+                return res.success(native_value)
+        interpreter = Interpreter(self.tiering, profile, self.type_feedback)
         exec_ctx = self.generate_new_context()
 
         res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
         if res.should_return():
             return res
 
+        if self.type_feedback:
+            for i, arg in enumerate(args):
+                self.type_feedback.record(self.declaration, i, arg)
+
         values = []
         for body_node in self.body:
             value = res.register(interpreter.visit(body_node, exec_ctx))
@@ -341,31 +661,35 @@ class Function(BaseFunction):
                     ):
                         return res.failure(
                             RuntimeError(
-                                return_value.pos_start,
-                                return_value.pos_end,
+                                return_value.pos_start or self.return_type.pos_start,
+                                return_value.pos_end or self.return_type.pos_end,
                                 f"Type mismatch: function declared to return '{expected_type_name}' but trying to return '{actual_type_name}'",
                                 exec_ctx,
                             )
                         )
 
+                if self.type_feedback:
+                    self.type_feedback.record(self.declaration, len(args), res.func_return_value)
                 return res.success(res.func_return_value)
             if res.should_return():
                 return res
             values.append(value)
 
-        return res.success(values[-1] if values else Number.null)
+        return_value = values[-1] if values else Number.null
+        if self.type_feedback:
+            self.type_feedback.record(self.declaration, len(args), return_value)
+        return res.success(return_value)
 
     def get_value_type_name(self, value):
         """Get the type name of a value for type checking"""
         if isinstance(value, Number):
-            if isinstance(value.value, int):
-                return "int"
-            elif isinstance(value.value, float):
-                return "float"
+            return value.type_name
         elif isinstance(value, String):
             return "string"
         elif isinstance(value, List):
             return "list"
+        elif isinstance(value, Map):
+            return "map"
         return "unknown"
 
     def is_type_compatible(self, actual_type, expected_type):
@@ -382,7 +706,8 @@ class Function(BaseFunction):
         return compatible_conversions.get((actual_type, expected_type), False)
 
     def copy(self):
-        copy = Function(self.name, self.body, self.arg_names, self.return_type)
+        copy = Function(self.name, self.body, self.arg_names, self.return_type,
+                        self.declaration, self.tiering, self.type_feedback)
         copy.set_context(self.context)
         copy.set_pos(self.pos_start, self.pos_end)
         return copy
@@ -466,6 +791,8 @@ class BuiltInFunction(BaseFunction):
     def execute_len(self, exec_ctx):
         list_ = exec_ctx.symbol_table.get("list")
 
+        if isinstance(list_, Map):
+            return InterpreterResult().success(Int.of(len(list_.entries)))
         if not isinstance(list_, List):
             return InterpreterResult().failure(
                 RuntimeError(
@@ -473,7 +800,7 @@ class BuiltInFunction(BaseFunction):
                 )
             )
 
-        return InterpreterResult().success(Number(len(list_.elements)))
+        return InterpreterResult().success(Int.of(list_.length()))
 
     execute_len.arg_names = ["list"]
 
@@ -489,10 +816,10 @@ class BuiltInFunction(BaseFunction):
 
         try:
             if isinstance(value, Number):
-                return res.success(Number(int(value.value)))
+                return res.success(Int.of(int(value.value)))
             elif isinstance(value, String):
                 try:
-                    return res.success(Number(int(value.value)))
+                    return res.success(Int.of(int(value.value)))
                 except ValueError:
                     return res.failure(
                         RuntimeError(
@@ -529,10 +856,10 @@ class BuiltInFunction(BaseFunction):
 
         try:
             if isinstance(value, Number):
-                return res.success(Number(float(value.value)))
+                return res.success(Float(float(value.value)))
             elif isinstance(value, String):
                 try:
-                    return res.success(Number(float(value.value)))
+                    return res.success(Float(float(value.value)))
                 except ValueError:
                     return res.failure(
                         RuntimeError(
@@ -590,16 +917,13 @@ class BuiltInFunction(BaseFunction):
     def execute_typeof(self, exec_ctx):
         value = exec_ctx.symbol_table.get("value")
         if isinstance(value, Number):
-            if isinstance(value.value, int):
-                type_name = "int"
-            elif isinstance(value.value, float):
-                type_name = "float"
-            else:
-                type_name = "number"
+            type_name = value.type_name
         elif isinstance(value, String):
             type_name = "string"
         elif isinstance(value, List):
             type_name = "list"
+        elif isinstance(value, Map):
+            type_name = "map"
         elif isinstance(value, BaseFunction):
             type_name = "function"
         else:
@@ -609,6 +933,202 @@ class BuiltInFunction(BaseFunction):
 
     execute_typeof.arg_names = ["value"]
 
+    def map_argument(self, exec_ctx):
+        """(map, error) for the map builtins' "map" argument"""
+        map_ = exec_ctx.symbol_table.get("map")
+        if not isinstance(map_, Map):
+            return None, RuntimeError(
+                self.pos_start, self.pos_end, "Argument must be map", exec_ctx
+            )
+        return map_, None
+
+    def map_key(self, exec_ctx):
+        """(map, Python key, error) for the map builtins' "map" and "key" arguments"""
+        map_, error = self.map_argument(exec_ctx)
+        if error:
+            return None, None, error
+        key = Map.hash_key(exec_ctx.symbol_table.get("key"))
+        if key is None:
+            return None, None, RuntimeError(
+                self.pos_start, self.pos_end, "Map keys must be numbers or strings", exec_ctx
+            )
+        return map_, key, None
+
+    def execute_get(self, exec_ctx):
+        map_, key, error = self.map_key(exec_ctx)
+        if error:
+            return InterpreterResult().failure(error)
+        if key not in map_.entries:
+            return InterpreterResult().failure(
+                RuntimeError(
+                    self.pos_start,
+                    self.pos_end,
+                    f"Key not found: {exec_ctx.symbol_table.get('key')}",
+                    exec_ctx,
+                )
+            )
+        return InterpreterResult().success(map_.entries[key][1])
+
+    execute_get.arg_names = ["map", "key"]
+
+    def execute_set(self, exec_ctx):
+        map_, key, error = self.map_key(exec_ctx)
+        if error:
+            return InterpreterResult().failure(error)
+        entry = map_.entries.get(key)
+        # Overwriting keeps the entry's original key value (and so its place in the order)
+        map_key = entry[0] if entry else exec_ctx.symbol_table.get("key")
+        map_.entries[key] = (map_key, exec_ctx.symbol_table.get("value"))
+        return InterpreterResult().success(map_)
+
+    execute_set.arg_names = ["map", "key", "value"]
+
+    def execute_has(self, exec_ctx):
+        map_, key, error = self.map_key(exec_ctx)
+        if error:
+            return InterpreterResult().failure(error)
+        return InterpreterResult().success(Number.true if key in map_.entries else Number.false)
+
+    execute_has.arg_names = ["map", "key"]
+
+    def execute_remove(self, exec_ctx):
+        map_, key, error = self.map_key(exec_ctx)
+        if error:
+            return InterpreterResult().failure(error)
+        map_.entries.pop(key, None)
+        return InterpreterResult().success(map_)
+
+    execute_remove.arg_names = ["map", "key"]
+
+    def execute_keys(self, exec_ctx):
+        map_, error = self.map_argument(exec_ctx)
+        if error:
+            return InterpreterResult().failure(error)
+        return InterpreterResult().success(
+            List([key for key, value in map_.entries.values()]).set_context(exec_ctx))
+
+    execute_keys.arg_names = ["map"]
+
+    def execute_slice(self, exec_ctx):
+        value = exec_ctx.symbol_table.get("value")
+        start = exec_ctx.symbol_table.get("start")
+        end = exec_ctx.symbol_table.get("end")
+        if not isinstance(value, (List, String)):
+            return InterpreterResult().failure(
+                RuntimeError(
+                    self.pos_start, self.pos_end, "Argument must be list or string", exec_ctx
+                )
+            )
+        if type(start) is not Int or type(end) is not Int:
+            return InterpreterResult().failure(
+                RuntimeError(
+                    self.pos_start, self.pos_end, "Slice bounds must be integers", exec_ctx
+                )
+            )
+        return InterpreterResult().success(value.sliced(start.value, end.value))
+
+    execute_slice.arg_names = ["value", "start", "end"]
+
+    def string_arguments(self, exec_ctx, *names):
+        """(Python strs, error) for the string builtins' string arguments"""
+        values = []
+        for name in names:
+            value = exec_ctx.symbol_table.get(name)
+            if not isinstance(value, String):
+                return None, RuntimeError(
+                    self.pos_start, self.pos_end, "Argument must be string", exec_ctx
+                )
+            values.append(value.value)
+        return values, None
+
+    # The string builtins work on the whole Python str in one call
+    def execute_split(self, exec_ctx):
+        values, error = self.string_arguments(exec_ctx, "string", "separator")
+        if error:
+            return InterpreterResult().failure(error)
+        string, separator = values
+        if not separator:
+            return InterpreterResult().failure(
+                RuntimeError(self.pos_start, self.pos_end, "Separator must not be empty", exec_ctx)
+            )
+        elements = list(map(String, string.split(separator)))
+        return InterpreterResult().success(List(elements).set_context(exec_ctx))
+
+    execute_split.arg_names = ["string", "separator"]
+
+    def execute_join(self, exec_ctx):
+        list_ = exec_ctx.symbol_table.get("list")
+        if not isinstance(list_, List):
+            return InterpreterResult().failure(
+                RuntimeError(
+                    self.pos_start, self.pos_end, "Argument must be list", exec_ctx
+                )
+            )
+        values, error = self.string_arguments(exec_ctx, "separator")
+        if error:
+            return InterpreterResult().failure(error)
+        separator = values[0]
+        # Elements are joined as to_string would show them
+        return InterpreterResult().success(String(separator.join(map(str, list_.iter_elements()))))
+
+    execute_join.arg_names = ["list", "separator"]
+
+    def execute_find(self, exec_ctx):
+        values, error = self.string_arguments(exec_ctx, "string", "substring")
+        if error:
+            return InterpreterResult().failure(error)
+        string, substring = values
+        return InterpreterResult().success(Int.of(string.find(substring)))
+
+    execute_find.arg_names = ["string", "substring"]
+
+    def execute_replace(self, exec_ctx):
+        values, error = self.string_arguments(exec_ctx, "string", "old", "new")
+        if error:
+            return InterpreterResult().failure(error)
+        string, old, new = values
+        return InterpreterResult().success(String(string.replace(old, new)))
+
+    execute_replace.arg_names = ["string", "old", "new"]
+
+    def execute_substring(self, exec_ctx):
+        string = exec_ctx.symbol_table.get("string")
+        start = exec_ctx.symbol_table.get("start")
+        end = exec_ctx.symbol_table.get("end")
+        if not isinstance(string, String):
+            return InterpreterResult().failure(
+                RuntimeError(
+                    self.pos_start, self.pos_end, "Argument must be string", exec_ctx
+                )
+            )
+        if type(start) is not Int or type(end) is not Int:
+            return InterpreterResult().failure(
+                RuntimeError(
+                    self.pos_start, self.pos_end, "Slice bounds must be integers", exec_ctx
+                )
+            )
+        return InterpreterResult().success(string.sliced(start.value, end.value))
+
+    execute_substring.arg_names = ["string", "start", "end"]
+
+    def execute_upper(self, exec_ctx):
+        values, error = self.string_arguments(exec_ctx, "string")
+        if error:
+            return InterpreterResult().failure(error)
+        string = values[0]
+        return InterpreterResult().success(String(string.upper()))
+
+    execute_upper.arg_names = ["string"]
+
+    def execute_lower(self, exec_ctx):
+        values, error = self.string_arguments(exec_ctx, "string")
+        if error:
+            return InterpreterResult().failure(error)
+        string = values[0]
+        return InterpreterResult().success(String(string.lower()))
+
+    execute_lower.arg_names = ["string"]
+
     def execute_elos(self, exec_ctx):
         print("I love my wife, Elos!")
         return InterpreterResult().success(Number.null)
@@ -701,6 +1221,13 @@ class InterpreterResult:
 
 
 class Interpreter:
+    def __init__(self, tiering=None, profile=None, type_feedback=None):
+        # Tiered execution, and the call counters of the function being interpreted
+        self.tiering = tiering
+        self.profile = profile
+        # Per-node runtime type histograms, when profiling
+        self.type_feedback = type_feedback
+
     def visit(self, node, context):
         method_name = "visit_" + type(node).__name__
         visitor = getattr(self, method_name, self.generic_visit)
@@ -710,11 +1237,7 @@ class Interpreter:
         raise Exception("No visit_{} method".format(type(node).__name__))
 
     def visit_NumberNode(self, node, context):
-        return InterpreterResult().success(
-            Number(node.tok.value)
-            .set_context(context)
-            .set_pos(node.pos_start, node.pos_end)
-        )
+        return InterpreterResult().success(Number.of(node.tok.value))
 
     def visit_StringNode(self, node, context):
         return InterpreterResult().success(
@@ -748,6 +1271,35 @@ class Interpreter:
             List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
         )
 
+    def visit_MapNode(self, node, context):
+        res = InterpreterResult()
+        entries = {}
+
+        for key_node, value_node in node.entries:
+            key = res.register(self.visit(key_node, context))
+            if res.should_return():
+                return res
+            value = res.register(self.visit(value_node, context))
+            if res.should_return():
+                return res
+
+            hash_key = Map.hash_key(key)
+            if hash_key is None:
+                return res.failure(
+                    RuntimeError(
+                        key_node.pos_start,
+                        key_node.pos_end,
+                        "Map keys must be numbers or strings",
+                        context,
+                    )
+                )
+            entry = entries.get(hash_key)
+            entries[hash_key] = (entry[0] if entry else key, value)
+
+        return res.success(
+            Map(entries).set_context(context).set_pos(node.pos_start, node.pos_end)
+        )
+
     def visit_VariableAccessNode(self, node, context):
         res = InterpreterResult()
         var_name = node.tok.value
@@ -788,9 +1340,9 @@ class Interpreter:
 
     def type_matches(self, value, expected_type):
         if expected_type == "int":
-            return isinstance(value, Number) and isinstance(value.value, int)
+            return type(value) is Int
         elif expected_type == "float":
-            return isinstance(value, Number) and isinstance(value.value, float)
+            return type(value) is Float
         elif expected_type == "string":
             return isinstance(value, String)
         elif expected_type == "list":
@@ -799,14 +1351,13 @@ class Interpreter:
 
     def get_type_name(self, value):
         if isinstance(value, Number):
-            if isinstance(value.value, int):
-                return "int"
-            elif isinstance(value.value, float):
-                return "float"
+            return value.type_name
         elif isinstance(value, String):
             return "string"
         elif isinstance(value, List):
             return "list"
+        elif isinstance(value, Map):
+            return "map"
         return "unknown"
 
     def visit_VariableAssignmentNode(self, node, context):
@@ -851,6 +1402,20 @@ class Interpreter:
             result, error = left.divided_by(right)
         elif node.op.type == TT.POWER:
             result, error = left.powered_by(right)
+        elif node.op.type == TT.MODULO:
+            result, error = left.modulo_by(right)
+        elif node.op.type == TT.FLOOR_DIVIDE:
+            result, error = left.floor_divided_by(right)
+        elif node.op.type == TT.BIT_AND:
+            result, error = left.bit_anded_with(right)
+        elif node.op.type == TT.BIT_OR:
+            result, error = left.bit_ored_with(right)
+        elif node.op.type == TT.BIT_XOR:
+            result, error = left.bit_xored_with(right)
+        elif node.op.type == TT.SHIFT_LEFT:
+            result, error = left.shifted_left_by(right)
+        elif node.op.type == TT.SHIFT_RIGHT:
+            result, error = left.shifted_right_by(right)
         elif node.op.type == TT.EE:
             result, error = left.comparison_equals(right)
         elif node.op.type == TT.NE:
@@ -869,10 +1434,84 @@ class Interpreter:
             result, error = left.ored_with(right)
 
         if error:
-            return res.failure(error)
+            return res.failure(self.locate(error, node.left, node.right, context))
         else:
+            if self.type_feedback:
+                self.type_feedback.record(node, 0, result)
             return res.success(result.set_pos(node.pos_start, node.pos_end))
 
+    def visit_IndexNode(self, node, context):
+        res = InterpreterResult()
+        target = res.register(self.visit(node.target, context))
+        if res.should_return():
+            return res
+        index = res.register(self.visit(node.index, context))
+        if res.should_return():
+            return res
+
+        # xs[i] reads the same element as xs / i
+        if not isinstance(target, List):
+            return res.failure(RuntimeError(
+                node.pos_start, node.pos_end, f"Cannot index {self.get_type_name(target)}", context))
+        result, error = target.divided_by(index)
+        if error:
+            return res.failure(self.locate(error, node, node, context))
+        return res.success(result)
+
+    def visit_SliceNode(self, node, context):
+        res = InterpreterResult()
+        target = res.register(self.visit(node.target, context))
+        if res.should_return():
+            return res
+        bounds = []
+        for bound in (node.start, node.end):
+            if bound is None:
+                bounds.append(None)
+                continue
+            value = res.register(self.visit(bound, context))
+            if res.should_return():
+                return res
+            if type(value) is not Int:
+                return res.failure(RuntimeError(
+                    bound.pos_start, bound.pos_end, "Slice bounds must be integers", context))
+            bounds.append(value.value)
+
+        if not isinstance(target, (List, String)):
+            return res.failure(RuntimeError(
+                node.pos_start, node.pos_end, f"Cannot slice {self.get_type_name(target)}", context))
+        return res.success(target.sliced(*bounds))
+
+    def visit_IndexAssignmentNode(self, node, context):
+        res = InterpreterResult()
+        target = res.register(self.visit(node.target, context))
+        if res.should_return():
+            return res
+        index = res.register(self.visit(node.index, context))
+        if res.should_return():
+            return res
+        value = res.register(self.visit(node.value, context))
+        if res.should_return():
+            return res
+
+        if not isinstance(target, List):
+            return res.failure(RuntimeError(
+                node.pos_start, node.pos_end, f"Cannot index {self.get_type_name(target)}", context))
+        result, error = target.stored_at(index, value)
+        if error:
+            return res.failure(self.locate(error, node.target, node.index, context))
+        return res.success(result)
+
+    @staticmethod
+    def locate(error, start_node, end_node, context):
+        """Fill in the positions and context an error from a Number could not carry"""
+        if error.pos_start is None:
+            error.pos_start = start_node.pos_start
+        if error.pos_end is None:
+            error.pos_end = end_node.pos_end
+        if error.context is None:
+            error.context = context
+        return error
+
     def visit_UnaryOperationNode(self, node, context):
         res = InterpreterResult()
         right = res.register(self.visit(node.right, context))
@@ -881,9 +1520,9 @@ class Interpreter:
         error = None
         if isinstance(right, Number):
             if node.op.type == TT.MINUS:
-                number, error = right.multiplied_by(Number(-1))
+                number, error = right.multiplied_by(Int.of(-1))
             elif node.op.type == TT.PLUS:
-                number, error = right.added_to(Number(0))
+                number, error = right.added_to(Number.null)
             elif node.op.type == TK.NOT:
                 number, error = right.notted()
             if error:
@@ -903,15 +1542,20 @@ class Interpreter:
                     value = res.register(self.visit(expr, context))
                     if res.should_return():
                         return res
-                return res.success(value.set_pos(node.pos_start, node.pos_end))
+                return res.success(self.if_value(value, node))
         if node.else_case:
             for expr in node.else_case:
                 value = res.register(self.visit(expr, context))
                 if res.should_return():
                     return res
-            return res.success(value.set_pos(node.pos_start, node.pos_end))
+            return res.success(self.if_value(value, node))
         return res.success(None)
 
+    @staticmethod
+    def if_value(value, node):
+        """Value of a taken if branch: its last statement's, which loops leave as None"""
+        return value.set_pos(node.pos_start, node.pos_end) if value is not None else None
+
     def visit_ForNode(self, node, context):
         res = InterpreterResult()
         start_value = res.register(self.visit(node.start, context))
@@ -925,7 +1569,7 @@ class Interpreter:
             if res.should_return():
                 return res
         else:
-            step_value = Number(1)
+            step_value = Int.of(1)
 
         context.symbol_table.set(node.var_name.value, start_value)
 
@@ -952,8 +1596,52 @@ class Interpreter:
             if res.loop_should_break:
                 break
 
+            if self.profile:
+                self.profile.back_edges += 1
             current_value += step_value
-            context.symbol_table.set(node.var_name.value, Number(current_value))
+            context.symbol_table.set(node.var_name.value, Number.of(current_value))
+
+        return res.success(None)
+
+    def visit_ForEachNode(self, node, context):
+        res = InterpreterResult()
+        iterable = res.register(self.visit(node.iterable, context))
+        if res.should_return():
+            return res
+
+        # Runs over the elements the list had when the loop started
+        if isinstance(iterable, List):
+            elements = iterable.iter_elements()
+        elif isinstance(iterable, String):
+            elements = map(String, iterable.value)
+        else:
+            return res.failure(
+                RuntimeError(
+                    node.iterable.pos_start,
+                    node.iterable.pos_end,
+                    f"Cannot iterate over {self.get_type_name(iterable)}",
+                    context,
+                )
+            )
+
+        for element in elements:
+            context.symbol_table.set(node.var_name.value, element)
+
+            for expr in node.body:
+                res.register(self.visit(expr, context))
+                if res.loop_should_continue:
+                    res.loop_should_continue = False
+                    break
+                if res.loop_should_break:
+                    break
+                if res.should_return():
+                    return res
+
+            if res.loop_should_break:
+                break
+
+            if self.profile:
+                self.profile.back_edges += 1
 
         return res.success(None)
 
@@ -980,6 +1668,9 @@ class Interpreter:
             if res.loop_should_continue:
                 res.loop_should_continue = False
 
+            if self.profile:
+                self.profile.back_edges += 1
+
         return res.success(None)
 
     def visit_FunctionDeclarationNode(self, node, context):
@@ -989,7 +1680,8 @@ class Interpreter:
         body_node = node.body
         arg_names = [arg_name.value for arg_name in node.args]
         func_value = (
-            Function(func_name, body_node, arg_names, node.return_type)
+            Function(func_name, body_node, arg_names, node.return_type, node, self.tiering,
+                     self.type_feedback)
             .set_context(context)
             .set_pos(node.pos_start, node.pos_end)
         )
@@ -1028,6 +1720,8 @@ class Interpreter:
                 return res
 
         return_value = res.register(value_to_call.execute(args))
+        if res.error:
+            return res.failure(self.locate(res.error, node, node, context))
         if res.should_return():
             return res
         return_value = (
@@ -1035,4 +1729,6 @@ class Interpreter:
             .set_context(context)
             .set_pos(node.pos_start, node.pos_end)
         )
+        if self.type_feedback:
+            self.type_feedback.record(node, 0, return_value)
         return res.success(return_value)
@@ -0,0 +1,69 @@
+import ctypes
+import ctypes.util
+import os
+import sys
+import tempfile
+import llvmlite.binding as llvm
+
+
+class JITResult:
+    def __init__(self, exit_code, stdout=None):
+        self.exit_code = exit_code
+        self.stdout = stdout
+
+    def __repr__(self):
+        return f"JITResult(exit_code={self.exit_code}, stdout={repr(self.stdout)})"
+
+
+class JIT:
+    """Runs compiled FunLang modules in-process with llvmlite's MCJIT"""
+
+    def __init__(self, opt_level=0):
+        self.opt_level = opt_level
+        llvm.initialize()
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+
+        # Generated code calls into libc/libm (write, malloc, pow)
+        libm = ctypes.util.find_library("m")
+        if libm:
+            llvm.load_library_permanently(libm)
+        self.libc = ctypes.CDLL(None)
+
+    def compile(self, llvm_ir):
+        """Parse, verify and JIT-compile IR, returning the execution engine that owns it"""
+        module = llvm.parse_assembly(llvm_ir)
+        module.verify()
+        # The engine takes ownership of its target machine, so each one gets a fresh one
+        target_machine = llvm.Target.from_default_triple().create_target_machine(opt=self.opt_level)
+        engine = llvm.create_mcjit_compiler(module, target_machine)
+        engine.finalize_object()
+        engine.run_static_constructors()
+        return engine
+
+    def run(self, llvm_ir, capture_output=False):
+        """Call the module's main(); with capture_output, return what it wrote to stdout"""
+        engine = self.compile(llvm_ir)
+        main = ctypes.CFUNCTYPE(ctypes.c_int64)(engine.get_function_address("main"))
+
+        if not capture_output:
+            sys.stdout.flush()
+            exit_code = main()
+            self.libc.fflush(None)
+            return JITResult(exit_code)
+
+        # print() writes straight to file descriptor 1, so capture at that level
+        sys.stdout.flush()
+        self.libc.fflush(None)
+        saved_stdout = os.dup(1)
+        with tempfile.TemporaryFile() as output:
+            os.dup2(output.fileno(), 1)
+            try:
+                exit_code = main()
+                self.libc.fflush(None)
+            finally:
+                os.dup2(saved_stdout, 1)
+                os.close(saved_stdout)
+            output.seek(0)
+            stdout = output.read().decode("utf-8", errors="replace")
+        return JITResult(exit_code, stdout)
@@ -4,6 +4,8 @@ from src.config import LanguageConfig
 
 
 class Position:
+    __slots__ = ("index", "line", "column", "file_name", "file_text")
+
     def __init__(self, index, line, column, file_name, file_text):
         self.index = index
         self.line = line
@@ -28,6 +30,7 @@ class Lexer:
         self.source = source
         self.pos = Position(-1, 0, -1, file_name, source)
         self.current_char = None
+        self.error = None
         
         # Load configuration
         self.config = config if config else LanguageConfig()
@@ -35,7 +38,7 @@ class Lexer:
         self.advance()
 
     def advance(self):
-        self.pos.advance(self.source[self.pos.index] if self.pos.index < len(self.source) else None)
+        self.pos.advance(self.source[self.pos.index] if 0 <= self.pos.index < len(self.source) else None)
         self.current_char = self.source[self.pos.index] if self.pos.index < len(
             self.source) else None
 
@@ -50,8 +53,9 @@ class Lexer:
         builtin_type = self.config.get_builtin_type(identifier)
         if builtin_type:
             return builtin_type
-        
-        return None
+
+        # Check if it's an operator spelled as a word
+        return self.config.get_operator_type(identifier)
 
     def read_identifier(self):
         identifier = ""
@@ -144,6 +148,14 @@ class Lexer:
             return Token(TT.GTE, '>=', pos_start, self.pos)
         return Token(TT.GT, '>', pos_start, self.pos)
 
+    def read_plus(self):
+        pos_start = self.pos.copy()
+        self.advance()
+        if self.current_char == '=':
+            self.advance()
+            return Token(TT.PLUS_EQUALS, '+=', pos_start, self.pos)
+        return Token(TT.PLUS, '+', pos_start, pos_start)
+
     def read_arrow_or_minus(self):
         pos_start = self.pos.copy()
         self.advance()
@@ -152,54 +164,87 @@ class Lexer:
             return Token(TT.ARROW, '->', pos_start, self.pos)
         return Token(TT.MINUS, '-', pos_start, self.pos)
 
-    def tokenizer(self):
-        tokens = []
-        while self.current_char is not None:
-
-            if self.current_char.isspace():
-                self.advance()
-                continue
-            elif self.current_char.isalpha() or self.current_char == '_':
-                tokens.append(self.read_identifier())
-            elif self.current_char.isdigit():
-                tokens.append(self.read_number())
-            elif self.current_char == '"':
-                read_string = self.read_string()
-                if isinstance(read_string, IllegalCharError):
-                    return [], read_string
-                tokens.append(read_string)
-            elif self.current_char == '!':
-                read_not_equals = self.read_not_equals()
-                if isinstance(read_not_equals, IllegalCharError):
-                    return [], read_not_equals
-                tokens.append(read_not_equals)
-            elif self.current_char == '=':
-                read_equals = self.read_equals()
-                if isinstance(read_equals, IllegalCharError):
-                    return [], read_equals
-                tokens.append(read_equals)
-            elif self.current_char == '<':
-                read_less_than = self.read_less_than()
-                if isinstance(read_less_than, IllegalCharError):
-                    return [], read_less_than
-                tokens.append(read_less_than)
-            elif self.current_char == '>':
-                read_greater_than = self.read_greater_than()
-                if isinstance(read_greater_than, IllegalCharError):
-                    return [], read_greater_than
-                tokens.append(read_greater_than)
-            elif self.current_char == '-':
-                read_arrow_or_minus = self.read_arrow_or_minus()
-                if isinstance(read_arrow_or_minus, IllegalCharError):
-                    return [], read_arrow_or_minus
-                tokens.append(read_arrow_or_minus)
-            elif self.current_char in TT._value2member_map_:
+    def read_operator(self):
+        """Token for a configured symbolic operator at the current position, or None"""
+        if self.current_char not in self.config.operator_starts:
+            return None
+        for spelling in self.config.symbol_operators:
+            if self.source.startswith(spelling, self.pos.index):
                 pos_start = self.pos.copy()
-                tokens.append(
-                    Token(TT._value2member_map_[self.current_char], self.current_char, pos_start, self.pos))
-                self.advance()
-            else:
-                return [], IllegalCharError(self.pos.copy(), self.pos.copy(), self.current_char)
+                for _ in spelling:
+                    self.advance()
+                return Token(self.config.get_operator_type(spelling), spelling, pos_start, self.pos)
+        return None
+
+    def seek(self, pos):
+        """Resume tokenizing at a position that lies on a token boundary of this source"""
+        self.pos = Position(pos.index, pos.line, pos.column, self.pos.file_name, self.source)
+        self.current_char = self.source[self.pos.index] if self.pos.index < len(
+            self.source) else None
+
+    def next_token(self):
+        """Read a single token, returning (token, error); an EOF token marks the end of input"""
+        while self.current_char is not None and self.current_char.isspace():
+            self.advance()
 
-        tokens.append(Token(TT.EOF))
-        return tokens, None
+        if self.current_char is None:
+            return Token(TT.EOF), None
+        elif self.current_char.isalpha() or self.current_char == '_':
+            return self.read_identifier(), None
+        elif self.current_char.isdigit():
+            return self.read_number(), None
+
+        operator = self.read_operator()
+        if operator:
+            return operator, None
+
+        if self.current_char == '"':
+            token = self.read_string()
+        elif self.current_char == '!':
+            token = self.read_not_equals()
+        elif self.current_char == '=':
+            token = self.read_equals()
+        elif self.current_char == '<':
+            token = self.read_less_than()
+        elif self.current_char == '>':
+            token = self.read_greater_than()
+        elif self.current_char == '+':
+            token = self.read_plus()
+        elif self.current_char == '-':
+            token = self.read_arrow_or_minus()
+        elif self.current_char in TT._value2member_map_:
+            pos_start = self.pos.copy()
+            token = Token(TT._value2member_map_[self.current_char], self.current_char, pos_start, self.pos)
+            self.advance()
+        else:
+            return None, IllegalCharError(self.pos.copy(), self.pos.copy(), self.current_char)
+
+        if isinstance(token, IllegalCharError):
+            return None, token
+        return token, None
+
+    def generate_tokens(self):
+        """Yield tokens one at a time instead of building the whole list.
+
+        The stream always ends with an EOF token. On an illegal character the
+        error is stored in self.error and the EOF token is yielded in its place.
+        """
+        while True:
+            token, error = self.next_token()
+            if error:
+                self.error = error
+                yield Token(TT.EOF, None, error.pos_start, error.pos_end)
+                return
+            yield token
+            if token.type == TT.EOF:
+                return
+
+    def tokenizer(self):
+        tokens = []
+        while True:
+            token, error = self.next_token()
+            if error:
+                return [], error
+            tokens.append(token)
+            if token.type == TT.EOF:
+                return tokens, None
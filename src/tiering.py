@@ -0,0 +1,350 @@
+import ctypes
+import struct
+from src.ast_nodes import (NumberNode, BinaryOperationNode, ListNode, FunctionCallNode, VariableDeclarationNode,
+                           VariableAccessNode, VariableAssignmentNode, IndexNode, IndexAssignmentNode, IfNode, UnaryOperationNode, ForNode,
+                           ForEachNode, WhileNode, BreakNode, ContinueNode, ReturnNode)
+from src.interpreter import Number, Int, Float, List
+from src.token import Token, TokenType, KeywordType
+from src.type_inference import ListType, INT, FLOAT, BOOL
+
+# Node types native code may contain. Everything else (print, strings, closures over
+# outer variables, calls to other functions, ...) keeps a function interpreted.
+SUPPORTED_NODES = (NumberNode, BinaryOperationNode, ListNode, FunctionCallNode, VariableDeclarationNode,
+                   VariableAccessNode, VariableAssignmentNode, IndexNode, IndexAssignmentNode, IfNode, UnaryOperationNode, ForNode,
+                   ForEachNode, WhileNode, BreakNode, ContinueNode, ReturnNode)
+
+# Operators with the same meaning in compiled code. `^` is left out because the
+# interpreter may produce a float or complex result, and `and`/`or` because it
+# returns an operand where compiled code gives 0 or 1; `/` is only allowed for list
+# indexing (see type_mismatch), since int / int is true division when interpreted.
+# Division by zero and shifts that lose bits set the error flag and deoptimize.
+SUPPORTED_OPERATORS = (TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE,
+                       TokenType.MODULO, TokenType.FLOOR_DIVIDE, TokenType.BIT_AND, TokenType.BIT_OR,
+                       TokenType.BIT_XOR, TokenType.SHIFT_LEFT, TokenType.SHIFT_RIGHT,
+                       TokenType.EE, TokenType.NE, TokenType.LT, TokenType.GT, TokenType.LTE,
+                       TokenType.GTE, KeywordType.NOT)
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+class FunctionProfile:
+    """Call and loop back-edge counts of one function declaration, and its native code"""
+
+    __slots__ = ("name", "calls", "back_edges", "native", "blocked", "deopts")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.back_edges = 0
+        # Compiled specializations by argument type tuple
+        self.native = {}
+        # Why the function (or one argument type tuple) has to stay interpreted
+        self.blocked = {}
+        self.deopts = 0
+
+
+class NativeFunction:
+    """A JIT-compiled specialization and the ctypes trampoline that calls it"""
+
+    def __init__(self, engine, address, param_types, return_type, stores_into_lists=False):
+        # The engine owns the machine code, so it lives as long as this does
+        self.engine = engine
+        self.entry = ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.POINTER(ctypes.c_int64),
+                                      ctypes.POINTER(ctypes.c_int64))(address)
+        self.param_types = param_types
+        self.return_type = return_type
+        # Whether list arguments have to be copied back after the call
+        self.stores_into_lists = stores_into_lists
+
+    def call(self, args, libc):
+        """Run the native code; returns the result as a Value, or None to fall back"""
+        slots = []
+        buffers = {}
+        for value, param_type in zip(args, self.param_types):
+            if isinstance(param_type, ListType):
+                # Arguments sharing their elements share a buffer, so a store through one is seen through the other
+                shared = buffers.get(id(value.elements))
+                if shared is None:
+                    elements = [to_slot(element.value) for element in value.elements]
+                    buffer = (ctypes.c_int64 * max(len(elements), 1))(*elements)
+                    shared = buffers[id(value.elements)] = (value, buffer, param_type.element)
+                slots += [len(value.elements), 0, ctypes.addressof(shared[1])]
+            else:
+                slots.append(to_slot(value.value))
+
+        arg_array = (ctypes.c_int64 * max(len(slots), 1))(*slots)
+        result = (ctypes.c_int64 * 3)()
+        if self.entry(arg_array, result):
+            # Out of bounds list access or integer overflow: the interpreter redoes the call
+            return None
+
+        if self.stores_into_lists:
+            # Indexed assignments went to the argument buffers; the interpreter's lists share their elements
+            for value, buffer, element_type in buffers.values():
+                value.elements[:] = [Number.of(from_slot(slot, element_type))
+                                     for slot in buffer[:len(value.elements)]]
+
+        if isinstance(self.return_type, ListType):
+            length, capacity, data = result
+            elements = list((ctypes.c_int64 * length).from_address(data)) if length else []
+            if capacity:
+                libc.free(ctypes.c_void_p(data))
+            return List([Number.of(from_slot(element, self.return_type.element)) for element in elements])
+        return Number.of(from_slot(result[0], self.return_type))
+
+
+def to_slot(value):
+    if isinstance(value, float):
+        return struct.unpack("<q", struct.pack("<d", value))[0]
+    return value
+
+
+def from_slot(slot, value_type):
+    if value_type == FLOAT:
+        return struct.unpack("<d", struct.pack("<q", slot))[0]
+    return slot
+
+
+def native_type(value):
+    """Compiled type for an interpreter value, or None if it cannot be passed to native code"""
+    if type(value) is Float:
+        return FLOAT if isinstance(value.value, float) else None
+    if type(value) is Int:
+        return INT if INT64_MIN <= value.value <= INT64_MAX else None
+    if isinstance(value, List):
+        element_types = {native_type(element) for element in value.elements}
+        if len(element_types) > 1 or element_types & {None} or any(
+                isinstance(t, ListType) for t in element_types):
+            return None
+        return ListType(element_types.pop() if element_types else None)
+    return None
+
+
+class TieredExecution:
+    """Interprets functions until they are hot, then runs them as native code.
+
+    Every call and loop back-edge of an interpreted function is counted. Once
+    either count crosses its threshold, the function is compiled through
+    CodeGenerator for the types of the arguments it is being called with and
+    run with MCJIT; later calls with the same argument types go through a
+    ctypes trampoline. A function stays interpreted when its body uses anything
+    whose compiled meaning could differ from the interpreter's. A native call
+    that hits an out of bounds list access or overflows 64-bit integer
+    arithmetic is re-run by the interpreter, which reports the error or computes
+    the unbounded result. Native code has no side effects other than indexed
+    assignments into copies of its list arguments, which are only copied back
+    once it succeeds, so re-running is safe.
+    """
+
+    CALL_THRESHOLD = 50
+    BACK_EDGE_THRESHOLD = 10_000
+
+    def __init__(self, call_threshold=CALL_THRESHOLD, back_edge_threshold=BACK_EDGE_THRESHOLD, opt_level=2):
+        self.call_threshold = call_threshold
+        self.back_edge_threshold = back_edge_threshold
+        self.opt_level = opt_level
+        self.profiles = {}
+        self.jit = None
+        self.native_calls = 0
+
+    def profile(self, function):
+        declaration = function.declaration
+        profile = self.profiles.get(id(declaration))
+        if profile is None:
+            profile = self.profiles[id(declaration)] = FunctionProfile(function.name)
+        return profile
+
+    def enter(self, function, args):
+        """Count a call; returns (profile, value), with value None unless native code ran"""
+        if function.declaration is None:
+            return None, None
+        profile = self.profile(function)
+        profile.calls += 1
+        if len(args) != len(function.arg_names):
+            return profile, None
+
+        arg_types = tuple(native_type(arg) for arg in args)
+        native = profile.native.get(arg_types)
+        if native is None:
+            if (profile.calls < self.call_threshold and profile.back_edges < self.back_edge_threshold) \
+                    or None in arg_types or arg_types in profile.blocked or None in profile.blocked:
+                return profile, None
+            native = self.tier_up(function, profile, arg_types)
+            if native is None:
+                return profile, None
+
+        value = native.call(args, self.jit.libc)
+        if value is None:
+            profile.deopts += 1
+            return profile, None
+        self.native_calls += 1
+        return profile, value
+
+    def tier_up(self, function, profile, arg_types):
+        """Compile a specialization of function for arg_types, or record why it can't be"""
+        declaration = function.declaration
+        reason = unsupported_construct(declaration)
+        if reason:
+            # Nothing about the body depends on the argument types
+            profile.blocked[None] = reason
+            return None
+
+        try:
+            from src.codegen import CodeGenerator
+            from src.jit import JIT
+
+            codegen = CodeGenerator(self.opt_level)
+            llvm_ir, mangled = codegen.generate_function(declaration, arg_types)
+            reason = type_mismatch(codegen.types, declaration.name.value)
+            if reason:
+                profile.blocked[arg_types] = reason
+                return None
+
+            if self.jit is None:
+                self.jit = JIT(self.opt_level)
+            engine = self.jit.compile(llvm_ir)
+            address = engine.get_function_address(f"{mangled}.entry")
+            return_type = codegen.types.return_type(mangled)
+        except Exception as e:
+            profile.blocked[arg_types] = f"compile error: {e}"
+            return None
+
+        if return_type == BOOL:
+            return_type = INT
+        native = NativeFunction(engine, address, arg_types, return_type,
+                                contains(declaration.body, IndexAssignmentNode))
+        profile.native[arg_types] = native
+        return native
+
+    def report(self):
+        """Summary of the functions that moved to native code and those that could not"""
+        lines = []
+        for profile in self.profiles.values():
+            counts = f"{profile.calls} calls, {profile.back_edges} interpreted loop iterations"
+            for arg_types in profile.native:
+                types = ", ".join(str(t) for t in arg_types)
+                lines.append(f"tier-up: {profile.name}({types}) [{counts}]")
+            for arg_types, reason in profile.blocked.items():
+                lines.append(f"interpreted: {profile.name}: {reason} [{counts}]")
+            if profile.deopts:
+                lines.append(f"deopt: {profile.name} re-ran {profile.deopts} calls in the interpreter")
+        tier_ups = sum(len(profile.native) for profile in self.profiles.values())
+        lines.append(f"{tier_ups} tier-ups, {self.native_calls} native calls")
+        return "\n".join(lines)
+
+
+def unsupported_construct(declaration):
+    """Why a function body can't run as native code regardless of argument types, or None"""
+    if declaration.name is None:
+        return "anonymous function"
+    body = declaration.body
+    if not body or not isinstance(body[-1], ReturnNode):
+        return "does not end with a return statement"
+
+    name = declaration.name.value
+
+    def check(value, in_while=False):
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                reason = check(item, in_while)
+                if reason:
+                    return reason
+            return None
+        if not hasattr(value, "pos_start") or isinstance(value, Token):
+            return None
+        if not isinstance(value, SUPPORTED_NODES):
+            return f"uses {type(value).__name__}"
+        if isinstance(value, (BinaryOperationNode, UnaryOperationNode)) and value.op.type not in SUPPORTED_OPERATORS:
+            return f"uses operator {value.op.type}"
+        if isinstance(value, FunctionCallNode):
+            callee = value.name.tok.value if hasattr(value.name, "tok") else value.name.value
+            if callee not in (name, "len"):
+                return f"calls {callee}"
+        if isinstance(value, ReturnNode) and value.node_to_return is None:
+            return "returns no value"
+        if isinstance(value, ForNode):
+            # The interpreter counts down with a negative step; compiled loops only count up
+            if value.step and not (isinstance(value.step, NumberNode) and value.step.tok.value > 0):
+                return "for loop without a constant positive step"
+            if assigns(value.body, value.var_name.value):
+                return f"assigns loop variable {value.var_name.value}"
+        if isinstance(value, ContinueNode) and in_while:
+            return "continue inside a while loop"
+        if isinstance(value, WhileNode):
+            in_while = True
+        if isinstance(value, (ForNode, ForEachNode)):
+            in_while = False
+        return check(list(vars(value).values()), in_while)
+
+    return check(body)
+
+
+def contains(value, node_type):
+    if isinstance(value, (list, tuple)):
+        return any(contains(item, node_type) for item in value)
+    if not hasattr(value, "pos_start") or isinstance(value, Token):
+        return False
+    return isinstance(value, node_type) or contains(list(vars(value).values()), node_type)
+
+
+def assigns(value, var_name):
+    if isinstance(value, (list, tuple)):
+        return any(assigns(item, var_name) for item in value)
+    if not hasattr(value, "pos_start") or isinstance(value, Token):
+        return False
+    if isinstance(value, VariableAssignmentNode) and value.tok.value == var_name:
+        return True
+    return assigns(list(vars(value).values()), var_name)
+
+
+def type_mismatch(types, name):
+    """Why inferred types would make native results differ from interpreted ones, or None.
+
+    Compiled variables and returns have one type, where the interpreter's hold
+    whatever was last stored: an int variable later assigned a float would come
+    back as a float even on paths that never stored one, and list operations
+    other than indexing copy where the interpreter shares elements.
+    """
+    def same(a, b):
+        return (INT if a == BOOL else a) == (INT if b == BOOL else b)
+
+    for mangled, specialization in types.specializations.items():
+        if specialization.name != name:
+            continue
+        return_type = types.return_type(mangled)
+        if return_type not in (INT, FLOAT, BOOL) and not isinstance(return_type, ListType):
+            return f"returns {return_type}"
+
+        def check(value):
+            if isinstance(value, (list, tuple)):
+                for item in value:
+                    reason = check(item)
+                    if reason:
+                        return reason
+                return None
+            if not hasattr(value, "pos_start") or isinstance(value, Token):
+                return None
+            if isinstance(value, (VariableDeclarationNode, VariableAssignmentNode)):
+                if not same(types.type_of(mangled, value), types.type_of(mangled, value.value)):
+                    return f"variable {value.tok.value} changes type"
+            if isinstance(value, ReturnNode):
+                if not same(types.type_of(mangled, value.node_to_return), return_type):
+                    return "returns values of different types"
+            if isinstance(value, BinaryOperationNode) and value.op.type != TokenType.DIVIDE:
+                if isinstance(types.type_of(mangled, value.left), ListType):
+                    return "operates on a list"
+            if isinstance(value, BinaryOperationNode) and value.op.type == TokenType.DIVIDE:
+                if not isinstance(types.type_of(mangled, value.left), ListType):
+                    return "divides numbers"
+            if isinstance(value, ForNode):
+                # Compiled loops truncate float bounds, where the interpreter counts with them
+                bounds = (value.start, value.end, value.step)
+                if any(bound is not None and not same(types.type_of(mangled, bound), INT) for bound in bounds):
+                    return "for loop with non-integer bounds"
+            return check(list(vars(value).values()))
+
+        reason = check(specialization.node.body)
+        if reason:
+            return reason
+    return None
@@ -2,6 +2,8 @@ from enum import Enum
 
 
 class Token:
+    __slots__ = ("type", "value", "pos_start", "pos_end")
+
     def __init__(self, type_, value=None, pos_start=None, pos_end=None):
         self.type = type_
         self.value = value
@@ -21,10 +23,19 @@ class TokenType(Enum):
     IDENT = "IDENT"
 
     PLUS = "+"
+    PLUS_EQUALS = "+="
     MINUS = "-"
     MULTIPLY = "*"
     DIVIDE = "/"
     POWER = "^"
+    # Spelled as configured in LanguageConfig (see its "operators" section)
+    MODULO = "MODULO"
+    FLOOR_DIVIDE = "FLOOR_DIVIDE"
+    BIT_AND = "BIT_AND"
+    BIT_OR = "BIT_OR"
+    BIT_XOR = "BIT_XOR"
+    SHIFT_LEFT = "SHIFT_LEFT"
+    SHIFT_RIGHT = "SHIFT_RIGHT"
 
     LPAREN = "("
     RPAREN = ")"
@@ -33,6 +44,7 @@ class TokenType(Enum):
     LBRACKET = "["
     RBRACKET = "]"
     COMMA = ","
+    COLON = ":"
     SEMICOLON = ";"
 
     EQUALS = "="
@@ -60,6 +72,7 @@ class KeywordType(Enum):
     ELIF = "elif"
     ELSE = "else"
     FOR = "for"
+    IN = "in"
     WHILE = "while"
     RETURN = "return"
     BREAK = "break"
@@ -80,3 +93,16 @@ class BuiltInFunctionType(Enum):
     TO_LIST = "to_list"
     TYPEOF = "typeof"
     ELOS = "elos"
+    GET = "get"
+    SET = "set"
+    HAS = "has"
+    REMOVE = "remove"
+    KEYS = "keys"
+    SLICE = "slice"
+    SPLIT = "split"
+    JOIN = "join"
+    FIND = "find"
+    REPLACE = "replace"
+    SUBSTRING = "substring"
+    UPPER = "upper"
+    LOWER = "lower"
@@ -0,0 +1,146 @@
+import hashlib
+import json
+from src.ast_nodes import BinaryOperationNode, FunctionCallNode, FunctionDeclarationNode
+from src.interpreter import Number, Float, String, List, BaseFunction
+from src.token import Token
+from src.type_inference import ListType, INT, FLOAT, STRING
+
+# Histogram buckets, in counter order
+KINDS = ("int", "float", "string", "list", "function")
+KIND_TYPES = {"int": INT, "float": FLOAT, "string": STRING, "list": ListType()}
+
+PROFILE_VERSION = 1
+
+
+def kind_of(value):
+    if isinstance(value, Number):
+        return 1 if type(value) is Float else 0
+    if isinstance(value, String):
+        return 2
+    if isinstance(value, List):
+        return 3
+    if isinstance(value, BaseFunction):
+        return 4
+    return None
+
+
+def profiled_nodes(value, nodes):
+    """Append every node that gets histograms, in a fixed program order"""
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            profiled_nodes(item, nodes)
+    elif hasattr(value, "pos_start") and not isinstance(value, Token):
+        if isinstance(value, (BinaryOperationNode, FunctionCallNode, FunctionDeclarationNode)):
+            nodes.append(value)
+        for item in vars(value).values():
+            profiled_nodes(item, nodes)
+
+
+def histogram_count(node):
+    """Binary operations and calls record their result; declarations each parameter, then the return value"""
+    if isinstance(node, FunctionDeclarationNode):
+        return len(node.args) + 1
+    return 1
+
+
+class TypeFeedback:
+    """Histograms of the runtime types the interpreter sees at each profiled node.
+
+    Every BinaryOperationNode and FunctionCallNode has one histogram for its
+    result; every FunctionDeclarationNode has one per parameter plus one for its
+    return value. All counters live in one flat list, indexed by the node's
+    first histogram slot times len(KINDS) plus the kind. Profiles are saved with
+    a hash of the source and only apply to that exact source.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.slots = {}
+        self.counts = []
+        self.source_hash = None
+
+    def index(self, ast, source):
+        """Assign histogram slots to the nodes of the program about to run"""
+        self.nodes = []
+        profiled_nodes(ast, self.nodes)
+        self.slots = {}
+        slot = 0
+        for node in self.nodes:
+            self.slots[id(node)] = slot
+            slot += histogram_count(node)
+        self.counts = [0] * (slot * len(KINDS))
+        self.source_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        return self
+
+    def record(self, node, position, value):
+        slot = self.slots.get(id(node))
+        if slot is not None:
+            kind = kind_of(value)
+            if kind is not None:
+                self.counts[(slot + position) * len(KINDS) + kind] += 1
+
+    def histogram(self, node, position=0):
+        slot = self.slots.get(id(node))
+        if slot is None:
+            return None
+        start = (slot + position) * len(KINDS)
+        return dict(zip(KINDS, self.counts[start:start + len(KINDS)]))
+
+    def observed_type(self, node, position=0):
+        """Most frequently seen type at a node's histogram, or None if nothing usable was seen"""
+        histogram = self.histogram(node, position)
+        if not histogram or not any(histogram.values()):
+            return None
+        kind = max(KINDS, key=lambda k: histogram[k])
+        return KIND_TYPES.get(kind)
+
+    def param_type(self, declaration, index):
+        return self.observed_type(declaration, index)
+
+    def return_type(self, declaration):
+        return self.observed_type(declaration, len(declaration.args))
+
+    def save(self, path):
+        nodes = []
+        for node in self.nodes:
+            slot = self.slots[id(node)] * len(KINDS)
+            size = histogram_count(node) * len(KINDS)
+            counts = self.counts[slot:slot + size]
+            nodes.append({
+                "node": type(node).__name__,
+                "line": node.pos_start.line + 1,
+                "column": node.pos_start.column + 1,
+                "histograms": [counts[i:i + len(KINDS)] for i in range(0, size, len(KINDS))],
+            })
+        with open(path, "w") as f:
+            json.dump({"version": PROFILE_VERSION, "source_sha256": self.source_hash,
+                       "kinds": list(KINDS), "nodes": nodes}, f)
+
+    @staticmethod
+    def load(path, ast, source):
+        """Read a profile saved for `source` and attach it to its freshly parsed ast; returns (feedback, error)"""
+        try:
+            with open(path, "r") as f:
+                profile = json.load(f)
+        except FileNotFoundError:
+            return None, f"Profile '{path}' not found"
+        except ValueError as e:
+            return None, f"Profile '{path}' is not valid JSON: {e}"
+
+        if profile.get("version") != PROFILE_VERSION or profile.get("kinds") != list(KINDS):
+            return None, f"Profile '{path}' has an unsupported format"
+
+        feedback = TypeFeedback().index(ast, source)
+        if profile.get("source_sha256") != feedback.source_hash:
+            return None, f"Profile '{path}' was recorded for a different version of the source"
+        if [entry["node"] for entry in profile["nodes"]] != [type(node).__name__ for node in feedback.nodes]:
+            return None, f"Profile '{path}' does not match the program"
+
+        counts = []
+        for entry in profile["nodes"]:
+            for histogram in entry["histograms"]:
+                counts.extend(histogram)
+        if len(counts) != len(feedback.counts):
+            return None, f"Profile '{path}' does not match the program"
+        feedback.counts = counts
+        return feedback, None
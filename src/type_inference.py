@@ -0,0 +1,509 @@
+from src.token import TokenType, KeywordType
+from src.ast_nodes import ListNode, VariableAccessNode
+
+INT = "int"
+FLOAT = "float"
+BOOL = "bool"
+STRING = "string"
+
+# Scope name used for top-level code
+MAIN = "main"
+
+
+class ListType:
+    """Type of a list whose elements all have the type `element` (None while unknown)"""
+
+    __slots__ = ("element",)
+
+    def __init__(self, element=None):
+        self.element = element
+
+    def __eq__(self, other):
+        return isinstance(other, ListType) and self.element == other.element
+
+    def __hash__(self):
+        return hash(("list", self.element))
+
+    def __repr__(self):
+        return f"list[{self.element}]" if self.element else "list"
+
+
+class MapType:
+    """Type of a map from `key` to `value` (each None while unknown)"""
+
+    __slots__ = ("key", "value")
+
+    def __init__(self, key=None, value=None):
+        self.key = key
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, MapType) and self.key == other.key and self.value == other.value
+
+    def __hash__(self):
+        return hash(("map", self.key, self.value))
+
+    def __repr__(self):
+        return f"map[{self.key}, {self.value}]" if self.key or self.value else "map"
+
+
+ANNOTATIONS = {
+    KeywordType.INT_TYPE: INT,
+    KeywordType.FLOAT_TYPE: FLOAT,
+    KeywordType.STRING_TYPE: STRING,
+    KeywordType.LIST_TYPE: ListType(),
+}
+
+NUMERIC_RANK = {BOOL: 0, INT: 1, FLOAT: 2}
+
+# Builtins operating on maps; the first argument is always the map
+MAP_BUILTINS = ("get", "set", "has", "remove", "keys")
+
+COMPARISONS = (TokenType.EE, TokenType.NE, TokenType.LT,
+               TokenType.GT, TokenType.LTE, TokenType.GTE)
+
+BITWISE_OPERATORS = (TokenType.BIT_AND, TokenType.BIT_OR, TokenType.BIT_XOR,
+                     TokenType.SHIFT_LEFT, TokenType.SHIFT_RIGHT)
+
+
+def join(a, b):
+    """Smallest type both a and b convert to without losing information"""
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    if a in NUMERIC_RANK and b in NUMERIC_RANK:
+        return a if NUMERIC_RANK[a] > NUMERIC_RANK[b] else b
+    if isinstance(a, ListType) and isinstance(b, ListType):
+        # Elements are stored unconverted, so a list's element type can only be refined
+        if a.element is None:
+            return b
+        if b.element is None:
+            return a
+    if isinstance(a, MapType) and isinstance(b, MapType):
+        # Like list elements, map entries are stored unconverted
+        key, value = refine(a.key, b.key), refine(a.value, b.value)
+        if key is not False and value is not False:
+            return MapType(key, value)
+    raise Exception(f"Type mismatch: cannot combine '{a}' and '{b}'")
+
+
+def refine(a, b):
+    """The known one of a and b, or False if both are known and differ"""
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    return False
+
+
+def element_type(value_type):
+    """Type a value is stored as inside a list (booleans are widened to int)"""
+    return INT if value_type == BOOL else value_type
+
+
+def mangle(name, param_types):
+    """Name of the specialization of function `name` for the given parameter types"""
+    if not param_types:
+        return name
+    names = []
+    for param_type in param_types:
+        if isinstance(param_type, ListType):
+            names.append(f"list_{param_type.element}" if param_type.element else "list")
+        elif isinstance(param_type, MapType):
+            names.append(f"map_{param_type.key}_{param_type.value}")
+        else:
+            names.append(param_type)
+    return ".".join([name] + names)
+
+
+class Specialization:
+    """One copy of a function, compiled for a single tuple of argument types"""
+
+    def __init__(self, name, node, param_types, return_type, annotated):
+        self.name = name
+        self.node = node
+        self.param_types = param_types
+        self.return_type = return_type
+        self.annotated = annotated
+
+
+class TypeInference:
+    """Flow-based type inference over a whole program.
+
+    Variable and return types start out unknown (or at their annotation) and
+    are widened with every value that flows into them until nothing changes.
+    Every distinct tuple of argument types a function is called with gets its
+    own specialization, inferred separately. Anything still unknown at the end
+    defaults to int, and functions that are never called get an all-int
+    specialization so their bodies are still checked. With a TypeFeedback
+    profile, those defaults are the types the interpreter actually saw instead;
+    statically inferred types always win over the profile.
+
+    Each `var` declaration (and each parameter and for-loop variable) is its
+    own variable, and names resolve to the latest one in program order, the
+    same way CodeGenerator tracks its locals.
+    """
+
+    MAX_PASSES = 100
+
+    def __init__(self, feedback=None):
+        self.feedback = feedback
+        self.functions = {}
+        self.specializations = {}
+        self.call_targets = {}
+        self.default_specializations = {}
+        self.defaulting = False
+        self.variables = {}
+        self.annotated_variables = set()
+        self.node_types = {}
+        self.changed = False
+        self.scope = MAIN
+        # Variable each name currently refers to in the scope being walked
+        self.bindings = {}
+
+    def infer(self, ast_node):
+        statements = ast_node.element_nodes if isinstance(ast_node, ListNode) else [ast_node]
+        self.converge(statements)
+
+        # Fill in whatever the program never pinned down with the profiled type, or int
+        self.defaulting = True
+        for name, node in self.functions.items():
+            if not any(s.name == name for s in self.specializations.values()):
+                param_types = tuple(self.default_param_type(node, i) for i in range(len(node.args)))
+                self.default_specializations[name] = self.specialize(name, param_types)
+        self.converge(statements)
+        return self
+
+    def infer_function(self, node, param_types):
+        """Infer types for a single function compiled on its own for param_types"""
+        name = node.name.value
+        self.functions[name] = node
+        self.specialize(name, tuple(param_types))
+        self.converge([])
+        self.defaulting = True
+        self.converge([])
+        return self
+
+    def converge(self, statements):
+        for _ in range(self.MAX_PASSES):
+            self.changed = False
+            self.scope = MAIN
+            self.bindings = {}
+            for statement in statements:
+                self.visit(statement)
+            for mangled, specialization in list(self.specializations.items()):
+                self.visit_body(mangled, specialization)
+            if not self.changed:
+                break
+
+    # Results
+
+    def type_of(self, scope, node):
+        return self.node_types.get(scope, {}).get(id(node))
+
+    def param_type(self, scope, name):
+        """Type of a parameter's variable, which reassignments may have widened"""
+        var_type = self.variables.get((scope, "param", name))
+        return INT if var_type is None else var_type
+
+    def loop_variable_type(self, scope, node):
+        """Type of a for-each loop's variable"""
+        var_type = self.variables.get((scope, id(node)))
+        return INT if var_type is None else var_type
+
+    def call_target(self, scope, node):
+        """Mangled name of the specialization a call resolves to"""
+        return self.call_targets.get((scope, id(node)))
+
+    def param_types(self, mangled):
+        return list(self.specializations[mangled].param_types)
+
+    def return_type(self, mangled):
+        specialization = self.specializations[mangled]
+        if specialization.return_type is not None:
+            return specialization.return_type
+        observed = self.feedback.return_type(specialization.node) if self.feedback else None
+        return INT if observed is None else observed
+
+    def default_param_type(self, declaration, index):
+        """Type for a parameter nothing in the program pins down"""
+        observed = self.feedback.param_type(declaration, index) if self.feedback else None
+        return INT if observed is None else observed
+
+    # Passes
+
+    def widen(self, table, key, value_type):
+        new_type = join(table.get(key), value_type)
+        if new_type != table.get(key):
+            table[key] = new_type
+            self.changed = True
+        return new_type
+
+    def specialize(self, name, param_types):
+        mangled = mangle(name, param_types)
+        if mangled not in self.specializations:
+            node = self.functions[name]
+            return_type = ANNOTATIONS.get(node.return_type.type) if node.return_type else None
+            self.specializations[mangled] = Specialization(
+                name, node, param_types, return_type, return_type is not None)
+            self.changed = True
+        return mangled
+
+    def visit_body(self, name, specialization):
+        old_scope, old_bindings = self.scope, self.bindings
+        self.scope = name
+        self.bindings = {}
+        for param, param_type in zip(specialization.node.args, specialization.param_types):
+            key = (name, "param", param.value)
+            self.bindings[param.value] = key
+            self.widen(self.variables, key, param_type)
+        for statement in specialization.node.body:
+            self.visit(statement)
+        self.scope, self.bindings = old_scope, old_bindings
+
+    def visit(self, node):
+        method = getattr(self, f"visit_{type(node).__name__}", None)
+        result = method(node) if method else None
+        self.node_types.setdefault(self.scope, {})[id(node)] = result
+        return result
+
+    def visit_NumberNode(self, node):
+        return INT if isinstance(node.tok.value, int) else FLOAT
+
+    def visit_StringNode(self, node):
+        return STRING
+
+    def visit_ListNode(self, node):
+        element = ANNOTATIONS.get(node.type_tok.type) if node.type_tok else None
+        annotated = element is not None
+        for element_node in node.element_nodes:
+            value_type = element_type(self.visit(element_node))
+            if not annotated:
+                element = join(element, value_type)
+        return ListType(element)
+
+    def visit_MapNode(self, node):
+        key, value = None, None
+        for key_node, value_node in node.entries:
+            key = join(key, element_type(self.visit(key_node)))
+            value = join(value, element_type(self.visit(value_node)))
+        return MapType(key, value)
+
+    def map_builtin_type(self, name, node, arg_types):
+        """Result type of a map builtin; keys and values used on a map variable refine its type"""
+        map_type = arg_types[0] if arg_types and isinstance(arg_types[0], MapType) else MapType()
+        if len(arg_types) > 1 and arg_types[1] is not None:
+            map_type = self.store_into_map(node, map_type, key=element_type(arg_types[1]))
+        if name == "set" and len(arg_types) > 2 and arg_types[2] is not None:
+            map_type = self.store_into_map(node, map_type, value=element_type(arg_types[2]))
+
+        if name == "get":
+            return map_type.value
+        if name == "has":
+            return BOOL
+        if name == "keys":
+            return ListType(map_type.key)
+        return map_type
+
+    def store_into_map(self, node, map_type, key=None, value=None):
+        """Refine the map passed to a builtin with a key or value type used on it"""
+        new_type = MapType(refine(map_type.key, key), map_type.value)
+        if value is not None:
+            new_value = refine(map_type.value, value)
+            if new_value is False and map_type.value in NUMERIC_RANK and join(map_type.value, value) == map_type.value:
+                # An int stored into a float map is converted
+                new_value = map_type.value
+            new_type.value = new_value
+        if new_type.key is False or new_type.value is False:
+            raise Exception(f"Type mismatch: cannot store '{key or value}' in '{map_type}'")
+        if new_type != map_type:
+            target = node.args[0]
+            if isinstance(target, VariableAccessNode) and self.bindings.get(target.tok.value):
+                self.assign(self.bindings[target.tok.value], new_type)
+        return new_type
+
+    def visit_VariableDeclarationNode(self, node):
+        value_type = self.visit(node.value)
+        key = (self.scope, id(node))
+        self.bindings[node.tok.value] = key
+        if node.type_tok:
+            # Annotated variables keep their declared type; values are converted to it
+            annotation = ANNOTATIONS[node.type_tok.type]
+            if isinstance(annotation, ListType) and isinstance(value_type, ListType):
+                annotation = value_type
+            self.annotated_variables.add(key)
+            return self.widen(self.variables, key, annotation)
+        return self.assign(key, value_type)
+
+    def visit_VariableAssignmentNode(self, node):
+        value_type = self.visit(node.value)
+        key = self.bindings.get(node.tok.value)
+        return self.assign(key, value_type) if key else None
+
+    def assign(self, key, value_type):
+        if key in self.annotated_variables and not isinstance(value_type, ListType):
+            return self.variables[key]
+        return self.widen(self.variables, key, value_type)
+
+    def visit_IndexNode(self, node):
+        target = self.visit(node.target)
+        self.visit(node.index)
+        return target.element if isinstance(target, ListType) else None
+
+    def visit_SliceNode(self, node):
+        target = self.visit(node.target)
+        for bound in (node.start, node.end):
+            if bound is not None:
+                self.visit(bound)
+        return target
+
+    def visit_IndexAssignmentNode(self, node):
+        target = self.visit(node.target)
+        self.visit(node.index)
+        value_type = self.visit(node.value)
+        if not isinstance(target, ListType) or value_type is None:
+            return value_type
+        value_type = element_type(value_type)
+        if target.element is None:
+            # Storing into a list of unknown elements pins them down
+            if isinstance(node.target, VariableAccessNode) and self.bindings.get(node.target.tok.value):
+                self.assign(self.bindings[node.target.tok.value], ListType(value_type))
+        elif value_type != target.element and not (
+                value_type in NUMERIC_RANK and target.element in NUMERIC_RANK
+                and join(target.element, value_type) == target.element):
+            raise Exception(f"Type mismatch: cannot store '{value_type}' in '{target}'")
+        return value_type
+
+    def visit_VariableAccessNode(self, node):
+        return self.variables.get(self.bindings.get(node.tok.value))
+
+    def visit_BinaryOperationNode(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.op.type
+
+        if isinstance(left, ListType) or isinstance(right, ListType):
+            if op == TokenType.PLUS and isinstance(left, ListType):
+                if right is None or isinstance(right, ListType):
+                    return left
+                value_type = element_type(right)
+                if left.element is None or join(left.element, value_type) == left.element:
+                    return ListType(left.element or value_type)
+                raise Exception(f"Type mismatch: cannot append '{value_type}' to '{left}'")
+            if op == TokenType.MULTIPLY and isinstance(left, ListType) and isinstance(right, ListType):
+                return join(left, right)
+            if op == TokenType.MINUS:
+                return left
+            if op == TokenType.DIVIDE and isinstance(left, ListType):
+                return left.element or INT
+            return None
+
+        if op in COMPARISONS or op in (KeywordType.AND, KeywordType.OR):
+            return BOOL
+        if left is None or right is None:
+            return None
+        if op in BITWISE_OPERATORS and FLOAT in (left, right):
+            raise Exception(f"Type mismatch: bitwise operators need integers, not '{left}' and '{right}'")
+        if left in NUMERIC_RANK and right in NUMERIC_RANK:
+            return join(join(left, right), INT)
+        return None
+
+    def visit_UnaryOperationNode(self, node):
+        operand = self.visit(node.right)
+        if node.op.type == KeywordType.NOT:
+            return BOOL
+        return join(operand, INT) if operand in NUMERIC_RANK else operand
+
+    def visit_FunctionCallNode(self, node):
+        name = node.name.tok.value if hasattr(node.name, 'tok') else node.name.value
+        arg_types = [self.visit(arg) for arg in node.args]
+
+        # A function the program declares replaces the builtin of the same name
+        if name in ("print", "len") and name not in self.functions:
+            return INT
+        if name in MAP_BUILTINS and name not in self.functions:
+            return self.map_builtin_type(name, node, arg_types)
+        if name == "slice" and name not in self.functions:
+            return arg_types[0] if arg_types else None
+        declaration = self.functions.get(name)
+        if declaration is None or len(arg_types) != len(declaration.args):
+            return None
+        if None in arg_types:
+            # Wait for the argument types to be inferred
+            if not self.defaulting:
+                return None
+            arg_types = [self.default_param_type(declaration, i) if t is None else t
+                         for i, t in enumerate(arg_types)]
+
+        mangled = self.specialize(name, tuple(arg_types))
+        self.call_targets[(self.scope, id(node))] = mangled
+        return self.specializations[mangled].return_type
+
+    def visit_FunctionDeclarationNode(self, node):
+        name = node.name.value if hasattr(node.name, 'value') else str(node.name)
+        if name not in self.functions:
+            self.functions[name] = node
+            self.changed = True
+        return None
+
+    def visit_ReturnNode(self, node):
+        if not node.node_to_return:
+            return None
+        value_type = self.visit(node.node_to_return)
+        specialization = self.specializations.get(self.scope)
+        if specialization and not specialization.annotated:
+            new_type = join(specialization.return_type, value_type)
+            if new_type != specialization.return_type:
+                specialization.return_type = new_type
+                self.changed = True
+        return value_type
+
+    def visit_IfNode(self, node):
+        for condition, body in node.cases:
+            self.visit(condition)
+            for statement in body:
+                self.visit(statement)
+        for statement in node.else_case:
+            self.visit(statement)
+        return INT
+
+    def visit_ForNode(self, node):
+        self.visit(node.start)
+        self.visit(node.end)
+        if node.step:
+            self.visit(node.step)
+        name = node.var_name.value
+        old_binding = self.bindings.get(name)
+        self.bindings[name] = (self.scope, id(node))
+        self.widen(self.variables, self.bindings[name], INT)
+        for statement in node.body:
+            self.visit(statement)
+        if old_binding:
+            self.bindings[name] = old_binding
+        else:
+            del self.bindings[name]
+        return INT
+
+    def visit_ForEachNode(self, node):
+        iterable = self.visit(node.iterable)
+        name = node.var_name.value
+        old_binding = self.bindings.get(name)
+        self.bindings[name] = (self.scope, id(node))
+        if isinstance(iterable, ListType) and iterable.element is not None:
+            self.widen(self.variables, self.bindings[name], iterable.element)
+        elif iterable == STRING:
+            self.widen(self.variables, self.bindings[name], STRING)
+        for statement in node.body:
+            self.visit(statement)
+        if old_binding:
+            self.bindings[name] = old_binding
+        else:
+            del self.bindings[name]
+        return INT
+
+    def visit_WhileNode(self, node):
+        self.visit(node.condition)
+        for statement in node.body:
+            self.visit(statement)
+        return INT
@@ -1,4 +1,3 @@
-import os
 from tests.compiler.base import compile_test, run_compiled_code
 
 ''' arithmetic operations tests '''
@@ -103,6 +102,52 @@ expected_arith_output = (
 llvm_ir_arith = compile_test(arith_tests)
 compiled_arith_output, compile_arith_error = run_compiled_code(llvm_ir_arith)
 assert compiled_arith_output == expected_arith_output.strip()
-os.remove("temp.ll")
-os.remove("temp.o")
-os.remove("temp_executable")
+
+
+operator_test = """
+print(17 % 5);
+print(-17 % 5);
+print(17 % -5);
+print(17 // 5);
+print(-17 // 5);
+print(7.5 % 2);
+print(1 // 0.1);
+print(12 & 10);
+print(12 | 3);
+print(12 xor 10);
+print(1 + 2 << 3);
+print(-1024 >> 3);
+print(5 >> 100);
+"""
+
+expected_operator_output = (
+    "2\n"
+    "3\n"
+    "-3\n"
+    "3\n"
+    "-4\n"
+    "1.500000\n"
+    "9.000000\n"
+    "8\n"
+    "15\n"
+    "6\n"
+    "24\n"
+    "-128\n"
+    "0\n"
+)
+
+for opt_level in (0, 2):
+    llvm_ir_operators = compile_test(operator_test, opt_level)
+    compiled_operator_output, compile_operator_error = run_compiled_code(llvm_ir_operators)
+    assert compiled_operator_output == expected_operator_output.strip()
+
+# % and // lower to srem and sdiv, the bitwise operators to single instructions
+llvm_ir_lowering = compile_test("var a = 7; var b = 3; print(a % b); print(a // b); print(a & b); print(a << b);")
+for instruction in ("srem", "sdiv", "and i64", "shl"):
+    assert instruction in llvm_ir_lowering
+
+try:
+    compile_test("print(1.5 & 1);")
+    assert False
+except Exception as e:
+    assert str(e) == "Type mismatch: bitwise operators need integers, not 'float' and 'int'"
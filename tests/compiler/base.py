@@ -1,22 +1,33 @@
+import os
 import subprocess
+import tempfile
+from run import link_object
 from src.parser import Parser
 from src.lexer import Lexer
 from src.codegen import CodeGenerator
+from src.jit import JIT
+
+jit = JIT()
 
 
 def run_compiled_code(llvm_ir):
-    with open('temp.ll', 'w') as f:
-        f.write(llvm_ir)
+    """Build llvm_ir into a native executable in a private directory and run it"""
+    with tempfile.TemporaryDirectory() as build_dir:
+        executable = os.path.join(build_dir, "program")
+        error = link_object(CodeGenerator.emit_object(llvm_ir), executable)
+        if error:
+            return "", error
+
+        result = subprocess.run([executable], capture_output=True, text=True)
+    return result.stdout.strip(), result.stderr
 
-    subprocess.run(['llc', '-filetype=obj', 'temp.ll', '-o', 'temp.o'])
-    subprocess.run(['clang', 'temp.o', '-o', 'temp_executable', '-lm'])
 
-    result = subprocess.run(['./temp_executable'],
-                            capture_output=True, text=True)
-    return result.stdout.strip(), result.stderr
+def run_jit_code(llvm_ir):
+    result = jit.run(llvm_ir, capture_output=True)
+    return result.stdout.strip(), result.exit_code
 
 
-def compile_test(source):
+def compile_test(source, opt_level=0):
     lexer = Lexer("<stdin>", source)
     tokens, error = lexer.tokenizer()
     if error:
@@ -27,6 +38,6 @@ def compile_test(source):
     if ast.error:
         raise Exception(f"Parser error: {ast.error.as_string()}")
 
-    codegen = CodeGenerator()
+    codegen = CodeGenerator(opt_level)
     llvm_ir = codegen.generate(ast.node)
     return llvm_ir
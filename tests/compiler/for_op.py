@@ -1,5 +1,4 @@
-import os
-from tests.compiler.base import compile_test, run_compiled_code
+from tests.compiler.base import compile_test, run_jit_code
 
 for_test = "for i=0, 6 { var j = i; }; print(j);"
 for_test2 = "for i=0, 6 { if i == 3 { break; }; print(i); };"
@@ -18,8 +17,80 @@ expected_for_output = (
 )
 
 llvm_ir_for = compile_test(for_tests)
-compiled_for_output, compile_for_error = run_compiled_code(llvm_ir_for)
+compiled_for_output, compile_for_error = run_jit_code(llvm_ir_for)
 assert compiled_for_output == expected_for_output.strip()
-os.remove("temp.ll")
-os.remove("temp.o")
-os.remove("temp_executable")
+
+
+# Every alloca lives in the entry block, so a loop nested in a long-running loop
+# does not grow the stack on each outer iteration (10M frames of loop variables
+# would overflow it)
+long_loop_test = """
+var xs = [];
+for i = 0, 10000000 {
+    for j = 0, 1 {
+        xs = xs + i;
+    }
+}
+print(xs / 9999999);
+"""
+
+llvm_ir_long_loop = compile_test(long_loop_test)
+in_entry = False
+for line in llvm_ir_long_loop.splitlines():
+    if line.startswith("define"):
+        in_entry = True
+    elif line.endswith(":") and not line.startswith(" "):
+        in_entry = line == "entry:"
+    assert in_entry or "alloca" not in line
+compiled_long_loop_output, compile_long_loop_error = run_jit_code(llvm_ir_long_loop)
+assert compiled_long_loop_output == "9999999"
+
+
+for_each_test = """
+var xs = [3, 1, 4, 1, 5];
+var total = 0;
+for x in xs { total = total + x; }
+print(total);
+for c in "hey" { print(c); }
+for y in [1.5, 2.5, 3.5] { if y > 3 { break; }; print(y); }
+for x in xs { if x == 1 { continue; }; xs = xs + x; }
+print(xs);
+fun sum(zs) { var s = 0; for z in zs { s = s + z; }; return s; }
+print(sum([1, 2, 3]));
+for x in [] { print(x); }
+"""
+
+expected_for_each_output = (
+    "14\n"
+    "h\ne\ny\n"
+    "1.500000\n2.500000\n"
+    "[3, 1, 4, 1, 5, 3, 4, 5]\n"
+    "6\n"
+)
+
+for opt_level in (0, 2):
+    llvm_ir_for_each = compile_test(for_each_test, opt_level)
+    compiled_for_each_output, compile_for_each_error = run_jit_code(llvm_ir_for_each)
+    assert compiled_for_each_output == expected_for_each_output.strip()
+
+# Elements are loaded straight from the buffer, with no bounds check or len() call
+llvm_ir_sum = compile_test("fun sum(zs) { var s = 0; for z in zs { s = s + z; }; return s; }; print(sum([1]));")
+assert "access_error" not in llvm_ir_sum
+assert "strlen" not in llvm_ir_sum
+
+# Strings are walked one UTF-8 character at a time, like the interpreter's code points
+utf8_for_each_test = """
+for c in "héllo→😀" { print(c); }
+var kept = [];
+for c in "aé" { kept = kept + c; }
+print(kept);
+"""
+
+for opt_level in (0, 2):
+    llvm_ir_utf8 = compile_test(utf8_for_each_test, opt_level)
+    compiled_utf8_output, compile_utf8_error = run_jit_code(llvm_ir_utf8)
+    assert compiled_utf8_output == "h\né\nl\nl\no\n→\n😀\n[a, é]"
+
+# Characters that are only printed reuse one buffer instead of allocating
+llvm_ir_print_chars = compile_test('for c in "abc" { print(c); }')
+assert "malloc" not in llvm_ir_print_chars.split("for_each_body")[1].split("for_each_incr")[0]
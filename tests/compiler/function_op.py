@@ -1,5 +1,4 @@
-import os
-from tests.compiler.base import compile_test, run_compiled_code
+from tests.compiler.base import compile_test, run_jit_code
 
 return_test = "fun int add(a, b) { return a + b; }; var result = add(2, 3); print(result);"
 return_test2 = "fun float divide(a, b) { return 5.0 / 2.0; }; var result = divide(10, 4); print(result);"
@@ -52,12 +51,9 @@ expected_function_output = (
 )
 
 llvm_ir_function = compile_test(function_tests)
-compiled_function_output, compile_function_error = run_compiled_code(
+compiled_function_output, compile_function_error = run_jit_code(
     llvm_ir_function)
 assert compiled_function_output == expected_function_output.strip()
-os.remove("temp.ll")
-os.remove("temp.o")
-os.remove("temp_executable")
 
 
 function_mismatched_return = """
@@ -74,3 +70,118 @@ try:
 except Exception as e:
     assert str(
         e) == "Type mismatch: function declared to return 'string' but trying to return 'int'"
+
+
+native_types_test = """
+fun scale(x, k) {
+    return x * k;
+}
+
+fun total(xs) {
+    var t = 0.0;
+    for i = 0, 3 {
+        t = t + xs / i;
+    }
+    return t;
+}
+
+fun first(xs) {
+    return xs;
+}
+
+fun label(s) {
+    return s;
+}
+
+print(scale(2.5, 4));
+var fs = [1.5, 2, 0.25];
+print(fs);
+print(total(fs));
+var words = ["apple", "banana"];
+var same = first(words);
+words = words + "cherry";
+print(same);
+print(words);
+print(label("hi"));
+var mixed = 1;
+mixed = mixed + 0.5;
+print(mixed);
+"""
+
+expected_native_output = (
+    "10.000000\n"
+    "[1.500000, 2.000000, 0.250000]\n"
+    "3.750000\n"
+    "[apple, banana]\n"
+    "[apple, banana, cherry]\n"
+    "hi\n"
+    "1.500000\n"
+)
+
+llvm_ir_native = compile_test(native_types_test)
+compiled_native_output, compile_native_error = run_jit_code(llvm_ir_native)
+assert compiled_native_output == expected_native_output.strip()
+# Float arguments are passed as doubles instead of being truncated
+assert "define double @scale.float.int(double" in llvm_ir_native
+assert "fptosi" not in llvm_ir_native
+
+
+specialization_test = """
+fun add(a, b) {
+    return a + b;
+}
+
+fun twice(x) {
+    return add(x, x);
+}
+
+print(add(2, 3));
+print(add(1.5, 2.25));
+print(twice(4));
+print(twice(0.5));
+"""
+
+expected_specialization_output = (
+    "5\n"
+    "3.750000\n"
+    "8\n"
+    "1.000000\n"
+)
+
+llvm_ir_specialized = compile_test(specialization_test)
+compiled_specialized_output, compile_specialized_error = run_jit_code(llvm_ir_specialized)
+assert compiled_specialized_output == expected_specialization_output.strip()
+# One copy per argument type tuple, each working on unconverted values
+assert "define i64 @add.int.int(i64" in llvm_ir_specialized
+assert "define double @add.float.float(double" in llvm_ir_specialized
+# Program functions, leaving out the internal runtime library
+program_functions = [f for f in llvm_ir_specialized.split("\ndefine ")[1:] if not f.startswith("internal")]
+assert len(program_functions) == 5
+for conversion in ("sitofp", "fptosi", "bitcast"):
+    assert not any(conversion in f for f in program_functions)
+
+
+print_pool_test = """
+fun int greet() {
+    print("hi");
+    print(1);
+    return 0;
+}
+print("hi");
+print("hi");
+print(2);
+print([1, 2]);
+print([3]);
+greet();
+"""
+
+llvm_ir_pool = compile_test(print_pool_test)
+compiled_pool_output, compile_pool_error = run_jit_code(llvm_ir_pool)
+assert compiled_pool_output == "hi\nhi\n2\n[1, 2]\n[3]\nhi\n1"
+# One global each for "hi", "\n", "[", ", " and "]\n", plus the output buffer and its length
+assert sum(1 for line in llvm_ir_pool.splitlines() if line.startswith("@")) == 7
+
+# A function the program declares replaces the builtin of the same name
+builtin_name_test = "var keys = [1, 2]; fun get(a, slice) { return a + slice; }; print(keys); print(get(3, 4));"
+compiled_builtin_name_output, error = run_jit_code(compile_test(builtin_name_test))
+assert compiled_builtin_name_output == "[1, 2]\n7"
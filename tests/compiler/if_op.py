@@ -1,5 +1,4 @@
-import os
-from tests.compiler.base import compile_test, run_compiled_code
+from tests.compiler.base import compile_test, run_jit_code
 
 ''' If Operations Tests '''
 if_test = "var a = 3; var case = 0; if case == 0 { a = 0; } elif case == 1 { a = 1; } else { a = 2; }; print(a)"
@@ -19,8 +18,5 @@ expected_if_output = (
 )
 
 llvm_ir_if = compile_test(if_tests)
-compiled_if_output, compile_if_error = run_compiled_code(llvm_ir_if)
+compiled_if_output, compile_if_error = run_jit_code(llvm_ir_if)
 assert compiled_if_output == expected_if_output.strip()
-os.remove("temp.ll")
-os.remove("temp.o")
-os.remove("temp_executable")
@@ -1,5 +1,4 @@
-import os
-from tests.compiler.base import compile_test, run_compiled_code
+from tests.compiler.base import compile_test, run_compiled_code, run_jit_code
 
 list_creation_test = "var mylist = [1, 2, 3]; print(mylist);"
 empty_list_test = "var empty = []; print(empty);"
@@ -103,14 +102,61 @@ expected_list_output = (
 )
 
 llvm_ir_list = compile_test(list_tests)
-actual_list_output, error = run_compiled_code(llvm_ir_list)
+actual_list_output, error = run_jit_code(llvm_ir_list)
 
 assert actual_list_output.strip() == expected_list_output.strip()
 
-# Clean up
-os.remove("temp.ll")
-os.remove("temp.o")
-os.remove("temp_executable")
+
+list_growth_test = """
+var xs = [1, 2];
+var ys = xs;
+xs = xs + 3;
+ys = ys + 4;
+print(xs);
+print(ys);
+
+var zs = xs + 5;
+var ws = xs + 6;
+print(zs);
+print(ws);
+print(xs);
+
+fun list build(n) {
+    var built = [];
+    for i = 0, n {
+        built = built + i;
+    }
+    return built;
+}
+
+var big = build(1000);
+var copy = big;
+big = big - 0;
+print(big / 0);
+print(big / 998);
+print(copy / 999);
+
+xs = xs * [7];
+xs = xs + 8;
+print(xs);
+"""
+
+expected_growth_output = (
+    "[1, 2, 3]\n"
+    "[1, 2, 4]\n"
+    "[1, 2, 3, 5]\n"
+    "[1, 2, 3, 6]\n"
+    "[1, 2, 3]\n"
+    "1\n"
+    "999\n"
+    "999\n"
+    "[1, 2, 3, 7, 8]\n"
+)
+
+for opt_level in (0, 2):
+    llvm_ir_growth = compile_test(list_growth_test, opt_level)
+    actual_growth_output, error = run_jit_code(llvm_ir_growth)
+    assert actual_growth_output == expected_growth_output.strip()
 
 
 list_type_error_test = """
@@ -124,3 +170,158 @@ try:
 except Exception as e:
     assert str(
         e) == "Type mismatch: function declared to return 'int' but trying to return 'list'"
+
+
+runtime_test = """
+var a = [1] + 2;
+var b = a + 3;
+var c = (a * b) - 0;
+print(a);
+print(b);
+print(c);
+"""
+
+llvm_ir_runtime = compile_test(runtime_test)
+actual_runtime_output, error = run_jit_code(llvm_ir_runtime)
+assert actual_runtime_output == "[1, 2]\n[1, 2, 3]\n[2, 1, 2, 3]"
+# List helpers are emitted once and called from each use site
+runtime_helpers = [line.split("@")[1].split("(")[0]
+                   for line in llvm_ir_runtime.splitlines() if line.startswith("define internal")]
+assert sorted(runtime_helpers) == [
+    "fl_list_append", "fl_list_concat", "fl_list_remove", "fl_out_bytes",
+    "fl_out_flush", "fl_out_int", "fl_out_write", "fl_print_list"]
+assert llvm_ir_runtime.count("call void @fl_print_list") == 3
+assert llvm_ir_runtime.count("call { i64, i64, i64* } @fl_list_append") == 2
+
+
+bounds_test = """
+var xs = [];
+for k = 0, 1000 { xs = xs + k; };
+fun total(ys) {
+    var sum = 0;
+    for i = 0, len(ys) { sum = sum + ys / i; };
+    return sum;
+};
+print(total(xs));
+print(len(xs));
+print(len("hello"));
+"""
+
+# Indexing by a loop variable bounded by len() needs no bounds check
+llvm_ir_bounds = compile_test(bounds_test)
+assert "access_valid" not in llvm_ir_bounds
+actual_bounds_output, error = run_jit_code(llvm_ir_bounds)
+assert actual_bounds_output == "499500\n1000\n5"
+
+# ... which leaves a loop the optimizer vectorizes
+llvm_ir_bounds = compile_test(bounds_test, 2)
+assert "vector.body" in llvm_ir_bounds
+actual_bounds_output, error = run_jit_code(llvm_ir_bounds)
+assert actual_bounds_output == "499500\n1000\n5"
+
+# The check stays when the body could shrink the list or move the index
+for body in ("xs = xs - 0; print(xs / i);", "i = i + 1; print(xs / i);"):
+    llvm_ir_checked = compile_test(f"var xs = [1, 2, 3]; for i = 0, len(xs) {{ {body} }};")
+    assert "access_valid" in llvm_ir_checked
+llvm_ir_checked = compile_test("var xs = [1, 2, 3]; var n = 0; for i = n, len(xs) { print(xs / i); };")
+assert "access_valid" in llvm_ir_checked
+
+llvm_ir_checked = compile_test("var xs = [1, 2, 3]; for i = 0, len(xs) { xs = xs - 0; print(xs / i); };")
+actual_checked_output, error = run_jit_code(llvm_ir_checked)
+assert actual_checked_output == "2\n0\n0"
+
+
+index_assignment_test = """
+var xs = [1, 2, 3];
+xs[1] = 20;
+print(xs);
+print(xs[1] + xs[2]);
+xs += 4;
+print(xs);
+fun reset(ys) { ys[0] = 0; return 0; }
+reset(xs);
+print(xs);
+var fs = [1.5, 2.5];
+fs[0] = 3;
+print(fs);
+xs[-1] = 40;
+print(xs[-1] + xs / -4);
+print(xs);
+"""
+
+expected_index_assignment_output = (
+    "[1, 20, 3]\n"
+    "23\n"
+    "[1, 20, 3, 4]\n"
+    "[0, 20, 3, 4]\n"
+    "[3.000000, 2.500000]\n"
+    "40\n"
+    "[0, 20, 3, 40]\n"
+)
+
+for opt_level in (0, 2):
+    llvm_ir_index_assignment = compile_test(index_assignment_test, opt_level)
+    actual_index_assignment_output, error = run_jit_code(llvm_ir_index_assignment)
+    assert actual_index_assignment_output == expected_index_assignment_output.strip()
+
+# Out of bounds indexes stop the program with the interpreter's error
+for source in ("var xs = [1, 2, 3]; print(1); xs[3] = 1; print(2);",
+               "var xs = [1, 2, 3]; print(1); print(xs[-4]); print(2);"):
+    output, stderr = run_compiled_code(compile_test(source))
+    assert output == "1"
+    assert stderr == "Runtime Error: Out of bounds\n"
+
+# Stores indexed by the variable of a loop over len(xs) skip the bounds check
+llvm_ir_fill = compile_test("var xs = [1, 2, 3]; for i = 0, len(xs) { xs[i] = xs[i] * 2; }; print(xs);")
+assert "access_error" not in llvm_ir_fill
+assert "icmp sge" not in llvm_ir_fill
+
+
+index_type_error_test = 'var xs = [1, 2]; xs[0] = "a";'
+
+try:
+    compile_test(index_type_error_test)
+    assert False
+except Exception as e:
+    assert str(e) == "Type mismatch: cannot store 'string' in 'list[int]'"
+
+
+slice_test = """
+var xs = [1, 2, 3, 4, 5];
+print(xs[1:3]);
+print(xs[-2:]);
+print(len(xs[:4]));
+var s = "hello world";
+print(s[6:]);
+print(slice(s, 0, 5));
+var ys = xs[1:];
+ys[0] = 20;
+print(xs);
+print(ys);
+"""
+
+expected_slice_output = (
+    "[2, 3]\n"
+    "[4, 5]\n"
+    "4\n"
+    "world\n"
+    "hello\n"
+    "[1, 2, 3, 4, 5]\n"
+    "[20, 3, 4, 5]\n"
+)
+
+for opt_level in (0, 2):
+    llvm_ir_slice = compile_test(slice_test, opt_level)
+    actual_slice_output, error = run_jit_code(llvm_ir_slice)
+    assert actual_slice_output == expected_slice_output.strip()
+
+# String bounds count characters, as in the interpreter
+utf8_slice_test = 'var s = "héllo →😀"; print(s[1:3]); print(s[-2:]); print(slice(s, 4, 7)); print(s[7:100]);'
+
+for opt_level in (0, 2):
+    actual_utf8_slice_output, error = run_jit_code(compile_test(utf8_slice_test, opt_level))
+    assert actual_utf8_slice_output == "él\n→😀\no →\n😀"
+
+# A list slice that is only read never copies the elements
+llvm_ir_slice_view = compile_test("var xs = [1, 2, 3]; print(xs[1:]);")
+assert "fl_list_own" not in llvm_ir_slice_view
@@ -0,0 +1,97 @@
+from tests.compiler.base import compile_test, run_compiled_code, run_jit_code
+
+map_test = """
+var ages = {"ann": 31, "bob": 27};
+set(ages, "cy", 40);
+print(get(ages, "bob"));
+print(has(ages, "dan"));
+print(len(ages));
+remove(ages, "ann");
+print(ages);
+print(keys(ages));
+
+var prices = {1: 2.5};
+set(prices, 2, 3);
+print(prices);
+
+var counts = {};
+set(counts, "x", 1);
+set(counts, "y", 2);
+set(counts, "x", get(counts, "x") + 1);
+print(counts);
+"""
+
+expected_map_output = (
+    "27\n"
+    "0\n"
+    "3\n"
+    "{bob: 27, cy: 40}\n"
+    "[bob, cy]\n"
+    "{1: 2.500000, 2: 3.000000}\n"
+    "{x: 2, y: 2}\n"
+)
+
+for opt_level in (0, 2):
+    llvm_ir_map = compile_test(map_test, opt_level)
+    actual_map_output, error = run_jit_code(llvm_ir_map)
+    assert actual_map_output == expected_map_output.strip()
+
+
+# Growing the index and reusing the room left by removed entries keeps insertion order
+map_growth_test = """
+var squares = {};
+for i = 0, 1000 { set(squares, i, i * i); };
+for i = 0, 990 { remove(squares, i); };
+for i = 0, 5000 { set(squares, -1, i); remove(squares, -1); };
+print(squares);
+print(len(squares));
+print(get(squares, 995));
+"""
+
+expected_growth_output = (
+    "{990: 980100, 991: 982081, 992: 984064, 993: 986049, 994: 988036, "
+    "995: 990025, 996: 992016, 997: 994009, 998: 996004, 999: 998001}\n"
+    "10\n"
+    "990025\n"
+)
+
+llvm_ir_growth = compile_test(map_growth_test, 2)
+actual_growth_output, error = run_jit_code(llvm_ir_growth)
+assert actual_growth_output == expected_growth_output.strip()
+
+
+map_function_test = """
+fun count(words, table) {
+    for i = 0, len(words) {
+        var word = words / i;
+        if has(table, word) {
+            set(table, word, get(table, word) + 1);
+        } else {
+            set(table, word, 1);
+        };
+    };
+    return table;
+}
+print(count(["a", "b", "a", "c", "a"], {}));
+"""
+
+llvm_ir_function = compile_test(map_function_test)
+actual_function_output, error = run_jit_code(llvm_ir_function)
+assert actual_function_output == "{a: 3, b: 1, c: 1}"
+
+
+# get() on a missing key stops the program with the interpreter's error
+for source, key in (('var m = {"a": 1}; print(get(m, "a")); print(get(m, "b")); print(2);', "b"),
+                    ('var m = {1: 1}; print(get(m, 1)); print(get(m, 7)); print(2);', "7"),
+                    ('var m = {}; print(1); print(get(m, "b")); print(2);', "b")):
+    output, stderr = run_compiled_code(compile_test(source))
+    assert output == "1"
+    assert stderr == f"Runtime Error: Key not found: {key}\n"
+
+map_key_error_test = "var m = {1.5: 1};"
+
+try:
+    compile_test(map_key_error_test)
+    assert False
+except Exception as e:
+    assert str(e) == "Map keys must be ints or strings in compiled code, got float"
@@ -0,0 +1,35 @@
+from src.lexer import Lexer
+from src.parser import Parser
+from src.codegen import CodeGenerator
+from tests.compiler.base import run_jit_code
+
+opt_test = """
+fun int square(x) { return x * x; }
+var total = 0;
+for i = 0, 10 {
+    total = total + square(i);
+}
+print(total);
+print([1, 2] + 3);
+"""
+
+tokens, error = Lexer("<stdin>", opt_test).tokenizer()
+ast = Parser(tokens).parse()
+
+for opt_level in (0, 1, 2, 3):
+    llvm_ir = CodeGenerator(opt_level).generate(ast.node)
+    output, exit_code = run_jit_code(llvm_ir)
+    assert output == "285\n[1, 2, 3]"
+    if opt_level >= 1:
+        # Locals are promoted to registers
+        assert "alloca" not in llvm_ir
+    if opt_level >= 2:
+        # square() is inlined and the loop folded
+        assert "call i64 @square" not in llvm_ir
+
+try:
+    CodeGenerator(4)
+except Exception as e:
+    assert str(e) == "Invalid optimization level: 4"
+else:
+    assert False, "opt level 4 accepted"
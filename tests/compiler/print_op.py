@@ -0,0 +1,79 @@
+from tests.compiler.base import compile_test, run_jit_code, run_compiled_code
+
+# print() formats into a buffer itself; the output must match printf's %ld and %.6f
+print_format_test = """
+print(0);
+print(-7);
+print(1234567890123);
+print(9223372036854775807);
+print(-9223372036854775807 - 1);
+print(1 == 1);
+print(0.0);
+print(-0.0);
+print(-0.0000001);
+print(0.0078125);
+print(0.0234375);
+print(2.5);
+print(123.4567895);
+print(999999.9999996);
+print(1000000000000000000000.0);
+var big = 1.0;
+for i = 0, 400 { big = big * 10.0; };
+print(big);
+print(0.0 - big);
+print("text");
+print([1, -2, 3]);
+print([0.5, -1.25]);
+print(["a", "b"]);
+"""
+
+expected_print_format_output = (
+    "0\n"
+    "-7\n"
+    "1234567890123\n"
+    "9223372036854775807\n"
+    "-9223372036854775808\n"
+    "1\n"
+    "0.000000\n"
+    "-0.000000\n"
+    "-0.000000\n"
+    "0.007812\n"
+    "0.023438\n"
+    "2.500000\n"
+    f"{123.4567895:.6f}\n"
+    "1000000.000000\n"
+    "1000000000000000000000.000000\n"
+    "inf\n"
+    "-inf\n"
+    "text\n"
+    "[1, -2, 3]\n"
+    "[0.500000, -1.250000]\n"
+    "[a, b]\n"
+)
+
+for opt_level in (0, 2):
+    llvm_ir_print = compile_test(print_format_test, opt_level)
+    actual_print_output, error = run_jit_code(llvm_ir_print)
+    assert actual_print_output == expected_print_format_output.strip()
+
+compiled_print_output, error = run_compiled_code(compile_test(print_format_test))
+assert compiled_print_output == expected_print_format_output.strip()
+
+
+# Output bigger than the 64 KB buffer is flushed along the way, in order
+long_text = "x" * 70000
+buffer_test = f"""
+for i = 0, 20000 {{ print(i); }};
+print("{long_text}");
+print(-1);
+"""
+
+expected_buffer_output = "\n".join([str(i) for i in range(20000)] + [long_text, "-1"])
+actual_buffer_output, error = run_jit_code(compile_test(buffer_test))
+assert actual_buffer_output == expected_buffer_output
+compiled_buffer_output, error = run_compiled_code(compile_test(buffer_test, 2))
+assert compiled_buffer_output == expected_buffer_output
+
+# No printf calls left, and programs that print nothing get no buffer
+assert "@printf" not in compile_test(print_format_test)
+assert "fl_out_buffer" not in compile_test("var x = 1;")
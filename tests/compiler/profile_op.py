@@ -0,0 +1,69 @@
+import contextlib
+import io
+import os
+import tempfile
+from run import run, compile_to_llvm
+from src.interpreter import Int, Float
+from src.type_feedback import TypeFeedback
+
+
+def profile_program(source):
+    type_feedback = TypeFeedback()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result, ast, tokens, error = run("<stdin>", source, type_feedback=type_feedback)
+    assert error is None
+    return type_feedback, ast
+
+
+# The interpreter counts the types seen by every operation, call and function
+profiled_test = """
+fun scale(x, k) { return x * k; };
+var total = 0;
+for i = 0, 10 { total = total + scale(i, 2); };
+print(scale(1.5, 2));
+"""
+type_feedback, ast = profile_program(profiled_test)
+scale = ast.element_nodes[0]
+assert type_feedback.histogram(scale, 0) == {"int": 10, "float": 1, "string": 0, "list": 0, "function": 0}
+assert type_feedback.histogram(scale, 1)["int"] == 11
+assert type_feedback.histogram(scale, 2)["float"] == 1
+assert type_feedback.param_type(scale, 0) == "int"
+assert type_feedback.return_type(scale) == "int"
+
+with tempfile.TemporaryDirectory() as profile_dir:
+    path = os.path.join(profile_dir, "program.flprof")
+    type_feedback.save(path)
+
+    # A saved profile reattaches to a fresh parse of the same source
+    llvm_ir, new_ast, tokens, error = compile_to_llvm("<stdin>", profiled_test, profile=path)
+    assert error is None
+    assert "@scale.int.int" in llvm_ir and "@scale.float.int" in llvm_ir
+
+    # ... and only that source
+    llvm_ir, new_ast, tokens, error = compile_to_llvm("<stdin>", profiled_test + "print(1);", profile=path)
+    assert error == f"Profile '{path}' was recorded for a different version of the source"
+    missing = os.path.join(profile_dir, "missing.flprof")
+    llvm_ir, new_ast, tokens, error = compile_to_llvm("<stdin>", profiled_test, profile=missing)
+    assert error == f"Profile '{missing}' not found"
+
+# Types static inference cannot pin down come from the profile instead of defaulting to int
+uncalled_test = """
+fun scale(x) { return x * 2.5; };
+print(1);
+"""
+llvm_ir, ast, tokens, error = compile_to_llvm("<stdin>", uncalled_test)
+assert "@scale.int(" in llvm_ir
+
+type_feedback, ast = profile_program(uncalled_test)
+scale = ast.element_nodes[0]
+for _ in range(3):
+    type_feedback.record(scale, 0, Float(0.5))
+    type_feedback.record(scale, 1, Float(1.25))
+type_feedback.record(scale, 0, Int.of(2))
+with tempfile.TemporaryDirectory() as profile_dir:
+    path = os.path.join(profile_dir, "program.flprof")
+    type_feedback.save(path)
+    llvm_ir, ast, tokens, error = compile_to_llvm("<stdin>", uncalled_test, profile=path)
+assert error is None
+assert "define double @scale.float(double" in llvm_ir
+assert "@scale.int(" not in llvm_ir
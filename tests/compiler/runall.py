@@ -4,3 +4,8 @@ import tests.compiler.for_op
 import tests.compiler.while_op
 import tests.compiler.function_op
 import tests.compiler.list_op
+import tests.compiler.opt_op
+import tests.compiler.print_op
+import tests.compiler.tiered_op
+import tests.compiler.profile_op
+import tests.compiler.map_op
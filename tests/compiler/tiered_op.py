@@ -0,0 +1,154 @@
+import contextlib
+import io
+from run import run
+from src.tiering import TieredExecution
+
+
+def run_program(source, tiering=None):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result, ast, tokens, error = run("<stdin>", source, tiering=tiering)
+    return output.getvalue(), error
+
+
+tiered_test = """
+fun int dot(xs, ys) {
+    var total = 0;
+    for i = 0, len(xs) { total = total + (xs / i) * (ys / i); };
+    return total;
+};
+fun fib(n) { if n < 2 { return n; }; return fib(n - 1) + fib(n - 2); };
+fun shout(x) { print(x); return x; };
+fun half(x) { return x / 2; };
+fun mix(x) { var y = 0; if x > 5 { y = 1.5; }; return y; };
+fun at(xs, i) { return xs / i; };
+fun evens(n) { return [n, n + 2, n + 4]; };
+var a = []; for i = 0, 100 { a = a + i; };
+var s = 0;
+for k = 0, 20 { s = s + dot(a, a); };
+print(s);
+print(fib(15));
+var h = 0; for k = 0, 10 { h = half(k); }; print(h);
+var m = 0; for k = 0, 10 { m = mix(k); }; print(m);
+var t = 0; for k = 0, 10 { t = at(a, k); }; print(t);
+print(at([1.5, 2.5], 1));
+for k = 0, 3 { print(evens(k)); };
+for k = 0, 3 { shout(k); };
+"""
+
+expected_output, expected_error = run_program(tiered_test)
+assert expected_error is None
+
+tiering = TieredExecution(call_threshold=3, back_edge_threshold=50)
+actual_output, error = run_program(tiered_test, tiering)
+assert error is None
+assert actual_output == expected_output
+
+report = tiering.report()
+# Hot functions move to native code, per argument types
+assert "tier-up: dot(list[int], list[int])" in report
+assert "tier-up: fib(int)" in report
+assert "tier-up: at(list[int], int)" in report
+assert "tier-up: at(list[float], int)" in report
+assert "tier-up: evens(int)" in report
+# ... unless compiling would change what they do
+assert "interpreted: shout: calls print" in report
+assert "interpreted: half: divides numbers" in report
+assert "interpreted: mix: variable y changes type" in report
+assert tiering.native_calls > 0
+
+# Errors in native code are reported by re-running the call in the interpreter
+out_of_bounds_test = """
+fun at(xs, i) { return xs / i; };
+var a = [1, 2, 3];
+for k = 0, 5 { print(at(a, 1)); };
+print(at(a, 7));
+"""
+expected_output, expected_error = run_program(out_of_bounds_test)
+tiering = TieredExecution(call_threshold=2)
+actual_output, error = run_program(out_of_bounds_test, tiering)
+assert actual_output == expected_output
+assert error.as_string() == expected_error.as_string()
+assert "deopt: at re-ran 1 calls in the interpreter" in tiering.report()
+
+# Arguments and results too big for 64 bits are left to the interpreter
+big_test = """
+fun add(a, b) { return a + b; };
+for k = 0, 5 { print(add(k, 1)); };
+print(add(9223372036854775807, 1));
+"""
+expected_output, expected_error = run_program(big_test)
+tiering = TieredExecution(call_threshold=2)
+actual_output, error = run_program(big_test, tiering)
+assert actual_output == expected_output
+assert actual_output.splitlines()[-1] == "9223372036854775808"
+assert "deopt: add re-ran 1 calls in the interpreter" in tiering.report()
+
+# Indexed assignments to a list argument are copied back to the interpreter's list
+store_test = """
+fun bump(xs, v) { for i = 0, len(xs) { xs[i] = xs[i] + v; }; return 0; };
+var ys = [1, 2, 3];
+for k = 0, 5 { bump(ys, 1); };
+print(ys);
+"""
+expected_output, expected_error = run_program(store_test)
+tiering = TieredExecution(call_threshold=2)
+actual_output, error = run_program(store_test, tiering)
+assert actual_output == expected_output == "[6, 7, 8]\n"
+assert "tier-up: bump(list[int], int)" in tiering.report()
+
+# Arguments that are the same list share one buffer, as they share elements when interpreted
+alias_test = """
+fun f(xs, ys) { xs[0] = xs[0] + 1; return ys / 0; };
+var a = [1, 2];
+for k = 0, 6 { print(f(a, a)); };
+print(a);
+"""
+expected_output, expected_error = run_program(alias_test)
+tiering = TieredExecution(call_threshold=2)
+actual_output, error = run_program(alias_test, tiering)
+assert actual_output == expected_output == "2\n3\n4\n5\n6\n7\n[7, 2]\n"
+assert "tier-up: f(list[int], list[int])" in tiering.report()
+
+# Integer operators run natively; a zero divisor or lost bits send the call back
+operator_test = """
+fun mix(h, c) { return ((h << 5) + h + c) & 4294967295; };
+fun wrap(i, n) { return i % n + i // n; };
+fun shl(x, n) { return x << n; };
+var h = 5381;
+for k = 0, 10 { h = mix(h, k); print(wrap(k - 5, 3)); };
+print(h);
+print(shl(1, 3));
+print(shl(1, 3));
+print(shl(1, 70));
+print(wrap(7, 0));
+"""
+expected_output, expected_error = run_program(operator_test)
+tiering = TieredExecution(call_threshold=2)
+actual_output, error = run_program(operator_test, tiering)
+assert actual_output == expected_output
+assert error.as_string() == expected_error.as_string()
+report = tiering.report()
+assert "tier-up: mix(int, int)" in report
+assert "deopt: shl re-ran 1 calls in the interpreter" in report
+assert "deopt: wrap re-ran 1 calls in the interpreter" in report
+
+# `and` and `or` give back an operand when interpreted, so they stay there
+logic_test = "fun both(a, b) { return a and b; }; for k = 0, 4 { print(both(3, 5)); };"
+expected_output, expected_error = run_program(logic_test)
+tiering = TieredExecution(call_threshold=2)
+actual_output, error = run_program(logic_test, tiering)
+assert actual_output == expected_output == "5\n5\n5\n5\n"
+assert "interpreted: both: uses operator KeywordType.AND" in tiering.report()
+
+# Compiled loops only count in integers, so float bounds keep that specialization interpreted
+float_bound_test = """
+fun total(n) { var s = 0; for i = 0, n { s = s + i; }; return s; };
+for k = 0, 4 { print(total(1.5)); print(total(4)); };
+"""
+expected_output, expected_error = run_program(float_bound_test)
+tiering = TieredExecution(call_threshold=2)
+actual_output, error = run_program(float_bound_test, tiering)
+assert actual_output == expected_output == "1\n6\n" * 4
+assert "tier-up: total(int)" in tiering.report()
+assert "interpreted: total: for loop with non-integer bounds" in tiering.report()
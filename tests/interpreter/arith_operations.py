@@ -1,4 +1,8 @@
-from tests.interpreter.test_base import test
+from tests.interpreter.test_base import test, test_error
+from src.interpreter import Number, Int, Float
+from src.lexer import Lexer
+from src.config import LanguageConfig
+from src.token import TokenType as TT
 
 addition_test = "4 + 3"
 assert test(addition_test).elements[0].value == 7
@@ -72,3 +76,41 @@ negative_test3 = "-2 * 3"
 assert test(negative_test).elements[0].value == -5
 assert test(negative_test2).elements[0].value == -5
 assert test(negative_test3).elements[0].value == -6
+
+# Small ints and booleans are shared, immutable instances
+small_int_test = "var a = 500; var b = a + 1; b - 1; 3 < 4; 3 > 4"
+small_int_result = test(small_int_test).elements
+assert small_int_result[2] is small_int_result[0]
+assert small_int_result[3] is Number.true and small_int_result[4] is Number.false
+assert small_int_result[0].pos_start is None and small_int_result[0].context is None
+assert test("var c = 1025; c + 1").elements[1].value == 1026
+assert test("1.0 + 1").elements[0].value == 2.0 and isinstance(test("1.0 + 1").elements[0].value, float)
+
+# Ints and floats are separate value classes; mixing them or dividing gives a Float
+assert type(test("2 + 3").elements[0]) is Int
+assert type(test("2 + 0.5").elements[0]) is Float
+assert type(test("0.5 * 2").elements[0]) is Float
+assert type(test("4 / 2").elements[0]) is Float
+assert type(test("2 ^ -1").elements[0]) is Float
+assert type(test("123456789012 * 1000").elements[0]) is Int
+
+# % and // round down like Python; bitwise operators and shifts take ints
+operator_result = test("[17 % 5, -17 % 5, 17 % -5, 17 // 5, -17 // 5, 7.5 % 2, 12 & 10, 12 | 3, 12 xor 10, 1 << 70, -1024 >> 3]").elements[0]
+assert [e.value for e in operator_result.elements] == [2, 3, -3, 3, -4, 1.5, 8, 15, 6, 1 << 70, -128]
+assert type(test("7 // 2").elements[0]) is Int
+assert type(test("7.0 // 2").elements[0]) is Float
+
+# Shifts bind looser than +, and the bitwise operators looser still but tighter than ==
+assert test("1 + 2 << 3").elements[0].value == 24
+assert test("6 & 3 == 2").elements[0].value == 1
+assert test("1 | 2 xor 3 & 4").elements[0].value == 3
+
+assert test_error("5 % 0").details == "Division by zero"
+assert test_error("5 // 0.0").details == "Division by zero"
+assert test_error("1 << -1").details == "Negative shift count"
+assert test_error("1.5 & 1").details == "Illegal operation"
+
+# Packs can respell operators
+spanish_tokens, _ = Lexer("<stdin>", "5 o_exclusivo 3 % 2", LanguageConfig("configs/spanish.json")).tokenizer()
+assert [token.type for token in spanish_tokens[:5]] == [TT.INT, TT.BIT_XOR, TT.INT, TT.MODULO, TT.INT]
+assert Lexer("<stdin>", "o_exclusivo", LanguageConfig()).tokenizer()[0][0].type == TT.IDENT
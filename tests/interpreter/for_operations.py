@@ -1,4 +1,4 @@
-from tests.interpreter.test_base import test
+from tests.interpreter.test_base import test, test_error
 
 for_test = "for i=0, 6 { var j = i; }; j"
 assert test(for_test).elements[-1].value == 5
@@ -11,3 +11,19 @@ for_test3_elements = test(for_test3).elements[-1].elements
 for_test3_format = [
     list_element.value for list_element in for_test3_elements]
 assert for_test3_format == [0, 1, 2, 4, 5]
+
+for_each_test = "var total = 0; for x in [3, 1, 4] { total = total + x; }; total"
+assert test(for_each_test).elements[-1].value == 8
+
+for_each_string_test = 'var l = []; for c in "abc" { l + c; }; l'
+assert [c.value for c in test(for_each_string_test).elements[-1].elements] == ["a", "b", "c"]
+
+for_each_break_test = "var l = []; for x in [1, 2, 3, 4] { if x == 2 { continue; }; if x == 4 { break; }; l + x; }; l"
+assert [x.value for x in test(for_each_break_test).elements[-1].elements] == [1, 3]
+
+# The loop runs over the elements the list had when it started
+for_each_grow_test = "var l = [1, 2]; for x in l { l + x; }; l"
+assert [x.value for x in test(for_each_grow_test).elements[-1].elements] == [1, 2, 1, 2]
+
+for_each_error_test = "for x in 5 { x; }"
+assert test_error(for_each_error_test).details == "Cannot iterate over int"
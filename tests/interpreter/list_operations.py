@@ -1,4 +1,4 @@
-from tests.interpreter.test_base import test
+from tests.interpreter.test_base import test, test_error
 
 list_test = "[]"
 assert test(list_test).elements[0].elements == []
@@ -65,3 +65,49 @@ multiple_list_types_elements = test(multiple_list_types).elements[0].elements
 multiple_list_types_elements_format = [
     list_element.value for list_element in multiple_list_types_elements]
 assert multiple_list_types_elements_format == [1, 2.0, "3"]
+
+index_test = "var l = [3, 4, 5]; l[1]"
+assert test(index_test).elements[-1].value == 4
+
+index_assignment_test = "var l = [3, 4, 5]; l[1] = 40; l"
+assert [e.value for e in test(index_assignment_test).elements[-1].elements] == [3, 40, 5]
+
+# Every copy of a list sees a store into it
+index_assignment_shared_test = "fun reset(xs) { xs[0] = 0; }; var l = [1, 2]; reset(l); l"
+assert [e.value for e in test(index_assignment_shared_test).elements[-1].elements] == [0, 2]
+
+negative_index_assignment_test = "var l = [1, 2, 3]; l[-1] = 9; [l[-1], l]"
+negative_index_assignment_result = test(negative_index_assignment_test).elements[-1].elements
+assert negative_index_assignment_result[0].value == 9
+assert [e.value for e in negative_index_assignment_result[1].elements] == [1, 2, 9]
+
+nested_index_test = "var grid = [[1, 2], [3, 4]]; grid[1][0] = 9; grid[1]"
+assert [e.value for e in test(nested_index_test).elements[-1].elements] == [9, 4]
+
+append_statement_test = "var l = [1]; l += 2; l += 3; var n = 1; n += 2; [l, n]"
+append_statement_result = test(append_statement_test).elements[-1].elements
+assert [e.value for e in append_statement_result[0].elements] == [1, 2, 3]
+assert append_statement_result[1].value == 3
+
+index_out_of_bounds_test = "var l = [1]; l[1] = 2;"
+assert test_error(index_out_of_bounds_test).details == "Out of bounds"
+assert test_error("var l = [1]; l[-2] = 2;").details == "Out of bounds"
+
+index_not_a_list_test = "var n = 1; n[0];"
+assert test_error(index_not_a_list_test).details == "Cannot index int"
+
+slice_test = "var l = [1, 2, 3, 4, 5]; [l[1:3], l[:2], l[3:], l[-2:], l[4:1], slice(l, 1, 100)]"
+slice_result = test(slice_test).elements[-1].elements
+assert [[e.value for e in s.elements] for s in slice_result] == [[2, 3], [1, 2], [4, 5], [4, 5], [], [2, 3, 4, 5]]
+
+# Slices read the parent's elements until they are modified
+slice_view_test = "var l = [1, 2, 3, 4]; var s = l[1:]; var t = s[1:]; [len(t), t[0], s[-1]]"
+assert [e.value for e in test(slice_view_test).elements[-1].elements] == [2, 3, 4]
+
+slice_append_test = "var l = [1, 2, 3]; var s = l[:2]; s += 9; [l, s]"
+slice_append_result = test(slice_append_test).elements[-1].elements
+assert [e.value for e in slice_append_result[0].elements] == [1, 2, 3]
+assert [e.value for e in slice_append_result[1].elements] == [1, 2, 9]
+
+slice_not_a_list_test = "var n = 1; n[0:1];"
+assert test_error(slice_not_a_list_test).details == "Cannot slice int"
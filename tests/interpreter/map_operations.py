@@ -0,0 +1,50 @@
+from tests.interpreter.test_base import test, test_error
+
+map_test = '{"a": 1, "b": 2}'
+map_test_entries = test(map_test).elements[0].entries
+assert [(key.value, value.value) for key, value in map_test_entries.values()] == [("a", 1), ("b", 2)]
+
+empty_map_test = "{}"
+assert test(empty_map_test).elements[0].entries == {}
+
+map_get_test = 'var m = {"a": 1, 2: "two"}; get(m, 2);'
+assert test(map_get_test).elements[1].value == "two"
+
+map_set_test = 'var m = {}; set(m, "x", 1); set(m, "y", 2); set(m, "x", 3); m;'
+assert repr(test(map_set_test).elements[-1]) == "{x: 3, y: 2}"
+
+map_has_test = 'var m = {1: 10}; [has(m, 1), has(m, 2)];'
+assert [value.value for value in test(map_has_test).elements[1].elements] == [1, 0]
+
+map_remove_test = 'var m = {1: 10, 2: 20, 3: 30}; remove(m, 2); remove(m, 4); keys(m);'
+assert [key.value for key in test(map_remove_test).elements[-1].elements] == [1, 3]
+
+map_len_test = 'var m = {1: 10, 2: 20}; set(m, 3, 30); len(m);'
+assert test(map_len_test).elements[-1].value == 3
+
+map_typeof_test = 'typeof({})'
+assert test(map_typeof_test).elements[0].value == "map"
+
+# Copies share their entries, like lists
+map_shared_test = """
+fun add(table, key) {
+    set(table, key, len(table));
+}
+var m = {};
+add(m, "a");
+add(m, "b");
+m;
+"""
+assert repr(test(map_shared_test).elements[-1]) == "{a: 0, b: 1}"
+
+map_missing_key_test = 'var m = {"a": 1}; get(m, "b");'
+assert test_error(map_missing_key_test).details == "Key not found: b"
+
+map_bad_key_test = 'var m = {[1]: 1};'
+assert test_error(map_bad_key_test).details == "Map keys must be numbers or strings"
+
+map_not_a_map_test = 'get([1], 0);'
+assert test_error(map_not_a_map_test).details == "Argument must be map"
+
+map_syntax_error_test = '{1 2}'
+assert test_error(map_syntax_error_test) is True
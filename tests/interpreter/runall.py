@@ -8,3 +8,4 @@ import tests.interpreter.builtin_operations
 import tests.interpreter.cast_operations
 import tests.interpreter.while_operations
 import tests.interpreter.string_operations
+import tests.interpreter.map_operations
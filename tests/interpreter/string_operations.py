@@ -1,4 +1,4 @@
-from tests.interpreter.test_base import test
+from tests.interpreter.test_base import test, test_error
 
 str_add_test = 'var s = "hi"; var r = s + " there"; r'
 str_add_test_result = test(str_add_test)
@@ -11,3 +11,18 @@ assert str_add_test2_result.elements[-1].value == "hi there"
 str_mult_test = 'var s = "hi"; s = s * 3; s'
 str_mult_test_result = test(str_mult_test)
 assert str_mult_test_result.elements[-1].value == "hihihi"
+
+str_slice_test = 'var s = "hello world"; [s[:5], s[6:], s[-5:][1:3], slice(s, 2, 4)]'
+str_slice_test_result = test(str_slice_test)
+assert [e.value for e in str_slice_test_result.elements[-1].elements] == ["hello", "world", "or", "ll"]
+
+utf8_slice_test = 'var s = "héllo →😀"; [s[1:3], s[-2:], slice(s, 4, 7)]'
+assert [e.value for e in test(utf8_slice_test).elements[-1].elements] == ["él", "→😀", "o →"]
+
+str_builtins_test = 'var s = "id,name\\n1,ann"; [split(s, "\\n"), join(["a", 1, 2.5], "-"), find(s, "ann"), find(s, "bob"), replace(s, "\\n", ";"), substring(s, 3, -4), upper("ab"), lower("CD")]'
+str_builtins_result = test(str_builtins_test).elements[-1].elements
+assert [e.value for e in str_builtins_result[0].elements] == ["id,name", "1,ann"]
+assert [e.value for e in str_builtins_result[1:]] == ["a-1-2.5", 10, -1, "id,name;1,ann", "name\n1", "AB", "cd"]
+
+assert test_error('split("a,b", "")').details == "Separator must not be empty"
+assert test_error('upper(1)').details == "Argument must be string"
@@ -16,9 +16,22 @@ global_symbol_table.set(BT.TO_INT.value, BuiltInFunction("to_int"))
 global_symbol_table.set(BT.TO_FLOAT.value, BuiltInFunction("to_float"))
 global_symbol_table.set(BT.TO_LIST.value, BuiltInFunction("to_list"))
 global_symbol_table.set(BT.TYPEOF.value, BuiltInFunction("typeof"))
-global_symbol_table.set("null", Number(0))
-global_symbol_table.set("false", Number(0))
-global_symbol_table.set("true", Number(1))
+global_symbol_table.set(BT.GET.value, BuiltInFunction("get"))
+global_symbol_table.set(BT.SET.value, BuiltInFunction("set"))
+global_symbol_table.set(BT.HAS.value, BuiltInFunction("has"))
+global_symbol_table.set(BT.REMOVE.value, BuiltInFunction("remove"))
+global_symbol_table.set(BT.KEYS.value, BuiltInFunction("keys"))
+global_symbol_table.set(BT.SLICE.value, BuiltInFunction("slice"))
+global_symbol_table.set(BT.SPLIT.value, BuiltInFunction("split"))
+global_symbol_table.set(BT.JOIN.value, BuiltInFunction("join"))
+global_symbol_table.set(BT.FIND.value, BuiltInFunction("find"))
+global_symbol_table.set(BT.REPLACE.value, BuiltInFunction("replace"))
+global_symbol_table.set(BT.SUBSTRING.value, BuiltInFunction("substring"))
+global_symbol_table.set(BT.UPPER.value, BuiltInFunction("upper"))
+global_symbol_table.set(BT.LOWER.value, BuiltInFunction("lower"))
+global_symbol_table.set("null", Number.null)
+global_symbol_table.set("false", Number.false)
+global_symbol_table.set("true", Number.true)
 
 
 def test(source):
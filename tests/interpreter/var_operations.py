@@ -29,3 +29,10 @@ assert var_test_6_elements_format == [1, 2, 3]
 var_test7 = "var float x = 3.14; x"
 var_test7_result = test(var_test7)
 assert var_test7_result.elements[-1].value == 3.14
+
+# Names that later became builtins still work as variables and parameters
+# (inside a function, so the builtins stay in the global table later tests share)
+builtin_name_test = "fun shadow(split, get) { var keys = [split]; return [keys, split + get]; }; shadow(2, 3)"
+builtin_name_result = test(builtin_name_test).elements[-1].elements
+assert [e.value for e in builtin_name_result[0].elements] == [2]
+assert builtin_name_result[1].value == 5
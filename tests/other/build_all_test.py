@@ -0,0 +1,42 @@
+import os
+import subprocess
+import tempfile
+from run import build_all, find_sources
+
+with tempfile.TemporaryDirectory() as work_dir:
+    for i in range(4):
+        with open(os.path.join(work_dir, f"prog{i}.fl"), "w") as f:
+            f.write(f"print({i} * 10);")
+    with open(os.path.join(work_dir, "broken.fl"), "w") as f:
+        f.write("print(1);\nvar = 3;")
+    with open(os.path.join(work_dir, "notes.txt"), "w") as f:
+        f.write("not a program")
+
+    # A directory and a glob find the same sources, in sorted order
+    sources = find_sources(work_dir)
+    assert [os.path.basename(path) for path in sources] == \
+        ["broken.fl", "prog0.fl", "prog1.fl", "prog2.fl", "prog3.fl"]
+    assert find_sources(os.path.join(work_dir, "*.fl")) == sources
+
+    finished = []
+    results, error = build_all(work_dir, use_cache=False, keep_going=True, jobs=2,
+                               on_result=lambda path, *_: finished.append(path))
+    assert error is None
+    assert sorted(finished) == sources
+    assert [result[0] for result in results] == sources
+
+    # Executables land next to their sources whatever order the workers finish in
+    broken, *built = results
+    assert broken[1] is None and "Illegal Syntax" in broken[2]
+    for i, (path, executable, error, seconds, cache_hit) in enumerate(built):
+        assert error is None and seconds >= 0 and cache_hit is None
+        assert executable == os.path.join(work_dir, f"prog{i}")
+        assert subprocess.run([executable], capture_output=True, text=True).stdout.strip() == str(i * 10)
+
+    # Fail-fast still reports the failure
+    results, error = build_all(work_dir, use_cache=False, jobs=1)
+    assert error is None
+    assert results[0][0] == sources[0] and results[0][2]
+
+    results, error = build_all(os.path.join(work_dir, "missing"), use_cache=False)
+    assert results == [] and "No .fl files" in error
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+from src.build_cache import BuildCache
+
+with tempfile.TemporaryDirectory() as work_dir:
+    cache = BuildCache(os.path.join(work_dir, "cache"), max_bytes=2500)
+
+    # Every part of the key changes it
+    base = BuildCache.key("ir", "x86_64-unknown-linux-gnu", 0, "llc 14")
+    assert base == BuildCache.key("ir", "x86_64-unknown-linux-gnu", 0, "llc 14")
+    assert base != BuildCache.key("ir2", "x86_64-unknown-linux-gnu", 0, "llc 14")
+    assert base != BuildCache.key("ir", "aarch64-unknown-linux-gnu", 0, "llc 14")
+    assert base != BuildCache.key("ir", "x86_64-unknown-linux-gnu", 2, "llc 14")
+    assert base != BuildCache.key("ir", "x86_64-unknown-linux-gnu", 0, "llc 15")
+
+    def build(name, size):
+        path = os.path.join(work_dir, name)
+        with open(path, "wb") as f:
+            f.write(name.encode() * (size // len(name)))
+        os.chmod(path, 0o755)
+        return path
+
+    output = os.path.join(work_dir, "output")
+    assert not cache.fetch("a", output)
+    assert (cache.hits, cache.misses, cache.last_hit) == (0, 1, False)
+
+    cache.store("a", build("exe_a", 1000))
+    assert cache.fetch("a", output)
+    assert (cache.hits, cache.misses, cache.last_hit) == (1, 1, True)
+    with open(output, "rb") as f:
+        assert f.read().startswith(b"exe_a")
+    # The executable bit survives the round trip
+    assert os.access(output, os.X_OK)
+
+    # Least recently used entries are evicted once the cache grows past max_bytes
+    old = time.time() - 100
+    os.utime(cache.entry_path("a"), (old, old))
+    cache.store("b", build("exe_b", 1000))
+    cache.fetch("a", output)
+    cache.store("c", build("exe_c", 1000))
+    assert os.path.exists(cache.entry_path("a"))
+    assert not os.path.exists(cache.entry_path("b"))
+    assert os.path.exists(cache.entry_path("c"))
+    assert not [name for name in os.listdir(cache.directory) if name.startswith(".")]
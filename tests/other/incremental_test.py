@@ -0,0 +1,83 @@
+import random
+from src.lexer import Lexer, Position
+from src.parser import Parser
+from src.token import Token
+from src.incremental import IncrementalFrontEnd, TextEdit
+
+
+def full_parse(source):
+    lexer = Lexer("<stdin>", source)
+    tokens, error = lexer.tokenizer()
+    if error:
+        return None, None, error
+    ast = Parser(tokens).parse()
+    return tokens, ast.node, ast.error
+
+
+def same(a, b):
+    """Structural equality of tokens, positions, errors and AST nodes"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, Position):
+        return (a.index, a.line, a.column) == (b.index, b.line, b.column)
+    if isinstance(a, Token):
+        return a.type == b.type and a.value == b.value and same(a.pos_start, b.pos_start) and same(a.pos_end, b.pos_end)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if hasattr(a, '__dict__'):
+        return vars(a).keys() == vars(b).keys() and all(same(vars(a)[k], vars(b)[k]) for k in vars(a) if k != 'context')
+    return a == b
+
+
+program = """fun int add(a, b) { return a + b; };
+var result = add(2, 3);
+var xs = [1, 2, 3] + 4;
+var s = "hello, world";
+if result > 4 { print(s); } elif result == 4 { print(1); } else { print(0); }
+for i = 0, len(xs) { print(xs / i); }
+var n = 0;
+while n < 3 { n = n + 1; if n == 2 { continue; } }
+fun mymax(a, b) {
+    if (a > b) {
+        return a;
+    }
+    return b;
+}
+print(mymax(10, 5));
+"""
+
+fragments = ["1", "x", " ", "\n", ";", "+ 2", "==", "=", "(", ")", "{", "}", "\"s\"", "var y = 7;",
+             "print(y);", "fun f() { return 1; }", "ab", ".5", "not ", "[1, 2]", "for j = 0, 2 { }"]
+
+rng = random.Random(1234)
+frontend = IncrementalFrontEnd("<stdin>")
+frontend.parse(program)
+source = program
+
+for step in range(1500):
+    offset = rng.randint(0, len(source))
+    removed = rng.randint(0, min(4, len(source) - offset))
+    inserted = rng.choice(fragments) if rng.random() < 0.8 else ""
+    new_source = source[:offset] + inserted + source[offset + removed:]
+
+    # Keep the program from drifting too far from something that parses
+    if rng.random() < 0.02:
+        new_source = program
+
+    try:
+        expected = full_parse(new_source)
+    except Exception:
+        # The parser itself raises on some malformed inputs; start over from a clean parse
+        frontend = IncrementalFrontEnd("<stdin>")
+        frontend.parse(program)
+        source = program
+        continue
+
+    edit = TextEdit.between(source, new_source)
+    assert new_source == source[:edit.offset] + edit.inserted + source[edit.offset + edit.removed:]
+    actual = frontend.update(new_source)
+
+    assert same(actual[0], expected[0]), f"tokens differ after {edit}"
+    assert same(actual[1], expected[1]), f"AST differs after {edit}"
+    assert same(actual[2], expected[2]), f"error differs after {edit}"
+    source = new_source
@@ -0,0 +1,37 @@
+import tracemalloc
+from src.lexer import Lexer
+from src.parser import Parser
+from run import parse_stream
+
+source = "fun int add(a, b) { return a + b; }; var result = add(2, 3); for i = 0, 3 { print([i, result] + i); }"
+
+tokens, error = Lexer("<stdin>", source).tokenizer()
+streamed = [repr(token) for token in Lexer("<stdin>", source).generate_tokens()]
+assert streamed == [repr(token) for token in tokens]
+
+ast, error = parse_stream("<stdin>", source, None)
+assert error is None
+assert repr(ast.node) == repr(Parser(tokens).parse().node)
+
+# An illegal character is reported ahead of an earlier parse error, as with the token list
+ast, error = parse_stream("<stdin>", "var x = ; var y = 1 $", None)
+assert error.error_name == "Illegal Character"
+
+ast, error = parse_stream("<stdin>", "var x = ; var y = 1;", None)
+assert error is None and ast.error.error_name == "Illegal Syntax"
+
+# The token list is never built, so only the AST grows with the file
+big_source = "var x = 1;\n" + "x = x + 1 * 2 - 3;\n" * 20000
+
+
+def peak(parse):
+    tracemalloc.start()
+    parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+list_peak = peak(lambda: Parser(Lexer("<stdin>", big_source).tokenizer()[0]).parse())
+stream_peak = peak(lambda: parse_stream("<stdin>", big_source, None))
+assert stream_peak < list_peak * 0.9
@@ -3,8 +3,7 @@ import os
 import sys
 
 from src.config import LanguageConfig
-from src.lexer import Lexer
-from src.parser import Parser
+from src.incremental import IncrementalFrontEnd
 from src.interpreter import Interpreter, Context, SymbolTable, Number, BuiltInFunction
 
 
@@ -25,14 +24,31 @@ def _create_global_symbol_table(config):
     symbol_table.set(builtin_names["to_list"], BuiltInFunction("to_list"))
     symbol_table.set(builtin_names["typeof"], BuiltInFunction("typeof"))
     symbol_table.set(builtin_names["elos"], BuiltInFunction("elos"))
-
-    symbol_table.set("null", Number(0))
-    symbol_table.set("false", Number(0))
-    symbol_table.set("true", Number(1))
+    symbol_table.set(builtin_names["get"], BuiltInFunction("get"))
+    symbol_table.set(builtin_names["set"], BuiltInFunction("set"))
+    symbol_table.set(builtin_names["has"], BuiltInFunction("has"))
+    symbol_table.set(builtin_names["remove"], BuiltInFunction("remove"))
+    symbol_table.set(builtin_names["keys"], BuiltInFunction("keys"))
+    symbol_table.set(builtin_names["slice"], BuiltInFunction("slice"))
+    symbol_table.set(builtin_names["split"], BuiltInFunction("split"))
+    symbol_table.set(builtin_names["join"], BuiltInFunction("join"))
+    symbol_table.set(builtin_names["find"], BuiltInFunction("find"))
+    symbol_table.set(builtin_names["replace"], BuiltInFunction("replace"))
+    symbol_table.set(builtin_names["substring"], BuiltInFunction("substring"))
+    symbol_table.set(builtin_names["upper"], BuiltInFunction("upper"))
+    symbol_table.set(builtin_names["lower"], BuiltInFunction("lower"))
+
+    symbol_table.set("null", Number.null)
+    symbol_table.set("false", Number.false)
+    symbol_table.set("true", Number.true)
 
     return symbol_table
 
 
+# One front end per config, so re-running an edited program only re-parses what changed
+_frontends = {}
+
+
 def eval_funlang(source, config_path=None):
     """Evaluate FunLang source code.
 
@@ -45,24 +61,21 @@ def eval_funlang(source, config_path=None):
     old_stdout = sys.stdout
     sys.stdout = buf
     try:
-        config = LanguageConfig(config_path) if config_path else LanguageConfig()
+        if config_path not in _frontends:
+            config = LanguageConfig(config_path) if config_path else LanguageConfig()
+            _frontends[config_path] = IncrementalFrontEnd("<stdin>", config)
+        frontend = _frontends[config_path]
+        config = frontend.config
 
-        lexer = Lexer("<stdin>", source, config)
-        tokens, error = lexer.tokenizer()
+        tokens, node, error = frontend.update(source)
         if error:
             err_str = error if isinstance(error, str) else error.as_string()
             return {"stdout": buf.getvalue(), "result": None, "error": err_str}
 
-        parser = Parser(tokens, config)
-        ast = parser.parse()
-        if ast.error:
-            err_str = ast.error if isinstance(ast.error, str) else ast.error.as_string()
-            return {"stdout": buf.getvalue(), "result": None, "error": err_str}
-
         interpreter = Interpreter()
         context = Context("<program>")
         context.symbol_table = _create_global_symbol_table(config)
-        result = interpreter.visit(ast.node, context)
+        result = interpreter.visit(node, context)
 
         if result.error:
             err_str = (
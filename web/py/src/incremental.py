@@ -0,0 +1,250 @@
+from src.lexer import Lexer, Position
+from src.parser import Parser
+from src.ast_nodes import ListNode
+from src.token import Token, TokenType as TT
+from src.config import LanguageConfig
+
+
+class TextEdit:
+    """A single replacement of `removed` characters at `offset` by `inserted`"""
+
+    def __init__(self, offset, removed, inserted):
+        self.offset = offset
+        self.removed = removed
+        self.inserted = inserted
+
+    @staticmethod
+    def between(old_source, new_source):
+        """Describe the change from old_source to new_source as one edit (common prefix/suffix)"""
+        limit = min(len(old_source), len(new_source))
+        prefix = 0
+        while prefix < limit and old_source[prefix] == new_source[prefix]:
+            prefix += 1
+
+        suffix = 0
+        while (suffix < limit - prefix
+               and old_source[len(old_source) - suffix - 1] == new_source[len(new_source) - suffix - 1]):
+            suffix += 1
+
+        return TextEdit(prefix, len(old_source) - prefix - suffix,
+                        new_source[prefix:len(new_source) - suffix])
+
+    def __repr__(self):
+        return f"TextEdit(offset={self.offset}, removed={self.removed}, inserted={repr(self.inserted)})"
+
+
+class IncrementalFrontEnd:
+    """Lexer and parser front end that keeps the last token stream and AST around.
+
+    Edits re-tokenize only the damaged region of the source and re-parse only
+    the top-level statements whose tokens changed. Everything else is reused,
+    with the positions that follow the edit shifted in place, so the previous
+    tokens and AST must not be held on to across an edit. Reused positions keep
+    the file_text they were lexed from.
+    """
+
+    def __init__(self, file_name, config=None):
+        self.file_name = file_name
+        self.config = config if config else LanguageConfig()
+        self.reset()
+
+    def reset(self):
+        self.source = None
+        self.tokens = None
+        self.node = None
+        self.error = None
+        # Successfully parsed top-level statements and the token index right after each one
+        self.statements = []
+        self.statement_ends = []
+
+    def update(self, source):
+        """Bring the front end up to date with `source`, returning (tokens, ast, error)"""
+        if self.tokens is None:
+            return self.parse(source)
+        edit = TextEdit.between(self.source, source)
+        return self.apply_edit(edit.offset, edit.removed, edit.inserted)
+
+    def parse(self, source):
+        """Full lex and parse of `source`, returning (tokens, ast, error)"""
+        self.reset()
+        lexer = Lexer(self.file_name, source, self.config)
+        tokens, error = lexer.tokenizer()
+        if error:
+            return None, None, error
+
+        self.source = source
+        self.tokens = tokens
+        self.reparse(0, len(tokens), 0, [], [], False, set(), None)
+        return self.tokens, self.node, self.error
+
+    def apply_edit(self, offset, removed, inserted):
+        """Apply a text edit to the last parsed source, returning (tokens, ast, error)"""
+        if self.tokens is None:
+            raise Exception("No previous parse to apply the edit to")
+
+        old_source = self.source
+        old_tokens = self.tokens
+        old_statements = self.statements
+        old_ends = self.statement_ends
+        old_complete = self.error is None
+        self.reset()
+
+        source = old_source[:offset] + inserted + old_source[offset + removed:]
+        old_end = offset + removed
+        new_end = offset + len(inserted)
+        delta = new_end - old_end
+        last = len(old_tokens) - 1  # index of the EOF token
+
+        # A token is damaged once its extent or its one character of lookahead reaches the edit
+        first = self.find_token(old_tokens, 0, last, offset, lambda tok: self.token_end(tok).index)
+        if first > 0:
+            restart = self.token_end(old_tokens[first - 1])
+        else:
+            restart = Position(0, 0, 0, self.file_name, old_source)
+
+        # Re-tokenize until we land on the (shifted) start of an old token past the edit
+        lexer = Lexer(self.file_name, source, self.config)
+        lexer.seek(restart)
+        relexed = []
+        while True:
+            token, error = lexer.next_token()
+            if error:
+                return None, None, error
+            if token.type == TT.EOF:
+                resume = last
+                break
+            start = token.pos_start.index
+            if start >= new_end:
+                resume = self.find_token(old_tokens, first, last, start - delta,
+                                         lambda tok: tok.pos_start.index)
+                if (resume < last and old_tokens[resume].pos_start.index == start - delta
+                        and old_tokens[resume].type == token.type):
+                    break
+            relexed.append(token)
+
+        # Shift every position that follows the edit
+        old_end_line, old_end_column = self.locate(old_source, restart, old_end)
+        new_end_line, new_end_column = self.locate(source, restart, new_end)
+        shift = (delta, new_end_line - old_end_line, old_end_line, new_end_column - old_end_column)
+        if shift == (0, 0, old_end_line, 0):
+            shift = None
+        seen = set()
+        if shift:
+            for token in old_tokens[resume:]:
+                self.shift_positions(token, seen, shift)
+
+        self.source = source
+        self.tokens = old_tokens[:first] + relexed + old_tokens[resume:]
+        self.reparse(first, first + len(relexed), len(relexed) - (resume - first),
+                     old_statements, old_ends, old_complete, seen, shift)
+        return self.tokens, self.node, self.error
+
+    def reparse(self, damage_start, damage_end, token_delta, old_statements, old_ends, old_complete, seen, shift):
+        """Re-parse the top-level statements touching tokens [damage_start, damage_end)"""
+        # Statements whose lookahead token is still before the damage are untouched
+        stable = 0
+        while stable < len(old_ends) and old_ends[stable] < damage_start:
+            stable += 1
+        statements = old_statements[:stable]
+        ends = old_ends[:stable]
+
+        # Old statement boundaries after the damage, in new token indexes. They can only be
+        # reused if the old parse ran to completion rather than stopping at an error.
+        resync = {}
+        for i in range(stable, len(old_ends) if old_complete else 0):
+            if old_ends[i] + token_delta >= damage_end:
+                resync[old_ends[i] + token_delta] = i
+
+        parser = Parser(self.tokens, self.config)
+        pos_start = self.tokens[0].pos_start.copy()
+
+        def parse_statement():
+            res = parser.parse_statement()
+            if res.error:
+                self.error = res.error
+                return False
+            statements.append(res.node)
+            ends.append(parser.pos)
+            if parser.pos in resync:
+                i = resync[parser.pos]
+                if shift:
+                    for statement in old_statements[i + 1:]:
+                        self.shift_positions(statement, seen, shift)
+                statements.extend(old_statements[i + 1:])
+                ends.extend(end + token_delta for end in old_ends[i + 1:])
+                return False
+            return True
+
+        if stable:
+            parser.seek(ends[-1])
+            resumed = True
+        else:
+            while parser.current_token.type == TT.SEMICOLON:
+                parser.advance()
+            resumed = parse_statement()
+
+        if resumed:
+            while parser.current_token and parser.current_token.type != TT.EOF and parser.current_token.type != TT.RBRACE:
+                if parser.match(TT.SEMICOLON):
+                    parser.advance()
+                elif not parse_statement():
+                    break
+
+        self.statements = statements
+        self.statement_ends = ends
+        if self.error:
+            self.node = None
+        else:
+            pos_end = statements[-1].pos_end.copy() if statements else pos_start.copy()
+            self.node = ListNode(None, statements, pos_start, pos_end)
+
+    @staticmethod
+    def token_end(token):
+        """Position just past a token (single-character tokens store their start as pos_end)"""
+        if token.pos_end.index > token.pos_start.index:
+            return token.pos_end
+        start = token.pos_start
+        return Position(start.index + 1, start.line, start.column + 1, start.file_name, start.file_text)
+
+    @staticmethod
+    def find_token(tokens, low, high, index, key):
+        """First token in tokens[low:high] whose key is >= index, or high if there is none"""
+        while low < high:
+            mid = (low + high) // 2
+            if key(tokens[mid]) < index:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    @staticmethod
+    def locate(source, base, index):
+        """Line and column of `index`, counting forward from the known position `base`"""
+        line = base.line + source.count('\n', base.index, index)
+        last_newline = source.rfind('\n', base.index, index)
+        if last_newline == -1:
+            return line, base.column + index - base.index
+        return line, index - last_newline - 1
+
+    def shift_positions(self, value, seen, shift):
+        """Move every position reachable from a token or AST node past the edit, once each"""
+        if isinstance(value, Position):
+            if id(value) in seen:
+                return
+            seen.add(id(value))
+            delta, line_delta, old_end_line, column_delta = shift
+            if value.line == old_end_line:
+                value.column += column_delta
+            value.line += line_delta
+            value.index += delta
+        elif isinstance(value, Token):
+            if value.pos_start:
+                self.shift_positions(value.pos_start, seen, shift)
+            if value.pos_end:
+                self.shift_positions(value.pos_end, seen, shift)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                self.shift_positions(item, seen, shift)
+        elif hasattr(value, '__dict__'):
+            for item in vars(value).values():
+                self.shift_positions(item, seen, shift)
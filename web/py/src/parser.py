@@ -1,4 +1,4 @@
-from src.ast_nodes import Program, FunctionDeclarationNode, VariableAccessNode, VariableDeclarationNode, VariableAssignmentNode, BinaryOperationNode, NumberNode, FunctionCallNode, UnaryOperationNode, IfNode, ForNode, WhileNode, StringNode, ListNode, BreakNode, ContinueNode, ReturnNode
+from src.ast_nodes import Program, FunctionDeclarationNode, VariableAccessNode, IndexNode, SliceNode, IndexAssignmentNode, VariableDeclarationNode, VariableAssignmentNode, BinaryOperationNode, NumberNode, FunctionCallNode, UnaryOperationNode, IfNode, ForNode, ForEachNode, WhileNode, StringNode, ListNode, MapNode, BreakNode, ContinueNode, ReturnNode
 from src.token import Token, TokenType as TT, KeywordType as TK, BuiltInFunctionType as BT
 from src.error import IllegalSyntaxError
 
@@ -26,7 +26,10 @@ class ParseResult:
 
 class Parser:
     def __init__(self, tokens, config=None):
+        # Either a token list or any iterator of tokens (e.g. Lexer.generate_tokens()).
+        # An iterator is consumed one token at a time, so only the current token is held.
         self.tokens = tokens
+        self.stream = None if isinstance(tokens, list) else iter(tokens)
         self.pos = -1
         self.current_token = None
         self.config = config
@@ -34,14 +37,27 @@ class Parser:
 
     def advance(self):
         self.pos += 1
-        if self.pos < len(self.tokens):
+        if self.stream is not None:
+            self.current_token = next(self.stream, None)
+        elif self.pos < len(self.tokens):
             self.current_token = self.tokens[self.pos]
         else:
             self.current_token = None
 
+    def seek(self, index):
+        if self.stream is not None:
+            raise Exception("Cannot seek in a token stream")
+        self.pos = index - 1
+        self.advance()
+
     def match(self, match_token):
         return self.current_token.type == match_token
 
+    def match_name(self):
+        """Whether the current token can name a variable, function or parameter. Builtin
+        names can, so programs that used a name before it became a builtin still parse"""
+        return self.match(TT.IDENT) or self.current_token.type in BT
+
     def err(self, err_msg):
         return IllegalSyntaxError(self.current_token.pos_start, self.current_token.pos_end, err_msg)
 
@@ -117,7 +133,7 @@ class Parser:
                 type_tok = self.current_token
                 self.advance()
             var_name = self.current_token
-            if not self.match(TT.IDENT):
+            if not self.match_name():
                 return res.failure(self.err("Expected 'IDENT' after type annotation"))
             self.advance()
             if not self.match(TT.EQUALS):
@@ -150,7 +166,7 @@ class Parser:
                 return res
             return res.success(UnaryOperationNode(op_token, node))
         else:
-            left = res.register(self.parse_arithmetic_expression())
+            left = res.register(self.parse_bit_or_expression())
             if res.error:
                 return res
 
@@ -162,15 +178,61 @@ class Parser:
                     return res
                 return res.success(VariableAssignmentNode(var_token, value))
 
+            if self.current_token and self.current_token.type == TT.EQUALS and isinstance(left, IndexNode):
+                self.advance()
+                value = res.register(self.parse_expression())
+                if res.error:
+                    return res
+                return res.success(IndexAssignmentNode(left.target, left.index, value))
+
+            # x += v is x = x + v, which appends to a list variable in place
+            if self.current_token and self.current_token.type == TT.PLUS_EQUALS:
+                if not isinstance(left, VariableAccessNode):
+                    return res.failure(self.err("Expected a variable name before '+='"))
+                op = Token(TT.PLUS, '+', self.current_token.pos_start, self.current_token.pos_start)
+                self.advance()
+                value = res.register(self.parse_expression())
+                if res.error:
+                    return res
+                return res.success(VariableAssignmentNode(left.tok, BinaryOperationNode(left, op, value)))
+
             while self.current_token and self.current_token.type in (TT.EE, TT.NE, TT.LT, TT.GT, TT.GTE, TT.LTE):
                 op = self.current_token
                 self.advance()
-                right = res.register(self.parse_arithmetic_expression())
+                right = res.register(self.parse_bit_or_expression())
                 if res.error:
                     return res
                 left = BinaryOperationNode(left, op, right)
             return res.success(left)
 
+    def parse_binary_operation(self, parse_operand, op_types):
+        """Left-associative chain of parse_operand() joined by operators in op_types"""
+        res = ParseResult()
+        left = res.register(parse_operand())
+        if res.error:
+            return res
+        while self.current_token and self.current_token.type in op_types:
+            op = self.current_token
+            self.advance()
+            right = res.register(parse_operand())
+            if res.error:
+                return res
+            left = BinaryOperationNode(left, op, right)
+        return res.success(left)
+
+    # Bitwise operators bind looser than arithmetic and tighter than comparisons: | < xor < & < shifts
+    def parse_bit_or_expression(self):
+        return self.parse_binary_operation(self.parse_bit_xor_expression, (TT.BIT_OR,))
+
+    def parse_bit_xor_expression(self):
+        return self.parse_binary_operation(self.parse_bit_and_expression, (TT.BIT_XOR,))
+
+    def parse_bit_and_expression(self):
+        return self.parse_binary_operation(self.parse_shift_expression, (TT.BIT_AND,))
+
+    def parse_shift_expression(self):
+        return self.parse_binary_operation(self.parse_arithmetic_expression, (TT.SHIFT_LEFT, TT.SHIFT_RIGHT))
+
     def parse_arithmetic_expression(self):
         res = ParseResult()
         left = res.register(self.parse_term())
@@ -190,7 +252,7 @@ class Parser:
         left = res.register(self.parse_factor())
         if res.error:
             return res
-        while self.current_token and self.current_token.type in (TT.MULTIPLY, TT.DIVIDE):
+        while self.current_token and self.current_token.type in (TT.MULTIPLY, TT.DIVIDE, TT.MODULO, TT.FLOOR_DIVIDE):
             op = self.current_token
             self.advance()
             right = res.register(self.parse_factor())
@@ -251,7 +313,31 @@ class Parser:
                     res.failure(self.err("Expected ')'"))
                 self.advance()
 
-            return res.success(FunctionCallNode(atom, args))
+            atom = FunctionCallNode(atom, args)
+
+        while self.match(TT.LBRACKET):
+            self.advance()
+            index = None
+            if not self.match(TT.COLON):
+                index = res.register(self.parse_expression())
+                if res.error:
+                    return res
+            is_slice = self.match(TT.COLON)
+            end = None
+            if is_slice:
+                self.advance()
+                if not self.match(TT.RBRACKET):
+                    end = res.register(self.parse_expression())
+                    if res.error:
+                        return res
+            if not self.match(TT.RBRACKET):
+                return res.failure(self.err("Expected ']'"))
+            pos_end = self.current_token.pos_end.copy()
+            self.advance()
+            if is_slice:
+                atom = SliceNode(atom, index, end, pos_end)
+            else:
+                atom = IndexNode(atom, index, pos_end)
         return res.success(atom)
 
     def parse_atom(self):
@@ -263,7 +349,7 @@ class Parser:
         elif self.current_token.type == TT.STRING:
             self.advance()
             return res.success(StringNode(tok))
-        elif self.match(TT.IDENT) or self.current_token.type in BT:
+        elif self.match_name():
             self.advance()
             return res.success(VariableAccessNode(tok))
         elif self.match(TT.LPAREN):
@@ -280,6 +366,11 @@ class Parser:
             if res.error:
                 return res
             return res.success(list_expr)
+        elif self.match(TT.LBRACE):
+            map_expr = res.register(self.parse_map_expression())
+            if res.error:
+                return res
+            return res.success(map_expr)
         elif self.match(TK.IF):
             if_expr = res.register(self.parse_if_expression())
             if res.error:
@@ -337,6 +428,35 @@ class Parser:
 
         return res.success(ListNode(type_tok, element_nodes, pos_start, pos_end))
 
+    def parse_map_expression(self):
+        res = ParseResult()
+        entries = []
+        pos_start = self.current_token.pos_start.copy()
+        self.advance()
+
+        if not self.match(TT.RBRACE):
+            while True:
+                key = res.register(self.parse_expression())
+                if res.error:
+                    return res
+                if not self.match(TT.COLON):
+                    return res.failure(self.err("Expected ':' after map key"))
+                self.advance()
+                value = res.register(self.parse_expression())
+                if res.error:
+                    return res
+                entries.append((key, value))
+                if not self.match(TT.COMMA):
+                    break
+                self.advance()
+
+            if not self.match(TT.RBRACE):
+                return res.failure(self.err("Expected '}' or ',' in map"))
+        pos_end = self.current_token.pos_end.copy()
+        self.advance()
+
+        return res.success(MapNode(entries, pos_start, pos_end))
+
     def parse_if_expression(self):
         res = ParseResult()
         cases = []
@@ -412,13 +532,16 @@ class Parser:
             res.failure(self.err("Expected 'for' keyword"))
         self.advance()
 
-        if not self.match(TT.IDENT):
+        if not self.match_name():
             res.failure(self.err("Expected variable name after 'for' keyword"))
         var_name = self.current_token
         self.advance()
 
+        if self.match(TK.IN):
+            return self.parse_for_each_expression(var_name)
+
         if not self.match(TT.EQUALS):
-            res.failure(self.err("Expected '=' after variable name"))
+            res.failure(self.err("Expected '=' or 'in' after variable name"))
         self.advance()
 
         start = res.register(self.parse_expression())
@@ -457,6 +580,30 @@ class Parser:
 
         return res.success(ForNode(var_name, start, end, step, body))
 
+    def parse_for_each_expression(self, var_name):
+        """Rest of `for x in expr { ... }`, from the 'in' keyword"""
+        res = ParseResult()
+        self.advance()
+
+        iterable = res.register(self.parse_expression())
+        if res.error:
+            return res
+
+        if not self.match(TT.LBRACE):
+            return res.failure(self.err("Expected '{' after 'for' loop definition"))
+        self.advance()
+
+        statements = res.register(self.parse_statements())
+        if res.error:
+            return res
+        body = statements.element_nodes
+
+        if not self.match(TT.RBRACE):
+            return res.failure(self.err("Expected '}' after 'for' loop body"))
+        self.advance()
+
+        return res.success(ForEachNode(var_name, iterable, body))
+
     def parse_while_expression(self):
         res = ParseResult()
 
@@ -497,7 +644,7 @@ class Parser:
             return_type = self.current_token
             self.advance()
 
-        if self.match(TT.IDENT):
+        if self.match_name():
             func_name = self.current_token
             self.advance()
 
@@ -507,14 +654,14 @@ class Parser:
 
         params = []
         if not self.match(TT.RPAREN):
-            if not self.match(TT.IDENT):
+            if not self.match_name():
                 return res.failure(self.err("Expected parameter"))
             params.append(self.current_token)
             self.advance()
 
             while self.match(TT.COMMA):
                 self.advance()
-                if not self.match(TT.IDENT):
+                if not self.match_name():
                     return res.failure(self.err("Expected parameter after ','"))
                 params.append(self.current_token)
                 self.advance()